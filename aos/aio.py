@@ -0,0 +1,290 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import asyncio
+import functools
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .aos import AosRestAPI, AosAuth, AosSubsystem
+from .paging import PagedIterator
+from .ratelimit import already_acquired
+from .blueprint import AosBlueprint
+from .devices import AosDevices
+from .design import AosDesign
+from .resources import AosResources
+from .external_systems import AosExternalSystems
+from .telemetry import AosTelemetryManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 10
+
+
+def _call(func, args, kwargs):
+    retval = func(*args, **kwargs)
+    # generators would otherwise be consumed lazily on the event loop thread
+    if inspect.isgenerator(retval) or isinstance(retval, PagedIterator):
+        return list(retval)
+    return retval
+
+
+def _admitted(func, *args):
+    with already_acquired():
+        return func(*args)
+
+
+class ThreadOffloadAosRestAPI:
+    """
+    asyncio interface for rest api integration with AOS, offloading the
+    blocking :class:`aos.aos.AosRestAPI` to a thread pool.
+
+    This is not a native async HTTP client: every call in flight holds a
+    pool thread, so at most `max_workers` requests run at the same time and
+    further awaiting coroutines queue until a thread is free. It keeps the
+    event loop responsive and shares the retry, rate limiting, caching and
+    hook behaviour of the synchronous client. Raise `max_workers` (and the
+    connection pool with it) to have more requests in flight.
+    """
+
+    def __init__(
+        self,
+        protocol,
+        host,
+        port,
+        session=None,
+        verify=False,
+        max_workers=DEFAULT_MAX_WORKERS,
+        rest: AosRestAPI = None,
+        **rest_kwargs,
+    ):
+        """
+
+        Parameters
+        ----------
+        protocol
+            (str) https or http connection to AOS api
+        host
+            (str) AOS server url or ip address
+        port
+            (int) AOS server port (ex 80, 443)
+        session
+            (obj) Established session with AOS server
+        verify
+            (bool)
+        max_workers
+            (int) Maximum number of requests executed at the same time,
+            one pool thread each
+        rest
+            (obj) Existing AosRestAPI to share (optional)
+        rest_kwargs
+            options of the created :class:`aos.aos.AosRestAPI` when `rest`
+            is not given, ex: retry_policy, rate_limiter or cache
+        """
+        self.rest = rest or AosRestAPI(
+            protocol,
+            host,
+            port,
+            session,
+            verify,
+            **dict({"max_in_flight": max_workers}, **rest_kwargs),
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="aos-async"
+        )
+
+    @property
+    def token(self):
+        return self.rest.token
+
+    @token.setter
+    def token(self, value):
+        self.rest.token = value
+
+    @property
+    def base_url(self):
+        return self.rest.base_url
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a blocking callable on the request thread pool and await
+        its result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(_call, func, args, kwargs)
+        )
+
+    async def _request(self, func, method, uri, params, data, headers):
+        limiter = self.rest.rate_limiter
+        if limiter is None:
+            return await self.run(func, method, uri, params, data, headers)
+
+        # Queue on the event loop rather than parking a worker thread
+        await limiter.aacquire(method, uri)
+        return await self.run(
+            _admitted, func, method, uri, params, data, headers
+        )
+
+    async def raw_request(self, method, uri, params, data, headers):
+        return await self._request(
+            self.rest.raw_request, method, uri, params, data, headers
+        )
+
+    async def raw_request_json(self, method, uri, params, data, headers):
+        return await self._request(
+            self.rest.raw_request_json, method, uri, params, data, headers
+        )
+
+    async def json_resp_post(self, uri: str, params=None, data=None, headers=None):
+        return await self.raw_request_json("POST", uri, params, data, headers)
+
+    async def put(self, uri: str, params=None, data=None, headers=None):
+        return await self.raw_request("PUT", uri, params, data, headers)
+
+    async def json_resp_put(self, uri: str, params=None, data=None, headers=None):
+        return await self.raw_request_json("PUT", uri, params, data, headers)
+
+    async def patch(self, uri: str, params=None, data=None, headers=None):
+        return await self.raw_request("PATCH", uri, params, data, headers)
+
+    async def json_resp_patch(self, uri: str, params=None, data=None, headers=None):
+        return await self.raw_request_json("PATCH", uri, params, data, headers)
+
+    async def json_resp_get(self, uri: str, params=None, data=None, headers=None):
+        return await self.raw_request_json("GET", uri, params, data, headers)
+
+    async def delete(self, uri, params=None, data=None, headers=None):
+        return await self.raw_request("DELETE", uri, params, data, headers)
+
+    async def get_aos_version(self):
+        return await self.run(self.rest.get_aos_version)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.rest.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+# asyncio rest client, requests are offloaded to threads
+AsyncAosRestAPI = ThreadOffloadAosRestAPI
+
+
+class AsyncAosSubsystem:
+    """
+    Exposes every public method of a synchronous AOS subsystem as a coroutine
+    function. Nested subsystems (ex: `devices.managed_devices`) are wrapped
+    as well and generator results are returned as lists.
+    """
+
+    def __init__(self, subsystem, rest: ThreadOffloadAosRestAPI):
+        self._subsystem = subsystem
+        self._rest = rest
+
+    def __getattr__(self, name):
+        attr = getattr(self._subsystem, name)
+
+        if isinstance(attr, (AosSubsystem, AosAuth)):
+            wrapped = AsyncAosSubsystem(attr, self._rest)
+            setattr(self, name, wrapped)
+            return wrapped
+
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self._rest.run(attr, *args, **kwargs)
+
+        return method
+
+
+class AsyncAosClient:
+    """
+    asyncio counterpart of :class:`aos.client.AosClient`.
+
+    All subsystems expose the same methods as the synchronous client but
+    must be awaited:
+
+        async with AsyncAosClient("https", "aos", 443) as aos:
+            await aos.auth.login("admin", "admin")
+            nodes = await asyncio.gather(
+                *[aos.blueprint.get_bp_nodes(bp_id) for bp_id in bp_ids]
+            )
+
+    Calls run on the thread pool of a :class:`ThreadOffloadAosRestAPI`, at
+    most `max_workers` at a time, each holding a pool thread while in
+    flight.
+
+    Parameters
+    ----------
+    protocol
+        (str) https or http connection to AOS api
+    host
+        (str) AOS server url or ip address
+    port
+        (int) AOS server port (ex 80, 443)
+    session
+        (obj) Established session with AOS server
+    max_workers
+        (int) Maximum number of calls executed at the same time, one pool
+        thread each
+    verify
+        (bool)
+    rest
+        (obj) preconfigured :class:`aos.aos.AosRestAPI` to use (optional)
+    rest_kwargs
+        options of the created :class:`aos.aos.AosRestAPI` when `rest` is
+        not given, ex: retry_policy, rate_limiter, cache or page_size
+    """
+
+    def __init__(
+        self,
+        protocol: str,
+        host: str,
+        port: int,
+        session: requests.Session = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        verify: bool = False,
+        rest: AosRestAPI = None,
+        **rest_kwargs,
+    ):
+        self.session = session
+        self.rest = ThreadOffloadAosRestAPI(
+            protocol,
+            host,
+            port,
+            session,
+            verify,
+            max_workers=max_workers,
+            rest=rest,
+            **rest_kwargs,
+        )
+        rest = self.rest.rest
+        self.auth = AsyncAosSubsystem(AosAuth(rest), self.rest)
+        self.blueprint = AsyncAosSubsystem(AosBlueprint(rest), self.rest)
+        self.devices = AsyncAosSubsystem(AosDevices(rest), self.rest)
+        self.design = AsyncAosSubsystem(AosDesign(rest), self.rest)
+        self.resources = AsyncAosSubsystem(AosResources(rest), self.rest)
+        self.external_systems = AsyncAosSubsystem(
+            AosExternalSystems(rest), self.rest
+        )
+        self.telemetry_mgr = AsyncAosSubsystem(AosTelemetryManager(rest), self.rest)
+
+    def close(self):
+        self.rest.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -3,8 +3,22 @@
 # This source code is licensed under End User License Agreement found in the
 # LICENSE file at http://www.apstra.com/eula
 import logging
+import socket
+import threading
+import time
 import requests
 from collections import namedtuple
+from contextlib import closing
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Tuple, Union
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from .cache import ResponseCache
+from .codec import JsonCodec, get_codec
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .stream import STREAM_CHUNK_SIZE, iter_json_items
 from .utils import redacted
 
 logger = logging.getLogger(__name__)
@@ -40,6 +54,108 @@ def err_message(resp: requests.Response) -> str:
 AosVersion = namedtuple(
     "AosVersion", ["major", "version", "build", "minor", "full_version"]
 )
+AosRequest = namedtuple("AosRequest", ["method", "uri", "params", "data"])
+AosRequest.__new__.__defaults__ = (None, None)
+
+PoolStats = namedtuple(
+    "PoolStats", ["maxsize", "connections_created", "idle", "in_use", "requests"]
+)
+
+LOGIN_PATH = "/api/aaa/login"
+
+HOOK_EVENTS = ("pre_request", "post_response", "on_error", "on_retry")
+
+DEFAULT_MAX_IN_FLIGHT = 10
+DEFAULT_POOL_SIZE = 10
+
+# idle seconds before the first probe, seconds between probes, failed probes
+TCP_KEEPALIVE = (60, 15, 4)
+
+_worker = threading.local()
+
+
+def _run_in_worker(func):
+    _worker.active = True
+    try:
+        return func()
+    finally:
+        _worker.active = False
+
+
+class AosRequestInfo:
+    """
+    Request details passed to hooks registered with
+    :meth:`AosRestAPI.add_hook`
+    """
+
+    __slots__ = (
+        "method",
+        "uri",
+        "url",
+        "params",
+        "data",
+        "stream",
+        "started",
+        "elapsed",
+        "attempts",
+        "response",
+        "error",
+    )
+
+    def __init__(self, method, uri, url, params, data, stream=False):
+        self.method = method
+        self.uri = uri
+        self.url = url
+        self.params = params
+        self.data = data
+        self.stream = stream
+        self.started = time.monotonic()
+        self.elapsed = None
+        self.attempts = 0
+        self.response = None
+        self.error = None
+
+    def __repr__(self):
+        return f"AosRequestInfo<{self.method} {self.uri}>"
+
+
+def keepalive_socket_options(idle=None, interval=None, count=None):
+    """
+    Socket options enabling TCP keep-alive probes on pooled connections so
+    idle sessions survive firewalls and dead peers are detected.
+    """
+    idle, interval, count = (
+        v if v is not None else d
+        for v, d in zip((idle, interval, count), TCP_KEEPALIVE)
+    )
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for name, value in (
+        ("TCP_KEEPIDLE", idle),
+        ("TCP_KEEPINTVL", interval),
+        ("TCP_KEEPCNT", count),
+    ):
+        # Not every platform exposes all of the tuning knobs
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class AosHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that applies extra socket options (ex: TCP keep-alive) to
+    every connection of its pool.
+    """
+
+    def __init__(self, socket_options=None, **kwargs):
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **pool_kwargs):
+        if self.socket_options is not None:
+            pool_kwargs["socket_options"] = (
+                HTTPConnection.default_socket_options + self.socket_options
+            )
+        super().init_poolmanager(*args, **pool_kwargs)
 
 
 class AosRestAPI:
@@ -52,7 +168,26 @@ class AosRestAPI:
         "Accept": "application/json",
     }
 
-    def __init__(self, protocol, host, port, session=None, verify=False):
+    def __init__(
+        self,
+        protocol,
+        host,
+        port,
+        session=None,
+        verify=False,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        pool_connections=None,
+        pool_maxsize=None,
+        pool_block=None,
+        keep_alive=None,
+        connect_timeout=None,
+        read_timeout=None,
+        retry_policy: RetryPolicy = None,
+        rate_limiter: RateLimiter = None,
+        json_codec: Union[str, JsonCodec] = None,
+        cache: ResponseCache = None,
+        page_size: int = None,
+    ):
         """
 
         Parameters
@@ -67,6 +202,50 @@ class AosRestAPI:
             (obj) Established session with AOS server
         verify
             (bool)
+        max_in_flight
+            (int) Maximum number of concurrent requests issued against the
+            AOS server by :meth:`parallel` and :meth:`map_requests`
+        pool_connections
+            (int) Number of per-host connection pools to cache. Default 10
+        pool_maxsize
+            (int) Connections kept open per host.
+            Default: the larger of 10 and `max_in_flight`
+        pool_block
+            (bool) Wait for a free pooled connection instead of opening
+            (and then discarding) an extra one when the pool is exhausted.
+            Default False
+        keep_alive
+            (bool) Enable TCP keep-alive probes on pooled connections.
+            Default True
+        connect_timeout
+            (float) Seconds to wait for a connection to be established.
+            Default None (wait forever)
+        read_timeout
+            (float) Seconds to wait for the server to send a response.
+            Default None (wait forever)
+        retry_policy
+            (obj) :class:`aos.retry.RetryPolicy` used to retry throttled
+            requests, gateway errors and connection failures.
+            Default None (no retries)
+        rate_limiter
+            (obj) :class:`aos.ratelimit.RateLimiter` queueing requests to stay
+            under the configured request rates. Default None (no limit)
+        json_codec
+            (str) JSON library used for request and response bodies:
+            "orjson", "msgspec", "ujson", "json" or "auto" (fastest one
+            installed), or a :class:`aos.codec.JsonCodec`.
+            Default None (encoding and decoding left to requests)
+        cache
+            (obj) :class:`aos.cache.ResponseCache` serving repeated GET
+            requests from memory. Default None (no caching)
+        page_size
+            (int) Items requested per page by collection iterators, see
+            :class:`aos.paging.PagedIterator`. Default None (whole
+            collections are fetched with one request)
+
+        The pool settings are applied to sessions created by the client. A
+        given `session` keeps its own adapters unless a pool setting is
+        passed explicitly.
         """
         assert protocol in ["http", "https"]
 
@@ -74,47 +253,424 @@ class AosRestAPI:
         self.host = host
         self.port = port
         self.token = None
+        # callable logging in again when the token expired, see AosAuth
+        self.reauth = None
+        self._reauth_lock = threading.Lock()
 
         self.session = session or requests.Session()
         self.session.verify = verify
 
+        self.max_in_flight = max_in_flight
+        self.retry_policy = retry_policy
+        self.hooks = {event: [] for event in HOOK_EVENTS}
+        self.rate_limiter = rate_limiter
+        self.json_codec = get_codec(json_codec) if json_codec is not None else None
+        self.cache = cache
+        # name index of design and resource objects, see aos.catalog
+        self.catalog = None
+        self.page_size = page_size
+        self.timeout = None
+        if connect_timeout is not None or read_timeout is not None:
+            self.timeout = (connect_timeout, read_timeout)
+
+        pool_options = (pool_connections, pool_maxsize, pool_block, keep_alive)
+        if session is None or any(o is not None for o in pool_options):
+            adapter = AosHTTPAdapter(
+                pool_connections=pool_connections or DEFAULT_POOL_SIZE,
+                pool_maxsize=pool_maxsize or max(DEFAULT_POOL_SIZE, max_in_flight),
+                pool_block=bool(pool_block),
+                socket_options=(
+                    keepalive_socket_options() if keep_alive is not False else None
+                ),
+            )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
     @property
     def base_url(self):
         return f"{self.protocol}://{self.host}:{self.port}"
 
-    def raw_request(self, method, uri, params, data, headers):
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_in_flight,
+                    thread_name_prefix=f"aos-{self.host}",
+                )
+            return self._executor
+
+    def pool_stats(self) -> Dict[str, PoolStats]:
+        """
+        Return usage of the connection pools opened by the session.
+
+        Returns
+        -------
+            (dict) - {"https://aos:443": PoolStats(...), ...}
+        """
+        adapters = getattr(self.session, "adapters", None)
+        if not isinstance(adapters, dict):
+            return {}
+
+        stats = {}
+        for adapter in adapters.values():
+            manager = getattr(adapter, "poolmanager", None)
+            if manager is None:
+                continue
+            for key in manager.pools.keys():
+                try:
+                    pool = manager.pools[key]
+                except KeyError:
+                    continue
+                # Queue slots are pre-filled with None placeholders; real
+                # connections are only created on demand
+                queued = list(pool.pool.queue) if pool.pool else []
+                idle = sum(1 for conn in queued if conn is not None)
+                stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = PoolStats(
+                    maxsize=pool.pool.maxsize if pool.pool else 0,
+                    connections_created=pool.num_connections,
+                    idle=idle,
+                    in_use=(pool.pool.maxsize - len(queued)) if pool.pool else 0,
+                    requests=pool.num_requests,
+                )
+        return stats
+
+    def close(self):
+        """
+        Stop the worker threads used for concurrent requests
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def parallel(self, calls, max_in_flight=None, return_exceptions=False):
+        """
+        Run callables concurrently on the shared worker pool.
+        Parameters
+        ----------
+        calls
+            (iterable) callables taking no arguments, typically
+            `functools.partial` objects wrapping AOS api calls
+        max_in_flight
+            (int) Optional - limit concurrency of this batch below the
+            client wide `max_in_flight`
+        return_exceptions
+            (bool) return raised exceptions in place of results instead of
+            raising the first one
+
+        Returns
+        -------
+            (list) - results in the order of the given calls
+        """
+        calls = list(calls)
+        limit = min(max_in_flight or self.max_in_flight, self.max_in_flight)
+
+        # Nested batches run inline to avoid exhausting the bounded pool
+        if getattr(_worker, "active", False) or limit <= 1 or len(calls) <= 1:
+            return self._serial(calls, return_exceptions)
+
+        results = [None] * len(calls)
+        pending = {}
+        error = None
+        todo = iter(enumerate(calls))
+
+        def submit():
+            for i, func in todo:
+                pending[self.executor.submit(_run_in_worker, func)] = i
+                if len(pending) >= limit:
+                    return
+
+        submit()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i = pending.pop(fut)
+                try:
+                    results[i] = fut.result()
+                except Exception as e:  # pylint: disable=broad-except
+                    if not return_exceptions:
+                        error = error or e
+                    results[i] = e
+            if error is None:
+                submit()
+
+        if error is not None:
+            raise error
+        return results
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """
+        Run one call on the shared worker pool and return its future.
+        Calls made from a worker thread run inline and return a completed
+        future, like nested :meth:`parallel` batches.
+        """
+        if args or kwargs:
+            func = partial(func, *args, **kwargs)
+        if not getattr(_worker, "active", False):
+            return self.executor.submit(_run_in_worker, func)
+        fut = Future()
+        try:
+            fut.set_result(func())
+        except Exception as e:  # pylint: disable=broad-except
+            fut.set_exception(e)
+        return fut
+
+    @staticmethod
+    def _serial(calls, return_exceptions):
+        results = []
+        for func in calls:
+            try:
+                results.append(func())
+            except Exception as e:  # pylint: disable=broad-except
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def map_requests(
+        self, batch, max_in_flight=None, json=True, return_exceptions=False
+    ):
+        """
+        Issue a batch of rest api requests concurrently.
+        Parameters
+        ----------
+        batch
+            (iterable) `AosRequest` or (method, uri, params, data) tuples.
+            params and data are optional
+        max_in_flight
+            (int) Optional - limit concurrency of this batch
+        json
+            (bool) return deserialized json payloads instead of
+            Response objects
+        return_exceptions
+            (bool) return raised exceptions in place of results
+
+        Returns
+        -------
+            (list) - responses in the order of the given requests
+        """
+        send = self.raw_request_json if json else self.raw_request
+        calls = []
+        for r in batch:
+            r = AosRequest(*r)
+            calls.append(
+                lambda r=r: send(r.method, r.uri, r.params, r.data, None)
+            )
+
+        return self.parallel(
+            calls, max_in_flight=max_in_flight, return_exceptions=return_exceptions
+        )
+
+    def add_hook(self, event: str, func: Callable) -> None:
+        """
+        Register a callable invoked for every request.
+
+        Parameters
+        ----------
+        event
+            (str) one of:
+            "pre_request" - func(request) before the request is sent
+            "post_response" - func(request, response) once the final
+            response (after retries) is received
+            "on_error" - func(request, error) when the request raises
+            "on_retry" - func(request, reason, delay) before a retry
+        func
+            (callable) receives a :class:`AosRequestInfo` as first argument.
+            Exceptions raised by hooks are logged and ignored
+        """
+        if event not in HOOK_EVENTS:
+            raise AosInputError(f"Unknown hook event '{event}', use {HOOK_EVENTS}")
+        self.hooks[event].append(func)
+
+    def remove_hook(self, event: str, func: Callable) -> None:
+        self.hooks[event].remove(func)
+
+    def add_middleware(self, middleware) -> None:
+        """
+        Register every hook method (pre_request, post_response, on_error,
+        on_retry) implemented by the given object, ex:
+        :class:`aos.metrics.MetricsCollector`
+        """
+        for event in HOOK_EVENTS:
+            func = getattr(middleware, event, None)
+            if callable(func):
+                self.add_hook(event, func)
+
+    def remove_middleware(self, middleware) -> None:
+        for event in HOOK_EVENTS:
+            func = getattr(middleware, event, None)
+            if func in self.hooks[event]:
+                self.remove_hook(event, func)
+
+    def _fire(self, event, request, *args):
+        for func in self.hooks[event]:
+            try:
+                func(request, *args)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception(f"AosRestAPI {event} hook {func} failed")
+
+    def raw_request(self, method, uri, params, data, headers, stream=False):
         if headers is None:
             headers = self.default_headers.copy()
         if self.token is not None:
             headers["AuthToken"] = self.token
 
+        request = AosRequestInfo(
+            method, uri, f"{self.base_url}/{uri.lstrip('/')}", params, data, stream
+        )
+
+        cache_key = None
+        if (
+            self.cache is not None
+            and method == "GET"
+            and not stream
+            and self.cache.cacheable(uri)
+        ):
+            cache_key = self.cache.key(request.url, params)
+            cached, validators = self.cache.lookup(cache_key)
+            if cached is not None:
+                return cached
+            if validators:
+                headers = dict(headers, **validators)
+
+        self._fire("pre_request", request)
+
+        try:
+            resp = self._send_with_retries(request, headers)
+
+            if (
+                resp.status_code == 401
+                and self.reauth is not None
+                and uri.strip("/") != LOGIN_PATH.strip("/")
+            ):
+                self._refresh_token(stale_token=headers.get("AuthToken"))
+                headers["AuthToken"] = self.token
+                resp = self._send_with_retries(request, headers)
+
+            request.elapsed = time.monotonic() - request.started
+            request.response = resp
+            self._fire("post_response", request, resp)
+
+            if cache_key is not None:
+                resp = self.cache.update(cache_key, uri, resp)
+                if resp.status_code == 304:
+                    # the revalidated entry was evicted meanwhile
+                    for name in validators:
+                        headers.pop(name)
+                    resp = self._send_with_retries(request, headers)
+                    resp = self.cache.update(cache_key, uri, resp)
+
+            if resp.status_code == 401:
+                raise AosAuthenticationError(
+                    f"Authentication failed: {err_message(resp)}"
+                )
+            elif resp.status_code >= 400:
+                raise AosAPIError(err_message(resp))
+        except AosAPIError as e:
+            if request.elapsed is None:
+                request.elapsed = time.monotonic() - request.started
+            request.error = e
+            self._fire("on_error", request, e)
+            raise
+        finally:
+            if self.cache is not None and method != "GET":
+                self.cache.invalidate(method, uri)
+
+        return resp
+
+    def _refresh_token(self, stale_token):
+        # Callers rejected with the same token wait for a single re-login
+        with self._reauth_lock:
+            if self.token is not None and self.token != stale_token:
+                return
+            logger.info(f"AOS session token expired, logging in to {self.host}")
+            self.reauth()
+
+    def _send_with_retries(self, request, headers):
+        method, uri, url = request.method, request.uri, request.url
+        attempt = 0
+        while True:
+            request.attempts += 1
+            try:
+                resp = self._send(
+                    method,
+                    url,
+                    request.params,
+                    request.data,
+                    headers,
+                    stream=request.stream,
+                )
+            except requests.RequestException as e:
+                delay = self._retry_delay(method, uri, attempt, error=e)
+                if delay is None:
+                    raise AosAPIError(str(e)) from e
+                reason = e
+            else:
+                delay = self._retry_delay(method, uri, attempt, resp=resp)
+                if delay is None:
+                    return resp
+                reason = resp.status_code
+                if request.stream:
+                    # release the connection of the discarded response
+                    resp.close()
+
+            attempt += 1
+            logger.info(
+                f"Retrying {method} {url} in {delay:.2f}s "
+                f"(attempt {attempt}): {reason}"
+            )
+            self._fire("on_retry", request, reason, delay)
+            time.sleep(delay)
+
+    def _retry_delay(self, method, uri, attempt, resp=None, error=None):
+        if self.retry_policy is None:
+            return None
+        return self.retry_policy.next_delay(
+            method, uri, attempt, resp=resp, error=error
+        )
+
+    def _send(self, method, url, params, data, headers, stream=False):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(method, url)
+
         resp = None
         try:
-            uri = f"{self.base_url}/{uri.lstrip('/')}"
+            kwargs = {}
+            if self.timeout is not None:
+                kwargs["timeout"] = self.timeout
+            if stream:
+                kwargs["stream"] = True
+            payload = data
+            if self.json_codec is not None and data is not None:
+                payload = None
+                kwargs["data"] = self.json_codec.dumps(data)
+                if not any(k.lower() == "content-type" for k in headers):
+                    headers["Content-Type"] = "application/json"
 
             resp = self.session.request(
                 method,
-                uri,
+                url,
                 params=params,
-                json=data,
+                json=payload,
                 headers=headers,
+                **kwargs,
             )
-        except requests.RequestException as e:
-            raise AosAPIError(str(e)) from e
+            return resp
         finally:
-            logger.debug(
-                f"AosRequest<{method} {uri} params={params} json={redacted(data)} "
-                f"headers={redacted(headers)}; response={resp}"
-            )
-
-        if resp.status_code == 401:
-            raise AosAuthenticationError(
-                f"Authentication failed: {err_message(resp)}"
-            )
-        elif resp.status_code >= 400:
-            raise AosAPIError(err_message(resp))
-
-        return resp
+            # Redacting large payloads is costly, only do it when logged
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "AosRequest<%s %s params=%s json=%s headers=%s; response=%s",
+                    method,
+                    url,
+                    params,
+                    redacted(data),
+                    redacted(headers),
+                    resp,
+                )
 
     def raw_request_json(self, method, uri, params, data, headers):
         resp = self.raw_request(method, uri, params, data, headers)
@@ -125,6 +681,8 @@ class AosRestAPI:
             if method == "PUT" and resp.status_code == 204:
                 return None
             if resp.ok:
+                if self.json_codec is not None:
+                    return self.json_codec.loads(resp.content)
                 return resp.json()
         except (TypeError, ValueError) as e:
             msg = (
@@ -134,6 +692,50 @@ class AosRestAPI:
             logger.warning(msg)
             raise AosAPIUnprocessableResponse(msg) from e
 
+    def raw_request_iter(
+        self, method, uri, key=None, params=None, data=None, headers=None
+    ):
+        """
+        Stream a json response and yield the elements of the array, or the
+        values of the object, stored under `key` one at a time. Memory use
+        does not grow with the size of the response.
+
+        The request is sent when iteration starts.
+
+        Parameters
+        ----------
+        method
+            (str) HTTP method
+        uri
+            (str) AOS api uri
+        key
+            (str) top level key of the response holding the items, ex:
+            "items" or "nodes". Default None (the response is the array)
+        params
+            (dict) (optional) query parameters
+        data
+            (json) (optional) data payload
+        headers
+            (dict) (optional) request headers
+
+        Returns
+        -------
+            (generator) - response items
+        """
+        resp = self.raw_request(method, uri, params, data, headers, stream=True)
+        with closing(resp):
+            if method == "GET" and resp.status_code == 404:
+                return
+            try:
+                yield from iter_json_items(resp.iter_content(STREAM_CHUNK_SIZE), key)
+            except ValueError as e:
+                msg = (
+                    f"JSON deserialization failed for streamed '{method} {uri} "
+                    f"params={params}'. Error {type(e)}: {e}"
+                )
+                logger.warning(msg)
+                raise AosAPIUnprocessableResponse(msg) from e
+
     def try_raw_request_json(self, method, uri, params, data, headers):
         try:
             return self.raw_request_json(method, uri, params, data, headers)
@@ -268,6 +870,15 @@ class AosSubsystem:
     def __init__(self, rest: AosRestAPI):
         self.rest = rest
 
+    def _catalog_find(self, path, name, from_json, name_key="display_name"):
+        """
+        Look `name` up in the catalog attached to the rest client.
+        Returns None when no catalog is attached.
+        """
+        if self.rest.catalog is None:
+            return None
+        return self.rest.catalog.find(path, name, from_json, name_key)
+
 
 LoginResp = namedtuple("LoginResp", ["token", "user_uuid"])
 
@@ -280,25 +891,55 @@ class AosAuth:
     def __init__(self, rest: AosRestAPI):
         self.rest = rest
 
-    def login(self, username: str, password: str) -> LoginResp:
+    def login(
+        self, username: str, password: str, keep_credentials: bool = False
+    ) -> LoginResp:
         """
 
         Parameters
         ----------
         username
         password
+        keep_credentials
+            (bool) keep the credentials to log in again automatically when
+            the session token expires. See :meth:`enable_reauth`
 
         Returns
         -------
             (obj) Session token
         """
         resp = self.rest.json_resp_post(
-            "/api/aaa/login", data={"username": username, "password": password}
+            LOGIN_PATH, data={"username": username, "password": password}
         )
         self.rest.token = resp["token"]
 
+        if keep_credentials:
+            self.enable_reauth(lambda: (username, password))
+
         return LoginResp(token=resp["token"], user_uuid=resp["id"])
 
+    def enable_reauth(self, credentials: Callable[[], Tuple[str, str]]) -> None:
+        """
+        Log in again and replay the request once when AOS rejects the
+        session token (HTTP 401). Concurrent requests rejected with the same
+        token wait on a single login.
+
+        Parameters
+        ----------
+        credentials
+            (callable) returns (username, password); called on every
+            re-login so credentials can be fetched from a vault
+        """
+
+        def reauth():
+            username, password = credentials()
+            self.login(username, password)
+
+        self.rest.reauth = reauth
+
+    def disable_reauth(self) -> None:
+        self.rest.reauth = None
+
     def change_password(
         self, user_uuid: str, current_password: str, new_password: str
     ) -> None:
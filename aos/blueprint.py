@@ -7,18 +7,29 @@ import json
 import logging
 from collections import namedtuple
 from dataclasses import dataclass
-from typing import Dict, Optional, List, Generator
+from functools import partial
+from typing import Dict, Optional, List
 import requests
 from requests.utils import requote_uri
 from .aos import AosSubsystem, AosAPIError, AosInputError, AosAPIResourceNotFound
+from .bpcache import BlueprintCache
+from .columnar import ANOMALY_COLUMNS, ColumnBuilder, Columns, convert
+from .graph import BlueprintGraph
+from .models import compact, lazy as lazy_model
+from .paging import PagedIterator
+from .tasks import BlueprintJob, TaskWaiter, wait_jobs
 from .design import AosConfiglets, AosPropertySets, AosTemplate
 from .devices import AosDevices
 from .external_systems import AosExternalRouter
-from .repeat import repeat_until
 
 
 logger = logging.getLogger(__name__)
 
+# virtual-networks per virtual-networks-batch request, and batch requests
+# sent at the same time by create_virtual_networks
+VN_BATCH_SIZE = 500
+VN_BATCHES_IN_FLIGHT = 4
+
 
 class AosBPCommitError(AosAPIError):
     pass
@@ -30,6 +41,10 @@ def response(resp: Optional[requests.Response]) -> str:
     return f"{resp.status_code} {resp.content}"
 
 
+def _params_key(params: Optional[dict]):
+    return tuple(sorted(params.items())) if params else None
+
+
 Blueprint = namedtuple("Blueprint", ["label", "id"])
 Device = namedtuple("Device", ["label", "system_id"])
 StagingVersion = namedtuple("Staging", ["version", "status", "deploy_error"])
@@ -73,6 +88,100 @@ class VNTagType(Enum):
     unassigned = "unassigned"
 
 
+def _security_zone_payload(
+    name: str,
+    routing_policy: dict = None,
+    import_policy: str = None,
+    vlan_id: int = None,
+    vni_id: int = None,
+) -> dict:
+    """
+    Build the security-zone json of :meth:`AosBlueprint.create_security_zone`
+    arguments
+    """
+    if not name:
+        raise ValueError("name is required")
+    if vlan_id is not None and not 1 <= vlan_id <= 4094:
+        raise ValueError(f"vlan_id {vlan_id} is not in range 1 - 4094")
+
+    r_policy = {
+        "export_policy": {
+            "spine_leaf_links": False,
+            "loopbacks": True,
+            "l2edge_subnets": True,
+            "l3edge_server_links": False,
+        },
+        "import_policy": "default_only",
+    }
+
+    if routing_policy:
+        r_policy = dict(routing_policy)
+    if import_policy:
+        r_policy["import_policy"] = import_policy
+
+    return {
+        "routing_policy": r_policy,
+        "sz_type": "evpn",
+        "label": name,
+        "vrf_name": name,
+        "vlan_id": vlan_id,
+        "vni_id": vni_id,
+    }
+
+
+def _virtual_network_payload(
+    name: str,
+    bound_to: list,
+    sz_id: str = None,
+    vn_type: VNType = VNType.vxlan,
+    vn_id: str = None,
+    tag_type: VNTagType = None,
+    ipv4_subnet: str = None,
+    ipv4_gateway: str = None,
+    ipv6_enabled: bool = False,
+    ipv6_subnet: str = None,
+    ipv6_gateway: str = None,
+    tagged_ct: bool = False,
+    untagged_ct: bool = False,
+) -> dict:
+    """
+    Build the virtual-network json of :meth:`AosBlueprint.create_virtual_network`
+    arguments, enums may be given by value, ex: vn_type="vlan"
+    """
+    if not name:
+        raise ValueError("name is required")
+    if not isinstance(bound_to, (list, tuple)):
+        raise ValueError(f"bound_to must be a list, got {bound_to!r}")
+
+    virt_net = {
+        "label": name,
+        "security_zone_id": sz_id,
+        "vn_type": VNType(vn_type).value,
+        "vn_id": vn_id,
+        "bound_to": list(bound_to),
+        "ipv4_enabled": True,
+        "dhcp_service": "dhcpServiceEnabled",
+        "ipv4_subnet": ipv4_subnet,
+        "ipv4_gateway": ipv4_gateway,
+    }
+
+    if ipv6_enabled:
+        virt_net["ipv6_subnet"] = ipv6_subnet
+        virt_net["ipv6_gateway"] = ipv6_gateway
+
+    if tag_type:
+        tag_type = VNTagType(tag_type).value
+        virt_net["default_endpoint_tag_types"] = {
+            "single-link": tag_type,
+            "dual-link": tag_type,
+        }
+    if tagged_ct:
+        virt_net["create_policy_tagged"] = tagged_ct
+    if untagged_ct:
+        virt_net["create_policy_untagged"] = untagged_ct
+    return virt_net
+
+
 @dataclass
 class SecurityZone:
     label: str
@@ -90,7 +199,7 @@ class SecurityZone:
     def from_json(cls, sz: Optional[dict]):
         if sz is None:
             return NullSecurityZone
-        return SecurityZone(
+        return cls(
             label=sz.get("label", ""),
             id=sz["id"],
             routing_policy=sz.get("routing_policy", {}),
@@ -116,6 +225,10 @@ NullSecurityZone = SecurityZone(
     route_target={},
     vlan_id=0,
 )
+CompactSecurityZone = compact(
+    SecurityZone, raw_fields=["routing_policy", "rt_policy", "route_target"]
+)
+LazySecurityZone = lazy_model(SecurityZone)
 
 
 @dataclass
@@ -146,7 +259,7 @@ class VirtualNetwork:
     def from_json(cls, vn: Optional[dict]):
         if vn is None:
             return NullVirtualNetwork
-        return VirtualNetwork(
+        return cls(
             label=vn.get("label", ""),
             id=vn["id"],
             description=vn["description"],
@@ -194,6 +307,17 @@ NullVirtualNetwork = VirtualNetwork(
     tagged_ct=False,
     untagged_ct=False,
 )
+CompactVirtualNetwork = compact(
+    VirtualNetwork,
+    raw_fields=[
+        "svi_ips",
+        "default_endpoint_tag_types",
+        "endpoints",
+        "bound_to",
+        "rt_policy",
+    ],
+)
+LazyVirtualNetwork = lazy_model(VirtualNetwork, derived=["tagged_ct", "untagged_ct"])
 
 
 @dataclass
@@ -212,7 +336,7 @@ class ResourceGroup:
         if rg["name"].startswith("sz:"):
             group_name = rg["name"].partition(",")[2]
 
-        return ResourceGroup(
+        return cls(
             type=rg["type"],
             name=rg["name"],
             group_name=group_name,
@@ -221,6 +345,7 @@ class ResourceGroup:
 
 
 NullResourceGroup = ResourceGroup(type="", name="", group_name="", pool_ids=[])
+CompactResourceGroup = compact(ResourceGroup)
 
 
 class AosBlueprint(AosSubsystem):
@@ -228,6 +353,38 @@ class AosBlueprint(AosSubsystem):
     AOS blueprint specific actions
     """
 
+    def __init__(self, rest):
+        super().__init__(rest)
+        self.version_cache = None
+        # shared poller of async tasks, see wait_for_task
+        self.task_waiter = TaskWaiter(self)
+
+    def enable_version_cache(self, **kwargs) -> BlueprintCache:
+        """
+        Serve repeated blueprint reads (nodes, graph queries, virtual
+        networks and security zones) from memory while the blueprint
+        version is unchanged. Keyword arguments are passed to
+        :class:`aos.bpcache.BlueprintCache`.
+
+        Returns
+        -------
+            (obj) - :class:`aos.bpcache.BlueprintCache`
+        """
+        self.disable_version_cache()
+        self.version_cache = BlueprintCache(self.rest, **kwargs)
+        self.rest.add_middleware(self.version_cache)
+        return self.version_cache
+
+    def disable_version_cache(self) -> None:
+        if self.version_cache is not None:
+            self.rest.remove_middleware(self.version_cache)
+            self.version_cache = None
+
+    def _versioned(self, bp_id: str, key: tuple, load):
+        if self.version_cache is None:
+            return load()
+        return self.version_cache.get(bp_id, key, load)
+
     def get_all(self):
         """
         Return all blueprints configured
@@ -263,6 +420,15 @@ class AosBlueprint(AosSubsystem):
         -------
             (obj) "Blueprint", ("label", "id")
         """
+        found = self._catalog_find(
+            "/api/blueprints",
+            label,
+            lambda bp: Blueprint(label=bp["label"], id=bp["id"]),
+            "label",
+        )
+        if found is not None:
+            return found[0] if found else None
+
         blueprints = self.get_all()
 
         if blueprints is not None:
@@ -368,17 +534,65 @@ class AosBlueprint(AosSubsystem):
         return deleted_ids
 
     def anomalies(
-        self, bp_id: str, exclude_anomaly_type: Optional[List[str]] = None
-    ) -> Generator[Anomaly, None, None]:
+        self,
+        bp_id: str,
+        exclude_anomaly_type: Optional[List[str]] = None,
+        page_size: int = None,
+    ) -> PagedIterator:
         if exclude_anomaly_type is None:
             exclude_anomaly_type = []
 
-        anomalies = self.rest.json_resp_get(
+        return PagedIterator(
+            self.rest,
             f"/api/blueprints/{bp_id}/anomalies",
             params={"exclude_anomaly_type": exclude_anomaly_type},
+            page_size=page_size,
+            transform=Anomaly.from_json,
+        )
+
+    def anomalies_columns(
+        self,
+        bp_id: str,
+        exclude_anomaly_type: Optional[List[str]] = None,
+        columns: Columns = None,
+        fmt: str = "columns",
+        page_size: int = None,
+    ):
+        """
+        Return active anomalies of a blueprint as columns instead of
+        Anomaly objects, ex:
+
+            arr = aos.blueprint.anomalies_columns(bp_id, fmt="numpy")
+            numpy.unique(arr["type"], return_counts=True)
+
+        Parameters
+        ----------
+        bp_id
+            (str) ID of AOS blueprint
+        exclude_anomaly_type
+            (list) - anomaly type to exclude
+        columns
+            (list or dict) columns to return, see
+            :class:`aos.columnar.ColumnBuilder`.
+            Default aos.columnar.ANOMALY_COLUMNS
+        fmt
+            (str) "columns", "numpy", "pandas" or "auto",
+            see :func:`aos.columnar.convert`
+        page_size
+            (int) anomalies fetched per request
+
+        Returns
+        -------
+            (obj) dict of lists, numpy structured array or pandas DataFrame
+        """
+        anomalies = PagedIterator(
+            self.rest,
+            f"/api/blueprints/{bp_id}/anomalies",
+            params={"exclude_anomaly_type": exclude_anomaly_type or []},
+            page_size=page_size,
         )
-        for a in anomalies["items"]:
-            yield Anomaly.from_json(a)
+        builder = ColumnBuilder(ANOMALY_COLUMNS if columns is None else columns)
+        return convert(builder.extend(anomalies).columns, fmt)
 
     def anomalies_list(
         self, bp_id: str, exclude_anomaly_type: Optional[List[str]] = None
@@ -520,10 +734,24 @@ class AosBlueprint(AosSubsystem):
         return self.rest.json_resp_get(f"/api/blueprints/{bp_id}/diff-status")
 
     # tasks
-    def get_tasks(self, bp_id: str, params: dict = None) -> list:
-        return self.rest.json_resp_get(
-            uri=f"/api/blueprints/{bp_id}/tasks", params=params
-        )["items"]
+    def get_tasks(
+        self, bp_id: str, params: dict = None, page_size: int = None
+    ) -> list:
+        return list(self.iter_tasks(bp_id, params, page_size=page_size))
+
+    def iter_tasks(
+        self, bp_id: str, params: dict = None, page_size: int = None
+    ) -> PagedIterator:
+        """
+        Iterate over the tasks of a blueprint, fetching `page_size` tasks per
+        request (default: `rest.page_size`, 0 fetches all in one request)
+        """
+        return PagedIterator(
+            self.rest,
+            f"/api/blueprints/{bp_id}/tasks",
+            params=params,
+            page_size=page_size,
+        )
 
     def get_task_by_id(self, bp_id: str, task_id: str, params: dict = None) -> dict:
         return self.rest.json_resp_get(
@@ -558,6 +786,53 @@ class AosBlueprint(AosSubsystem):
         else:
             raise AosAPIResourceNotFound(f"Task {task} does not exist")
 
+    def wait_for_task(self, bp_id: str, task_id: str, timeout: float = None) -> dict:
+        """
+        Wait until a blueprint task finishes. Tasks waited for concurrently,
+        from any thread, are polled together, see :class:`aos.tasks.TaskWaiter`
+
+        Parameters
+        ----------
+        bp_id
+            (str) - ID of AOS blueprint
+        task_id
+            (str) - ID of the task
+        timeout
+            (float) - seconds to wait. Default None (no limit)
+
+        Returns
+        -------
+            (dict) - the finished task
+
+        Raises
+        ------
+            TimeoutError, aos.tasks.AosTaskError (task failed)
+        """
+        return self.task_waiter.wait(bp_id, task_id, timeout=timeout)
+
+    def wait_for_jobs(self, jobs: List[BlueprintJob], timeout: float = None) -> list:
+        """
+        Wait until all jobs returned by create methods with `wait=False`
+        finish, see :class:`aos.tasks.BlueprintJob`
+
+        Parameters
+        ----------
+        jobs
+            (list) - BlueprintJob
+        timeout
+            (float) - seconds to wait for all jobs. Default None (no limit)
+
+        Returns
+        -------
+            (list) - job results, ex: created objects, in the order of jobs
+
+        Raises
+        ------
+            TimeoutError (unfinished jobs are cancelled),
+            aos.tasks.AosTaskError (task failed)
+        """
+        return wait_jobs(jobs, timeout=timeout)
+
     # Graph Queries
     def qe_query(self, bp_id: str, query: str, params: dict = None):
         """
@@ -578,10 +853,73 @@ class AosBlueprint(AosSubsystem):
         """
         qe_path = f"/api/blueprints/{bp_id}/qe"
         data = {"query": query}
-        resp = self.rest.json_resp_post(uri=qe_path, data=data, params=params)
+        resp = self._versioned(
+            bp_id,
+            ("qe", query, _params_key(params)),
+            lambda: self.rest.json_resp_post(uri=qe_path, data=data, params=params),
+        )
 
         return resp["items"]
 
+    def qe_query_many(
+        self,
+        bp_id: str,
+        queries: List[str],
+        max_in_flight: int = None,
+        return_exceptions: bool = False,
+    ) -> list:
+        """
+        Run QE queries concurrently against a Blueprint graphDB
+
+        Parameters
+        ----------
+        bp_id
+            (str) ID of AOS blueprint
+        queries
+            (list) qe query strings
+        max_in_flight
+            (int) (optional) maximum number of queries sent at the same
+            time. Default: `max_in_flight` of the rest client
+        return_exceptions
+            (bool) return the exception of a failed query in its slot
+            instead of raising it
+
+        Returns
+        -------
+            (list) - items of each query, in the order of `queries`
+        """
+        return self.rest.parallel(
+            (partial(self.qe_query, bp_id, query) for query in queries),
+            max_in_flight=max_in_flight,
+            return_exceptions=return_exceptions,
+        )
+
+    def iter_qe_query(self, bp_id: str, query: str, params: dict = None):
+        """
+        Stream the results of a QE query one item at a time instead of
+        loading the whole response, see :meth:`qe_query`
+
+        Parameters
+        ----------
+        bp_id
+            (str) ID of AOS blueprint
+        query
+            (str) qe query string
+        params
+            (dict) (optional) query parameters
+
+        Returns
+        -------
+            (generator) - query result items
+        """
+        return self.rest.raw_request_iter(
+            "POST",
+            f"/api/blueprints/{bp_id}/qe",
+            key="items",
+            params=params,
+            data={"query": query},
+        )
+
     def ql_query(self, bp_id: str, query: str, params: dict = None):
         """
         QL query aginst a Blueprint graphDB
@@ -601,7 +939,11 @@ class AosBlueprint(AosSubsystem):
         """
         ql_path = f"/api/blueprints/{bp_id}/ql"
         data = {"query": query}
-        resp = self.rest.json_resp_post(uri=ql_path, data=data, params=params)
+        resp = self._versioned(
+            bp_id,
+            ("ql", query, _params_key(params)),
+            lambda: self.rest.json_resp_post(uri=ql_path, data=data, params=params),
+        )
 
         return resp["data"]
 
@@ -828,7 +1170,63 @@ class AosBlueprint(AosSubsystem):
         else:
             n_path = f"/api/blueprints/{bp_id}/nodes"
 
-        return self.rest.json_resp_get(n_path)["nodes"]
+        return self._versioned(
+            bp_id, ("nodes", node_type), lambda: self.rest.json_resp_get(n_path)
+        )["nodes"]
+
+    def iter_bp_nodes(self, bp_id: str, node_type: str = None):
+        """
+        Stream the nodes of a blueprint one at a time instead of loading the
+        whole response, see :meth:`get_bp_nodes`
+
+        Parameters
+        ----------
+        bp_id
+            (str) ID of AOS blueprint
+        node_type
+            (str) (optional) only return nodes of the given type
+
+        Returns
+        -------
+            (generator) - node dicts
+        """
+        params = {"node_type": node_type} if node_type else None
+        return self.rest.raw_request_iter(
+            "GET", f"/api/blueprints/{bp_id}/nodes", key="nodes", params=params
+        )
+
+    def get_bp_nodes_columns(
+        self,
+        bp_id: str,
+        node_type: str = None,
+        columns: Columns = None,
+        fmt: str = "columns",
+    ):
+        """
+        Return the nodes of a blueprint as columns. Nodes are streamed
+        into the columns, see :meth:`iter_bp_nodes`
+
+        Parameters
+        ----------
+        bp_id
+            (str) ID of AOS blueprint
+        node_type
+            (str) (optional) only return nodes of the given type
+        columns
+            (list or dict) columns to return, see
+            :class:`aos.columnar.ColumnBuilder`.
+            Default None (every node property)
+        fmt
+            (str) "columns", "numpy", "pandas" or "auto",
+            see :func:`aos.columnar.convert`
+
+        Returns
+        -------
+            (obj) dict of lists, numpy structured array or pandas DataFrame
+        """
+        builder = ColumnBuilder(columns)
+        builder.extend(self.iter_bp_nodes(bp_id, node_type))
+        return convert(builder.columns, fmt)
 
     def get_bp_node_by_id(self, bp_id: str, node_id: str):
         return self.rest.json_resp_get(f"/api/blueprints/{bp_id}/nodes/{node_id}")
@@ -955,17 +1353,22 @@ class AosBlueprint(AosSubsystem):
         -------
 
         """
-        leaf_nodes = self.get_bp_system_leaf_nodes(bp_id)
+        tor_query = (
+            "match(node('system', name='leaf', role='leaf'),"
+            "optional(node('redundancy_group', name='rg')"
+            ".out('composed_of_systems')"
+            ".node('system', name='leaf')))"
+        )
 
         nodes = list()
-        for leaf in leaf_nodes:
-            leaf_id = leaf["leaf"]["id"]
-            rg = self.get_bp_system_redundancy_group(bp_id, leaf_id)
-            if rg:
-                if rg[0]["rg"] not in nodes:
-                    nodes.append(rg[0]["rg"])
-            else:
-                nodes.append(leaf["leaf"])
+        rg_ids = set()
+        for item in self.qe_query(bp_id, query=tor_query):
+            rg = item.get("rg")
+            if rg is None:
+                nodes.append(item["leaf"])
+            elif rg["id"] not in rg_ids:
+                rg_ids.add(rg["id"])
+                nodes.append(rg)
 
         return nodes
 
@@ -1547,23 +1950,33 @@ class AosBlueprint(AosSubsystem):
                 raise AosAPIError(f"IBA Probe {probe_id} not found")
 
     # Security Zones
-    def get_all_security_zones(self, bp_id: str) -> List[SecurityZone]:
+    def get_all_security_zones(
+        self, bp_id: str, lazy: bool = False
+    ) -> List[SecurityZone]:
         """
         Return all security-zones (VRFs) in a given blueprint
         Parameters
         ----------
         bp_id
             (str) - ID of AOS Blueprint
+        lazy
+            (bool) - return LazySecurityZone proxies reading the response
+            on access, see aos.models.lazy
 
         Returns
         -------
             [SecurityZone]
         """
-        sec_zones = self.rest.json_resp_get(
-            f"/api/blueprints/{bp_id}/security-zones"
+        sec_zones = self._versioned(
+            bp_id,
+            ("security-zones",),
+            lambda: self.rest.json_resp_get(
+                f"/api/blueprints/{bp_id}/security-zones"
+            ),
         )["items"]
 
-        return [SecurityZone.from_json(sz) for sz in sec_zones.values()]
+        model = LazySecurityZone if lazy else SecurityZone
+        return [model.from_json(sz) for sz in sec_zones.values()]
 
     def get_security_zone(self, bp_id, sz_id) -> SecurityZone:
         """
@@ -1605,9 +2018,9 @@ class AosBlueprint(AosSubsystem):
         -------
             SecurityZone
         """
-        for sz in self.get_all_security_zones(bp_id):
+        for sz in self.get_all_security_zones(bp_id, lazy=True):
             if sz.vrf_name == name:
-                return sz
+                return sz.to_model()
 
     def create_security_zone_from_json(
         self, bp_id: str, payload: dict, params: dict = None
@@ -1652,6 +2065,7 @@ class AosBlueprint(AosSubsystem):
         leaf_loopback_ip_pools: list = None,
         dhcp_servers: list = None,
         timeout: int = 60,
+        wait: bool = True,
     ):
         """
         Create a security-zone in the given blueprint
@@ -1692,45 +2106,53 @@ class AosBlueprint(AosSubsystem):
             (list) - list of DHCP server (relay) IP addresses
         timeout
             (int) - time (seconds) to wait for creation
+        wait
+            (bool) - wait for the creation. With False return at once a
+            BlueprintJob resolving to the security-zone, the loopback pools
+            and DHCP servers are applied when its result is requested and
+            `timeout` is not used, see aos.tasks.BlueprintJob
 
         Returns
         -------
-            (obj) - security-zone
+            (obj) - security-zone, or BlueprintJob
         """
-
-        r_policy = {
-            "export_policy": {
-                "spine_leaf_links": False,
-                "loopbacks": True,
-                "l2edge_subnets": True,
-                "l3edge_server_links": False,
-            },
-            "import_policy": "default_only",
-        }
-
-        if routing_policy:
-            r_policy = routing_policy
-        if import_policy:
-            r_policy["import_policy"] = import_policy
-
-        sec_zone = {
-            "routing_policy": r_policy,
-            "sz_type": "evpn",
-            "label": name,
-            "vrf_name": name,
-            "vlan_id": vlan_id,
-            "vni_id": vni_id,
-        }
+        sec_zone = _security_zone_payload(
+            name=name,
+            routing_policy=routing_policy,
+            import_policy=import_policy,
+            vlan_id=vlan_id,
+            vni_id=vni_id,
+        )
 
         sz_task = self.create_security_zone_from_json(
             bp_id, sec_zone, params={"async": "full"}
         )
         logger.info(f"Creating Security-zone '{name}' in blueprint '{bp_id}'")
 
-        repeat_until(
-            lambda: self.is_task_active(bp_id, sz_task["task_id"]) is False,
-            timeout=timeout,
+        job = BlueprintJob(
+            self.task_waiter,
+            bp_id,
+            sz_task["task_id"],
+            resolve=partial(
+                self._created_security_zone,
+                bp_id,
+                name,
+                leaf_loopback_ip_pools,
+                dhcp_servers,
+            ),
         )
+        if not wait:
+            return job
+        return self.wait_for_jobs([job], timeout=timeout)[0]
+
+    def _created_security_zone(
+        self,
+        bp_id: str,
+        name: str,
+        leaf_loopback_ip_pools: Optional[list],
+        dhcp_servers: Optional[list],
+        task: dict,
+    ) -> SecurityZone:
         sz = self.find_sz_by_name(bp_id, name)
 
         # SZ leaf loopback pool
@@ -1761,6 +2183,133 @@ class AosBlueprint(AosSubsystem):
 
         return self.get_security_zone(bp_id, sz.id)
 
+    def create_security_zones(
+        self,
+        bp_id: str,
+        specs: List[dict],
+        max_in_flight: int = None,
+        timeout: int = 600,
+    ) -> List[SecurityZone]:
+        """
+        Create many security-zones (VRFs). All specs are validated before
+        the first request, the zones are created concurrently, their tasks
+        are waited for together and the created zones are read with a
+        single list request. Leaf loopback pools and DHCP servers of all
+        zones are then applied concurrently.
+
+        Parameters
+        ----------
+        bp_id
+            (str) - ID of AOS blueprint
+        specs
+            (list) - dicts of :meth:`create_security_zone` arguments (name,
+            routing_policy, import_policy, vlan_id, vni_id,
+            leaf_loopback_ip_pools, dhcp_servers). Names and VLAN IDs must
+            be unique
+        max_in_flight
+            (int) - requests sent at the same time. Default:
+            `max_in_flight` of the rest client
+        timeout
+            (int) - time (seconds) to wait for the creation of all zones
+
+        Returns
+        -------
+            (list) - SecurityZone in the order of specs
+
+        Raises
+        ------
+            AosInputError - invalid spec, nothing was created
+            TimeoutError, aos.tasks.AosTaskError (a zone creation failed)
+        """
+        zones = self._security_zone_specs(specs)
+        if not zones:
+            return []
+
+        logger.info(f"Creating {len(zones)} Security-zones in blueprint '{bp_id}'")
+        task_futures = self.rest.parallel(
+            (
+                partial(self._watch_security_zone, bp_id, payload)
+                for payload, _, _ in zones
+            ),
+            max_in_flight=max_in_flight,
+        )
+        self.task_waiter.wait_all(task_futures, timeout=timeout)
+
+        by_name = {
+            sz.vrf_name: sz for sz in self.get_all_security_zones(bp_id, lazy=True)
+        }
+        names = [payload["vrf_name"] for payload, _, _ in zones]
+        missing = [name for name in names if name not in by_name]
+        if missing:
+            raise AosAPIResourceNotFound(
+                f"Security-zones {missing} not found after creation"
+            )
+        created = [by_name[name].to_model() for name in names]
+
+        # same requests as create_security_zone, without reading back each
+        # resource group and zone
+        calls = []
+        for sz, (_, pools, dhcp_servers) in zip(created, zones):
+            sz_path = f"/api/blueprints/{bp_id}/security-zones/{sz.id}"
+            group_path = requote_uri(f"sz:{sz.id},leaf_loopback_ips")
+            rg_path = f"/api/blueprints/{bp_id}/resource_groups/ip/{group_path}"
+            if pools:
+                calls.append(
+                    partial(
+                        self.rest.json_resp_put,
+                        uri=rg_path,
+                        data={"pool_ids": pools},
+                    )
+                )
+            if dhcp_servers:
+                calls.append(
+                    partial(
+                        self.rest.put,
+                        uri=f"{sz_path}/dhcp-servers",
+                        data={"items": dhcp_servers},
+                    )
+                )
+        if calls:
+            logger.info(
+                f"Applying loopback pools and dhcp servers to Security-zones "
+                f"in blueprint '{bp_id}'"
+            )
+            self.rest.parallel(calls, max_in_flight=max_in_flight)
+
+        return created
+
+    @staticmethod
+    def _security_zone_specs(specs: List[dict]) -> list:
+        zones = []
+        names = set()
+        vlan_ids = set()
+        for i, spec in enumerate(specs):
+            spec = dict(spec)
+            pools = spec.pop("leaf_loopback_ip_pools", None)
+            dhcp_servers = spec.pop("dhcp_servers", None)
+            try:
+                payload = _security_zone_payload(**spec)
+            except (TypeError, ValueError) as e:
+                raise AosInputError(f"Invalid security-zone spec {i}: {e}")
+            if payload["vrf_name"] in names:
+                raise AosInputError(
+                    f"Duplicate security-zone name '{payload['vrf_name']}'"
+                )
+            if payload["vlan_id"] is not None and payload["vlan_id"] in vlan_ids:
+                raise AosInputError(
+                    f"Duplicate security-zone vlan_id {payload['vlan_id']}"
+                )
+            names.add(payload["vrf_name"])
+            vlan_ids.add(payload["vlan_id"])
+            zones.append((payload, pools, dhcp_servers))
+        return zones
+
+    def _watch_security_zone(self, bp_id: str, payload: dict):
+        task = self.create_security_zone_from_json(
+            bp_id, payload, params={"async": "full"}
+        )
+        return self.task_waiter.watch(bp_id, task["task_id"])
+
     def update_security_zone(self, bp_id: str, sz_id: str, payload: str):
         """
         Update a security-zone in the given blueprint using a
@@ -1992,6 +2541,7 @@ class AosBlueprint(AosSubsystem):
         tagged_ct: bool = False,
         untagged_ct: bool = False,
         timeout: int = 60,
+        wait: bool = True,
     ):
         """
 
@@ -2044,10 +2594,14 @@ class AosBlueprint(AosSubsystem):
             virtual-network.
         timeout
             (int) - time (seconds) to wait for creation
+        wait
+            (bool) - wait for the creation. With False return at once a
+            BlueprintJob resolving to the virtual-network, `timeout` is not
+            used, see aos.tasks.BlueprintJob
 
         Returns
         -------
-
+            (obj) - VirtualNetwork, or BlueprintJob
         """
         if sz_name:
             sz = self.find_sz_by_name(bp_id, name=sz_name)
@@ -2056,61 +2610,64 @@ class AosBlueprint(AosSubsystem):
             else:
                 raise ValueError(f"Invalid argument '{sz_name}' was passed")
 
-        virt_net = {
-            "label": name,
-            "security_zone_id": sz_id,
-            "vn_type": vn_type.value,
-            "vn_id": vn_id,
-            "bound_to": bound_to,
-            "ipv4_enabled": True,
-            "dhcp_service": "dhcpServiceEnabled",
-            "ipv4_subnet": ipv4_subnet,
-            "ipv4_gateway": ipv4_gateway,
-        }
-
-        if ipv6_enabled:
-            virt_net["ipv6_subnet"] = ipv6_subnet
-            virt_net["ipv6_gateway"] = ipv6_gateway
-
-        if tag_type:
-            virt_net["default_endpoint_tag_types"] = {
-                "single-link": tag_type.value,
-                "dual-link": tag_type.value,
-            }
-        if tagged_ct:
-            virt_net["create_policy_tagged"] = tagged_ct
-        if untagged_ct:
-            virt_net["create_policy_untagged"] = untagged_ct
+        virt_net = _virtual_network_payload(
+            name=name,
+            bound_to=bound_to,
+            sz_id=sz_id,
+            vn_type=vn_type,
+            vn_id=vn_id,
+            tag_type=tag_type,
+            ipv4_subnet=ipv4_subnet,
+            ipv4_gateway=ipv4_gateway,
+            ipv6_enabled=ipv6_enabled,
+            ipv6_subnet=ipv6_subnet,
+            ipv6_gateway=ipv6_gateway,
+            tagged_ct=tagged_ct,
+            untagged_ct=untagged_ct,
+        )
 
         vn_task = self.create_virtual_network_from_json(
             bp_id, virt_net, params={"async": "full"}
         )
         logger.info(f"Creating virtual-network '{name}' in blueprint '{bp_id}'")
 
-        repeat_until(
-            lambda: self.is_task_active(bp_id, vn_task["task_id"]) is False,
-            timeout=timeout,
+        job = BlueprintJob(
+            self.task_waiter,
+            bp_id,
+            vn_task["task_id"],
+            resolve=lambda task: self.find_vn_by_name(bp_id, name),
         )
+        if not wait:
+            return job
+        return self.wait_for_jobs([job], timeout=timeout)[0]
 
-        return self.find_vn_by_name(bp_id, name)
-
-    def get_all_virtual_networks(self, bp_id: str) -> List[VirtualNetwork]:
+    def get_all_virtual_networks(
+        self, bp_id: str, lazy: bool = False
+    ) -> List[VirtualNetwork]:
         """
         Return all virtual networks in a given blueprint
         Parameters
         ----------
         bp_id
             (str) - ID of AOS Blueprint
+        lazy
+            (bool) - return LazyVirtualNetwork proxies reading the response
+            on access, see aos.models.lazy
 
         Returns
         -------
             [VirtualNetwork]
         """
-        virt_nets = self.rest.json_resp_get(
-            f"/api/blueprints/{bp_id}/virtual-networks"
+        virt_nets = self._versioned(
+            bp_id,
+            ("virtual-networks",),
+            lambda: self.rest.json_resp_get(
+                f"/api/blueprints/{bp_id}/virtual-networks"
+            ),
         )["virtual_networks"]
 
-        return [VirtualNetwork.from_json(vn) for vn in virt_nets.values()]
+        model = LazyVirtualNetwork if lazy else VirtualNetwork
+        return [model.from_json(vn) for vn in virt_nets.values()]
 
     def get_virtual_network(self, bp_id: str, vn_id: str) -> VirtualNetwork:
         """
@@ -2153,9 +2710,9 @@ class AosBlueprint(AosSubsystem):
         -------
             (obj) - VirtualNetwork
         """
-        for vn in self.get_all_virtual_networks(bp_id):
+        for vn in self.get_all_virtual_networks(bp_id, lazy=True):
             if vn.label == name:
-                return vn
+                return vn.to_model()
 
     def delete_virtual_network(self, bp_id: str, vn_id: str) -> None:
         """
@@ -2172,7 +2729,9 @@ class AosBlueprint(AosSubsystem):
         """
         self.rest.delete(f"/api/blueprints/{bp_id}/virtual_networks/{vn_id}")
 
-    def add_virtual_network_batch(self, bp_id: str, payload: str):
+    def add_virtual_network_batch(
+        self, bp_id: str, payload: str, params: dict = None
+    ):
         """
         Create multiple virtual networks in the given blueprint using a
         preformatted json object.
@@ -2183,6 +2742,9 @@ class AosBlueprint(AosSubsystem):
             (str) - ID of AOS blueprint
         payload
             (str) - json object for payload
+        params
+            (dict) - endpoint parameters, ex: {'async': 'full'} returns the
+            created task ID. Default None
 
         Returns
         -------
@@ -2190,7 +2752,113 @@ class AosBlueprint(AosSubsystem):
         """
         vn_path = f"/api/blueprints/{bp_id}/virtual-networks-batch"
 
-        return self.rest.json_resp_post(uri=vn_path, data=payload)
+        return self.rest.json_resp_post(uri=vn_path, data=payload, params=params)
+
+    def create_virtual_networks(
+        self,
+        bp_id: str,
+        specs: List[dict],
+        batch_size: int = VN_BATCH_SIZE,
+        max_in_flight: int = VN_BATCHES_IN_FLIGHT,
+        timeout: int = 600,
+    ) -> List[VirtualNetwork]:
+        """
+        Create many virtual-networks (VLANs) with virtual-networks-batch
+        requests. All specs are validated before the first request, the
+        batches are sent concurrently, their tasks are waited for together
+        and the created virtual-networks are read with a single list
+        request.
+
+        Batches are applied independently: if one fails the virtual-networks
+        of the other batches are still created.
+
+        Parameters
+        ----------
+        bp_id
+            (str) - ID of blueprint
+        specs
+            (list) - dicts of :meth:`create_virtual_network` arguments
+            (name, bound_to, sz_id or sz_name, vn_type, ...), names must be
+            unique
+        batch_size
+            (int) - virtual-networks per batch request. Default 500
+        max_in_flight
+            (int) - batch requests sent at the same time. Default 4
+        timeout
+            (int) - time (seconds) to wait for all batches
+
+        Returns
+        -------
+            (list) - VirtualNetwork in the order of specs
+
+        Raises
+        ------
+            AosInputError - invalid spec, nothing was created
+            ValueError - unknown security-zone name, nothing was created
+            TimeoutError, aos.tasks.AosTaskError (a batch failed)
+        """
+        payloads = self._virtual_network_payloads(bp_id, specs)
+        if not payloads:
+            return []
+
+        batches = [
+            {"virtual_networks": payloads[i:i + batch_size]}
+            for i in range(0, len(payloads), batch_size)
+        ]
+        logger.info(
+            f"Creating {len(payloads)} virtual-networks in {len(batches)} "
+            f"batches in blueprint '{bp_id}'"
+        )
+        task_futures = self.rest.parallel(
+            (partial(self._watch_virtual_network_batch, bp_id, b) for b in batches),
+            max_in_flight=max_in_flight,
+        )
+        self.task_waiter.wait_all(task_futures, timeout=timeout)
+
+        by_name = {
+            vn.label: vn for vn in self.get_all_virtual_networks(bp_id, lazy=True)
+        }
+        missing = [p["label"] for p in payloads if p["label"] not in by_name]
+        if missing:
+            raise AosAPIResourceNotFound(
+                f"Virtual-networks {missing} not found after creation"
+            )
+        return [by_name[p["label"]].to_model() for p in payloads]
+
+    def _virtual_network_payloads(self, bp_id: str, specs: List[dict]) -> list:
+        sz_ids = {}
+        if any(spec.get("sz_name") for spec in specs):
+            sz_ids = {
+                sz.vrf_name: sz.id
+                for sz in self.get_all_security_zones(bp_id, lazy=True)
+            }
+
+        payloads = []
+        names = set()
+        for i, spec in enumerate(specs):
+            spec = dict(spec)
+            sz_name = spec.pop("sz_name", None)
+            if sz_name:
+                if sz_name not in sz_ids:
+                    raise ValueError(f"Invalid argument '{sz_name}' was passed")
+                spec["sz_id"] = sz_ids[sz_name]
+            try:
+                payload = _virtual_network_payload(**spec)
+            except (TypeError, ValueError) as e:
+                raise AosInputError(f"Invalid virtual-network spec {i}: {e}")
+            if payload["label"] in names:
+                raise AosInputError(
+                    f"Duplicate virtual-network name '{payload['label']}'"
+                )
+            names.add(payload["label"])
+            payloads.append(payload)
+        return payloads
+
+    def _watch_virtual_network_batch(self, bp_id: str, batch: dict):
+        task = self.add_virtual_network_batch(
+            bp_id, batch, params={"async": "full"}
+        )
+        return self.task_waiter.watch(bp_id, task["task_id"])
 
     def get_fabric_addressing_policy(self, bp_id):
         """
@@ -2239,6 +2907,28 @@ class AosBlueprint(AosSubsystem):
         url = f'/api/blueprints/{bp_id}/fabric-addressing-policy'
         return self.rest.patch(url, data=data)
 
+    def get_bp_graph(self, bp_id: str) -> BlueprintGraph:
+        """
+        Download the nodes and relationships of a blueprint into a
+        :class:`aos.graph.BlueprintGraph` answering QE queries locally
+
+        Parameters
+        ----------
+        bp_id
+            (str) - ID of AOS Blueprint
+
+        Returns
+        -------
+            (obj) - BlueprintGraph
+        """
+        status = self.get_diff_status(bp_id)
+        return BlueprintGraph(
+            self.get_bp_nodes(bp_id),
+            self.get_node_relationships(bp_id),
+            bp_id=bp_id,
+            version=(status["staging_version"], status["deployed_version"]),
+        )
+
     def get_node_relationships(
         self,
         bp_id,
@@ -2270,3 +2960,29 @@ class AosBlueprint(AosSubsystem):
         }
 
         return self.rest.json_resp_get(url, params=params)['relationships']
+
+    def iter_node_relationships(self, bp_id: str, relationship_type: str = None):
+        """
+        Stream the relationships of a blueprint one at a time instead of
+        loading the whole response, see :meth:`get_node_relationships`
+
+        Parameters
+        ----------
+        bp_id
+            (str) - ID of AOS Blueprint
+        relationship_type
+            (str) - (optional) type of relationship
+
+        Returns
+        -------
+            (generator) - relationship dicts
+        """
+        params = None
+        if relationship_type:
+            params = {"relationship_type": relationship_type}
+        return self.rest.raw_request_iter(
+            "GET",
+            f"/api/blueprints/{bp_id}/relationships",
+            key="relationships",
+            params=params,
+        )
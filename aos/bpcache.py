@@ -0,0 +1,205 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import logging
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Hashable, Tuple
+
+from .retry import READ_ONLY_POST_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BLUEPRINTS = 8
+DEFAULT_MAX_ENTRIES = 256
+
+_BP_URI = re.compile(r"^/?api/blueprints/([^/?]+)")
+
+
+class _Pin:
+    __slots__ = ("count", "version")
+
+    def __init__(self):
+        self.count = 0
+        self.version = None
+
+
+class _BlueprintEntries:
+    __slots__ = ("version", "entries")
+
+    def __init__(self, version):
+        self.version = version
+        self.entries = OrderedDict()
+
+
+class BlueprintCache:
+    """
+    Cache of blueprint reads keyed on the blueprint version, see
+    :meth:`aos.blueprint.AosBlueprint.enable_version_cache`.
+
+    Every cached read first fetches the blueprint diff-status and only
+    reuses results stored for the same (staging_version, deployed_version),
+    so changes made by other users are never masked. Inside a
+    :meth:`pinned` block the version is checked once for the whole batch.
+    Writes to a blueprint made through the same client drop its entries.
+
+    Cached results are shared between callers and must not be modified.
+
+    Parameters
+    ----------
+    rest
+        (obj) :class:`aos.aos.AosRestAPI`
+    max_blueprints
+        (int) blueprints kept in the cache, least recently used first out.
+        Default 8
+    max_entries
+        (int) cached results per blueprint. Default 256
+    """
+
+    def __init__(
+        self,
+        rest,
+        max_blueprints: int = DEFAULT_MAX_BLUEPRINTS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.rest = rest
+        self.max_blueprints = max_blueprints
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._blueprints = OrderedDict()
+        self._pins = {}
+        self._stats = dict.fromkeys(
+            ["hits", "misses", "version_checks", "invalidations"], 0
+        )
+
+    def version(self, bp_id: str) -> Tuple[int, int]:
+        """
+        Returns
+        -------
+            (tuple) - (staging_version, deployed_version) of the blueprint
+        """
+        with self._lock:
+            pin = self._pins.get(bp_id)
+            if pin is not None and pin.version is not None:
+                return pin.version
+            self._stats["version_checks"] += 1
+
+        status = self.rest.json_resp_get(f"/api/blueprints/{bp_id}/diff-status")
+        version = (status["staging_version"], status["deployed_version"])
+
+        with self._lock:
+            pin = self._pins.get(bp_id)
+            if pin is not None:
+                pin.version = version
+        return version
+
+    @contextmanager
+    def pinned(self, bp_id: str):
+        """
+        Check the blueprint version once for all cached reads made inside
+        the block, ex:
+
+            with aos.blueprint.version_cache.pinned(bp_id):
+                nodes = aos.blueprint.get_bp_nodes(bp_id, "system")
+                vns = aos.blueprint.get_all_virtual_networks(bp_id)
+
+        Changes made by other users during the block are not seen until it
+        exits.
+        """
+        with self._lock:
+            pin = self._pins.setdefault(bp_id, _Pin())
+            pin.count += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                pin.count -= 1
+                if not pin.count:
+                    del self._pins[bp_id]
+
+    def get(self, bp_id: str, key: Hashable, load: Callable):
+        """
+        Return the result cached for `key` at the current blueprint version,
+        or call `load` and cache what it returns.
+        """
+        version = self.version(bp_id)
+        with self._lock:
+            bp = self._blueprint(bp_id, version)
+            if key in bp.entries:
+                bp.entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return bp.entries[key]
+            self._stats["misses"] += 1
+
+        value = load()
+
+        with self._lock:
+            bp = self._blueprints.get(bp_id)
+            # skip if a write or a newer version replaced the entries meanwhile
+            if bp is not None and bp.version == version:
+                bp.entries[key] = value
+                while len(bp.entries) > self.max_entries:
+                    bp.entries.popitem(last=False)
+        return value
+
+    def invalidate(self, bp_id: str = None):
+        """
+        Drop the cached results of a blueprint, or of all blueprints
+        """
+        with self._lock:
+            if bp_id is None:
+                self._blueprints.clear()
+                for pin in self._pins.values():
+                    pin.version = None
+            else:
+                self._blueprints.pop(bp_id, None)
+                pin = self._pins.get(bp_id)
+                if pin is not None:
+                    pin.version = None
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+            (dict) - {"hits": 10, "misses": 2, "version_checks": 3,
+                      "invalidations": 1, "blueprints": 1}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["blueprints"] = len(self._blueprints)
+        return stats
+
+    def _blueprint(self, bp_id, version) -> _BlueprintEntries:
+        bp = self._blueprints.get(bp_id)
+        if bp is None or bp.version != version:
+            if bp is not None:
+                logger.debug(
+                    f"[bp-cache] {bp_id} version {bp.version} -> {version}"
+                )
+            bp = self._blueprints[bp_id] = _BlueprintEntries(version)
+            while len(self._blueprints) > self.max_blueprints:
+                self._blueprints.popitem(last=False)
+        self._blueprints.move_to_end(bp_id)
+        return bp
+
+    # AosRestAPI middleware, see AosRestAPI.add_middleware
+    def post_response(self, request, resp):
+        self._on_request(request)
+
+    def on_error(self, request, error):
+        self._on_request(request)
+
+    def _on_request(self, request):
+        if request.method == "GET":
+            return
+        path = request.uri.split("?", 1)[0].rstrip("/")
+        if request.method == "POST" and path.endswith(READ_ONLY_POST_SUFFIXES):
+            return
+        match = _BP_URI.match(request.uri)
+        if match is not None:
+            self.invalidate(match.group(1))
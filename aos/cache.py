@@ -0,0 +1,257 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from .retry import READ_ONLY_POST_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30.0
+DEFAULT_MAXSIZE = 256
+
+# Path segments of state polled by the client itself, never cached: task
+# status (aos.tasks.TaskWaiter) and diff-status (aos.bpcache.BlueprintCache)
+UNCACHED_SEGMENTS = frozenset(["tasks", "diff-status"])
+
+# Resources of a blueprint derive from each other, ex: a POST to
+# virtual-networks-batch changes the virtual-networks list, so a write
+# anywhere under a blueprint invalidates all of it like aos.bpcache does
+_BLUEPRINT_PATH = re.compile(r"^/api/blueprints/[^/]+")
+
+
+def _freeze(value):
+    """
+    Hashable equivalent of request params, lists and dicts become tuples
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def cache_path(uri: str) -> str:
+    """
+    Path of an AOS api uri used to match TTLs and invalidations, ex:
+    "api/design/templates/?x=1" -> "/api/design/templates"
+    """
+    return "/" + uri.split("?", 1)[0].strip("/")
+
+
+class CacheEntry:
+    __slots__ = ("path", "response", "size", "expires", "etag", "last_modified")
+
+    def __init__(self, path, response, size, expires):
+        self.path = path
+        self.response = response
+        self.size = size
+        self.expires = expires
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+
+    @property
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    In memory cache of GET responses for :class:`aos.aos.AosRestAPI`.
+
+    Fresh entries are served without contacting AOS. Expired entries with
+    an ETag or Last-Modified header are revalidated with a conditional
+    request and reused when AOS answers 304 Not Modified. Writes made
+    through the same client evict the cached responses of the written path,
+    its children and its parents, ex: a POST to /api/design/templates drops
+    the cached template list. A write under a blueprint evicts everything
+    cached for that blueprint. Blueprint tasks and diff-status are never
+    cached.
+
+    Parameters
+    ----------
+    ttl
+        (float) seconds a response is served without revalidation.
+        Default 30
+    maxsize
+        (int) maximum number of cached responses, the least recently used
+        are evicted first. Default 256
+    max_bytes
+        (int) maximum total size of cached response bodies.
+        Default None (no limit)
+    ttls
+        (dict) per path prefix TTLs overriding `ttl`, the longest matching
+        prefix wins. A TTL of 0 disables caching, ex:
+        {"/api/design": 300, "/api/blueprints": 0}
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        maxsize: int = DEFAULT_MAXSIZE,
+        max_bytes: int = None,
+        ttls: Dict[str, float] = None,
+        clock=time.monotonic,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttls = sorted(
+            ((cache_path(prefix), value) for prefix, value in (ttls or {}).items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = dict.fromkeys(
+            ["hits", "misses", "revalidated", "evictions", "invalidations"], 0
+        )
+
+    @staticmethod
+    def key(url: str, params=None) -> tuple:
+        return url, _freeze(params)
+
+    def cacheable(self, uri: str) -> bool:
+        return self.ttl_for(cache_path(uri)) > 0
+
+    def ttl_for(self, path: str) -> float:
+        if not UNCACHED_SEGMENTS.isdisjoint(path.split("/")):
+            return 0
+        for prefix, ttl in self.ttls:
+            if path == prefix or path.startswith(prefix + "/"):
+                return ttl
+        return self.ttl
+
+    def lookup(self, key) -> Tuple[Optional[requests.Response], dict]:
+        """
+        Returns
+        -------
+            (tuple) - (fresh cached response or None,
+                       conditional request headers for a stale response)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None, {}
+            self._entries.move_to_end(key)
+            if entry.expires > self.clock():
+                self._stats["hits"] += 1
+                return entry.response, {}
+            self._stats["misses"] += 1
+            validators = entry.validators
+            if not validators:
+                self._remove(key)
+            return None, validators
+
+    def update(self, key, uri: str, resp: requests.Response) -> requests.Response:
+        """
+        Store a GET response, or return the cached response confirmed by a
+        304 Not Modified answer
+        """
+        path = cache_path(uri)
+        ttl = self.ttl_for(path)
+        with self._lock:
+            if resp.status_code == 304:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._stats["revalidated"] += 1
+                    entry.expires = self.clock() + ttl
+                    return entry.response
+                return resp
+
+            if (
+                resp.status_code != 200
+                or ttl <= 0
+                or "no-store" in resp.headers.get("Cache-Control", "")
+            ):
+                self._remove(key)
+                return resp
+
+            self._remove(key)
+            entry = CacheEntry(path, resp, len(resp.content), self.clock() + ttl)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+        return resp
+
+    def invalidate(self, method: str, uri: str) -> int:
+        """
+        Drop cached responses affected by a write to `uri`
+
+        Returns
+        -------
+            (int) number of dropped responses
+        """
+        path = cache_path(uri)
+        if method.upper() == "POST" and path.endswith(READ_ONLY_POST_SUFFIXES):
+            return 0
+        blueprint = _BLUEPRINT_PATH.match(path)
+        if blueprint:
+            path = blueprint.group(0)
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if entry.path == path
+                or entry.path.startswith(path + "/")
+                or path.startswith(entry.path + "/")
+            ]
+            for key in stale:
+                self._remove(key)
+            self._stats["invalidations"] += len(stale)
+        if stale:
+            logger.debug(f"[cache] {method} {path} invalidated {len(stale)} entries")
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+            (dict) - {"hits": 10, "misses": 2, "revalidated": 1,
+                      "evictions": 0, "invalidations": 1, "entries": 3,
+                      "bytes": 2048}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.maxsize
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats["evictions"] += 1
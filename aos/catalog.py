@@ -0,0 +1,252 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .cache import cache_path
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogIndex:
+    """
+    Items of one AOS collection indexed by id and by name
+    """
+
+    __slots__ = (
+        "path",
+        "name_key",
+        "by_id",
+        "by_name",
+        "loaded_at",
+        "stale",
+        "lock",
+    )
+
+    def __init__(self, path: str, name_key: str):
+        self.path = path
+        self.name_key = name_key
+        self.by_id = {}
+        self.by_name = {}
+        self.loaded_at = None
+        self.stale = True
+        self.lock = threading.Lock()
+
+    def load(self, items: List[dict], now: float):
+        by_id = {}
+        by_name = {}
+        for item in items:
+            by_id[item["id"]] = item
+            by_name.setdefault(item.get(self.name_key), []).append(item)
+        # swap whole dicts so concurrent readers never see a partial index
+        self.by_id, self.by_name = by_id, by_name
+        self.loaded_at = now
+        self.stale = False
+
+
+class AosCatalog:
+    """
+    Shared name and id index of AOS design and resource collections used by
+    the `find_by_name` methods of :class:`aos.design.AosTemplate`,
+    :class:`aos.resources.AosIPPool`, etc. Each collection is loaded once
+    and looked up in O(1) afterwards:
+
+        catalog = AosCatalog(max_age=300).attach(aos.rest)
+        aos.design.templates.find_by_name("L2_Virtual_EVPN")
+
+    Writes made through the same client mark the written collection stale,
+    it is then reloaded on the next lookup.
+
+    Parameters
+    ----------
+    max_age
+        (float) seconds after which a collection is reloaded on the next
+        lookup. Default None (only reloaded after writes or
+        :meth:`refresh`)
+    refresh_interval
+        (float) reload loaded collections in a background thread every
+        `refresh_interval` seconds. Default None (no background refresh)
+    """
+
+    def __init__(
+        self,
+        max_age: float = None,
+        refresh_interval: float = None,
+        clock=time.monotonic,
+    ):
+        self.rest = None
+        self.max_age = max_age
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, CatalogIndex] = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = dict.fromkeys(["lookups", "loads"], 0)
+
+    def attach(self, rest) -> "AosCatalog":
+        self.rest = rest
+        rest.catalog = self
+        rest.add_middleware(self)
+        if self.refresh_interval:
+            self._start()
+        return self
+
+    def detach(self, rest) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        rest.remove_middleware(self)
+        if rest.catalog is self:
+            rest.catalog = None
+
+    def _index(self, path: str, name_key: str) -> CatalogIndex:
+        path = cache_path(path)
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is None:
+                index = self._indexes[path] = CatalogIndex(path, name_key)
+            return index
+
+    def _expired(self, index: CatalogIndex) -> bool:
+        return index.stale or (
+            self.max_age is not None
+            and self.clock() - index.loaded_at >= self.max_age
+        )
+
+    def _load(self, index: CatalogIndex):
+        resp = self.rest.json_resp_get(index.path)
+        index.load(resp["items"] if resp else [], self.clock())
+        with self._lock:
+            self._stats["loads"] += 1
+        logger.debug(f"[catalog] loaded {len(index.by_id)} items of {index.path}")
+
+    def _fresh(self, path: str, name_key: str) -> CatalogIndex:
+        index = self._index(path, name_key)
+        if self._expired(index):
+            with index.lock:
+                # another thread may have loaded it while we waited
+                if self._expired(index):
+                    self._load(index)
+        with self._lock:
+            self._stats["lookups"] += 1
+        return index
+
+    def find(
+        self,
+        path: str,
+        name: str,
+        from_json: Callable = None,
+        name_key: str = "display_name",
+    ) -> list:
+        """
+        Return the items of collection `path` named `name`
+
+        Parameters
+        ----------
+        path
+            (str) AOS api collection, ex: "/api/design/templates"
+        name
+            (str) name to look up
+        from_json
+            (callable) builds the returned objects from the item json.
+            Default None (return the json)
+        name_key
+            (str) item key holding the name. Default "display_name"
+        """
+        items = self._fresh(path, name_key).by_name.get(name, [])
+        if from_json is None:
+            return list(items)
+        return [from_json(item) for item in items]
+
+    def get(
+        self,
+        path: str,
+        item_id: str,
+        from_json: Callable = None,
+        name_key: str = "display_name",
+    ) -> Optional[object]:
+        """
+        Return the item of collection `path` with id `item_id`, or None
+        """
+        item = self._fresh(path, name_key).by_id.get(item_id)
+        if item is None or from_json is None:
+            return item
+        return from_json(item)
+
+    def id_by_name(
+        self, path: str, name: str, name_key: str = "display_name"
+    ) -> Optional[str]:
+        """
+        Return the id of the first item of collection `path` named `name`
+        """
+        items = self._fresh(path, name_key).by_name.get(name)
+        return items[0]["id"] if items else None
+
+    def refresh(self, path: str = None):
+        """
+        Reload one collection, or all loaded collections, now
+        """
+        with self._lock:
+            if path is None:
+                indexes = [i for i in self._indexes.values() if i.loaded_at]
+            else:
+                indexes = [self._indexes.get(cache_path(path))]
+        for index in indexes:
+            if index is None:
+                continue
+            with index.lock:
+                self._load(index)
+
+    def invalidate(self, path: str = None):
+        """
+        Mark one collection, or all collections, for reload on next lookup
+        """
+        with self._lock:
+            for index in self._indexes.values():
+                if path is None or index.path == cache_path(path):
+                    index.stale = True
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+            (dict) - {"lookups": 1000, "loads": 2,
+                      "collections": {"/api/design/templates": 12}}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["collections"] = {
+                path: len(index.by_id) for path, index in self._indexes.items()
+            }
+        return stats
+
+    def _start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, name="aos-catalog-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("[catalog] background refresh failed")
+
+    # AosRestAPI middleware, see AosRestAPI.add_middleware
+    def post_response(self, request, resp):
+        if request.method == "GET":
+            return
+        path = cache_path(request.uri)
+        with self._lock:
+            for index in self._indexes.values():
+                if path == index.path or path.startswith(index.path + "/"):
+                    index.stale = True
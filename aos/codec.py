@@ -0,0 +1,126 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import json
+import logging
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+# Preferred order of codecs used with json_codec="auto"
+AUTO_ORDER = ("orjson", "msgspec", "ujson", "json")
+
+
+class JsonCodec:
+    """
+    Encode and decode AOS api request and response bodies.
+
+    `loads` must raise ValueError (or TypeError) for invalid documents, so
+    errors are handled the same whatever library is used.
+    """
+
+    name = "json"
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson  # pylint: disable=import-outside-toplevel
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj) -> bytes:
+        return self._orjson.dumps(obj, option=self._options)
+
+    def loads(self, data: bytes):
+        # orjson.JSONDecodeError is a ValueError
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec  # pylint: disable=import-outside-toplevel
+
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes):
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+class UjsonCodec(JsonCodec):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson  # pylint: disable=import-outside-toplevel
+
+        self._ujson = ujson
+
+    def dumps(self, obj) -> bytes:
+        return self._ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return self._ujson.loads(data)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "ujson": UjsonCodec,
+}
+
+
+def get_codec(codec: Union[str, JsonCodec] = "auto") -> JsonCodec:
+    """
+    Return the JSON codec named `codec`.
+
+    Parameters
+    ----------
+    codec
+        (str) one of "json" (stdlib), "orjson", "msgspec", "ujson" or
+        "auto" for the fastest installed library. A :class:`JsonCodec`
+        instance is returned unchanged.
+
+    Raises
+    ------
+        ValueError - unknown codec name
+        ImportError - the library of the requested codec is not installed
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+
+    if codec == "auto":
+        for name in AUTO_ORDER:
+            try:
+                return CODECS[name]()
+            except ImportError:
+                logger.debug(f"JSON codec {name} is not installed")
+
+    if codec not in CODECS:
+        raise ValueError(
+            f"Unknown JSON codec '{codec}', expected one of "
+            f"{', '.join(['auto'] + list(CODECS))}"
+        )
+    return CODECS[codec]()
@@ -0,0 +1,194 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import logging
+from typing import Dict, Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+
+# Output formats of columnar results, "auto" picks the first installed one
+FORMATS = ("columns", "numpy", "pandas")
+AUTO_ORDER = ("pandas", "numpy", "columns")
+
+# column name -> dotted path of the value in the item json
+Columns = Union[Iterable[str], Dict[str, str]]
+
+SYSTEM_COLUMNS = {
+    "id": "id",
+    "device_key": "device_key",
+    "hostname": "status.hostname",
+    "mgmt_ipaddr": "facts.mgmt_ipaddr",
+    "vendor": "facts.vendor",
+    "hw_model": "facts.hw_model",
+    "os_family": "facts.os_family",
+    "os_version": "facts.os_version",
+    "comm_state": "status.comm_state",
+    "state": "status.state",
+    "admin_state": "user_config.admin_state",
+}
+
+ANOMALY_COLUMNS = {
+    "id": "id",
+    "type": "anomaly_type",
+    "severity": "severity",
+    "role": "role",
+    "system_id": "identity.system_id",
+}
+
+
+class ColumnBuilder:
+    """
+    Collects items json into one list per column, without keeping the
+    items. Nested values are selected with dotted paths, missing values
+    are None.
+
+    Parameters
+    ----------
+    columns
+        (list or dict) column names, which are also the paths of their
+        values, or a {column name: path} dict, ex:
+        {"hw_model": "facts.hw_model"}. Default None (one column per top
+        level key found in the items)
+    """
+
+    def __init__(self, columns: Columns = None):
+        self.rows = 0
+        self.columns: Dict[str, list] = {}
+        self._paths = None
+        if columns is not None:
+            if not isinstance(columns, dict):
+                columns = {name: name for name in columns}
+            self._paths = {
+                name: tuple(path.split(".")) for name, path in columns.items()
+            }
+            self.columns = {name: [] for name in columns}
+
+    def add(self, item: dict):
+        if self._paths is None:
+            self._add_keys(item)
+        else:
+            for name, path in self._paths.items():
+                value = item
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                self.columns[name].append(value)
+        self.rows += 1
+
+    def _add_keys(self, item: dict):
+        columns = self.columns
+        for key in item:
+            if key not in columns:
+                # first seen on this row, earlier rows miss it
+                columns[key] = [None] * self.rows
+        for key, values in columns.items():
+            values.append(item.get(key))
+
+    def extend(self, items: Iterable[dict]) -> "ColumnBuilder":
+        for item in items:
+            self.add(item)
+        return self
+
+
+def to_columns(items: Iterable[dict], columns: Columns = None) -> Dict[str, list]:
+    """
+    Returns
+    -------
+        (dict) - {column name: [values]} of the items, see
+        :class:`ColumnBuilder`
+    """
+    return ColumnBuilder(columns).extend(items).columns
+
+
+def to_numpy(columns: Dict[str, list]):
+    """
+    Return columns as a NumPy structured array, one field per column.
+    Numbers with missing values become float columns with NaN, strings
+    unicode columns and anything else (mixed, dicts, lists) object columns.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    arrays = [_numpy_array(np, values) for values in columns.values()]
+    size = len(arrays[0]) if arrays else 0
+    out = np.empty(
+        size, dtype=[(name, a.dtype) for name, a in zip(columns, arrays)]
+    )
+    for name, array in zip(columns, arrays):
+        out[name] = array
+    return out
+
+
+def _numpy_array(np, values: List):
+    kinds = {type(v) for v in values}
+    if kinds and kinds <= {int, float, type(None)} and kinds != {type(None)}:
+        if type(None) in kinds or float in kinds:
+            return np.array(values, dtype=float)
+        return np.array(values, dtype=np.int64)
+    if kinds == {bool}:
+        return np.array(values, dtype=bool)
+    if kinds == {str}:
+        return np.array(values, dtype=str)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def to_pandas(columns: Dict[str, list], categorical: bool = True):
+    """
+    Return columns as a pandas DataFrame
+
+    Parameters
+    ----------
+    categorical
+        (bool) store string columns repeating their values, ex: severity
+        or system id, as categories. Comparisons and groupby run on the
+        integer codes, many times faster than on objects. Default True
+    """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    frame = pd.DataFrame(columns)
+    if categorical:
+        for name, values in columns.items():
+            if _repeated_strings(values):
+                frame[name] = frame[name].astype("category")
+    return frame
+
+
+def _repeated_strings(values: List) -> bool:
+    if not all(v is None or isinstance(v, str) for v in values):
+        return False
+    return len(set(values)) <= len(values) // 2
+
+
+def convert(columns: Dict[str, list], fmt: str = "columns"):
+    """
+    Return columns in format `fmt`
+
+    Parameters
+    ----------
+    fmt
+        (str) "columns" (dict of lists), "numpy" (structured array),
+        "pandas" (DataFrame) or "auto" (the first of pandas and numpy
+        installed, else "columns")
+
+    Raises
+    ------
+        ValueError - unknown format
+        ImportError - numpy or pandas is requested and not installed
+    """
+    if fmt == "auto":
+        for name in AUTO_ORDER:
+            try:
+                return convert(columns, name)
+            except ImportError:
+                logger.debug(f"{name} is not installed")
+    if fmt == "columns":
+        return columns
+    if fmt == "numpy":
+        return to_numpy(columns)
+    if fmt == "pandas":
+        return to_pandas(columns)
+    raise ValueError(
+        f"Unknown columnar format '{fmt}', expected one of "
+        f"{', '.join(('auto',) + FORMATS)}"
+    )
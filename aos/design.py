@@ -4,9 +4,10 @@
 # LICENSE file at http://www.apstra.com/eula
 import logging
 from dataclasses import dataclass
-from typing import Optional, List, Generator, Dict
+from typing import Optional, List, Dict
 
 from .aos import AosSubsystem, AosAPIError
+from .paging import PagedIterator
 from aos.repeat import repeat_until
 
 logger = logging.getLogger(__name__)
@@ -47,7 +48,7 @@ class AosLogicalDevices(AosSubsystem):
     Use `blueprint.apply_configlet` to apply to blueprint
     """
 
-    def get_all(self):
+    def get_all(self, page_size: int = None):
         """
         Return all logical devices configured from AOS
 
@@ -55,9 +56,16 @@ class AosLogicalDevices(AosSubsystem):
         -------
             (obj) json response
         """
-        ld_path = "/api/design/logical-devices"
-        resp = self.rest.json_resp_get(ld_path)
-        return resp["items"]
+        return list(self.iter_all(page_size))
+
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        """
+        Iterate over all logical devices, fetching `page_size` items per
+        request (default: all in one request)
+        """
+        return PagedIterator(
+            self.rest, "/api/design/logical-devices", page_size=page_size
+        )
 
     def get_logical_device(self, ld_id: str = None, ld_name: str = None):
         """
@@ -176,13 +184,20 @@ class AosInterfaceMap(AosSubsystem):
             self.rest.json_resp_get(f"/api/design/interface-maps/{im_id}")
         )
 
-    def iter_all(self) -> Generator[InterfaceMap, None, None]:
-        ims = self.rest.json_resp_get("/api/design/interface-maps")
-        if ims:
-            for i in ims["items"]:
-                yield InterfaceMap.from_json(i)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/design/interface-maps",
+            page_size=page_size,
+            transform=InterfaceMap.from_json,
+        )
 
     def find_by_name(self, im_name: str) -> List[InterfaceMap]:
+        found = self._catalog_find(
+            "/api/design/interface-maps", im_name, InterfaceMap.from_json, "label"
+        )
+        if found is not None:
+            return found
         return [i for i in self.iter_all() if i.label == im_name]
 
 
@@ -266,13 +281,20 @@ class AosRackType(AosSubsystem):
             self.rest.json_resp_get(f"/api/design/rack-types/{rt_id}")
         )
 
-    def iter_all(self) -> Generator[RackType, None, None]:
-        rts = self.rest.json_resp_get("/api/design/rack-types")
-        if rts:
-            for r in rts["items"]:
-                yield RackType.from_json(r)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/design/rack-types",
+            page_size=page_size,
+            transform=RackType.from_json,
+        )
 
     def find_by_name(self, rt_name: str) -> List[RackType]:
+        found = self._catalog_find(
+            "/api/design/rack-types", rt_name, RackType.from_json
+        )
+        if found is not None:
+            return found
         return [r for r in self.iter_all() if r.display_name == rt_name]
 
 
@@ -339,13 +361,20 @@ class AosTemplate(AosSubsystem):
             self.rest.json_resp_get(f"/api/design/templates/{template_id}")
         )
 
-    def iter_all(self) -> Generator[Template, None, None]:
-        temps = self.rest.json_resp_get("/api/design/templates")
-        if temps:
-            for t in temps["items"]:
-                yield Template.from_json(t)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/design/templates",
+            page_size=page_size,
+            transform=Template.from_json,
+        )
 
     def find_by_name(self, template_name: str) -> List[Template]:
+        found = self._catalog_find(
+            "/api/design/templates", template_name, Template.from_json
+        )
+        if found is not None:
+            return found
         return [t for t in self.iter_all() if t.display_name == template_name]
 
 
@@ -356,7 +385,7 @@ class AosConfiglets(AosSubsystem):
     Use `blueprint.apply_configlet` to apply to blueprint
     """
 
-    def get_all(self):
+    def get_all(self, page_size: int = None):
         """
         Return all configlets configured from AOS
 
@@ -364,9 +393,16 @@ class AosConfiglets(AosSubsystem):
         -------
             (obj) json response
         """
-        t_path = "/api/design/configlets"
-        resp = self.rest.json_resp_get(t_path)
-        return resp["items"]
+        return list(self.iter_all(page_size))
+
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        """
+        Iterate over all configlets, fetching `page_size` items per
+        request (default: all in one request)
+        """
+        return PagedIterator(
+            self.rest, "/api/design/configlets", page_size=page_size
+        )
 
     def get_configlet(self, conf_id: str = None, conf_name: str = None):
         """
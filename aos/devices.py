@@ -6,8 +6,11 @@ import logging
 import time
 from collections import namedtuple
 from dataclasses import dataclass
-from typing import List, Generator, Optional
+from typing import List, Optional
 from .aos import AosSubsystem, AosAPIError
+from .columnar import SYSTEM_COLUMNS, ColumnBuilder, Columns, convert
+from .models import compact, lazy as lazy_model
+from .paging import PagedIterator
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +26,7 @@ class Anomaly:
     def from_json(cls, anomaly: dict):
         if anomaly is None:
             return NullAnomaly
-        return Anomaly(
+        return cls(
             type=anomaly["anomaly_type"],
             id=anomaly["id"],
             system_id=anomaly.get("identity", {}).get("system_id"),
@@ -32,6 +35,7 @@ class Anomaly:
 
 
 NullAnomaly = Anomaly(type="", id="", system_id="", severity="")
+CompactAnomaly = compact(Anomaly)
 
 
 DevicePackage = namedtuple("Package", ["name", "version"])
@@ -55,7 +59,7 @@ class System:
     def from_json(cls, d: Optional[dict]):
         if d is None:
             return NullSystem
-        return System(
+        return cls(
             id=d["id"],
             container_status=d.get("container_status", {}),
             device_key=d["device_key"],
@@ -76,6 +80,12 @@ NullSystem = System(
     user_config={},
 )
 
+CompactSystem = compact(
+    System,
+    raw_fields=["container_status", "facts", "services", "status", "user_config"],
+)
+LazySystem = lazy_model(System)
+
 
 @dataclass
 class SystemAgent:
@@ -97,7 +107,7 @@ class SystemAgent:
         device_facts = s.get("device_facts", {})
         status = s.get("status", {})
 
-        return SystemAgent(
+        return cls(
             agent_uuid=s["id"],
             hostname=device_facts.get("hostname"),
             is_offbox=config.get("agent_type", "onbox") == "offbox",
@@ -121,6 +131,7 @@ NullSystemAgent = SystemAgent(
     platform="",
     system_id="",
 )
+CompactSystemAgent = compact(SystemAgent)
 
 
 class AosDevices(AosSubsystem):
@@ -147,25 +158,65 @@ class AosManagedDevices(AosSubsystem):
             f"/api/systems/{system_id}/accept-running-config-as-golden"
         )
 
-    def get_all(self) -> List[System]:
-        return list(self.iter_all())
+    def get_all(self, page_size: int = None, lazy: bool = False) -> List[System]:
+        return list(self.iter_all(page_size, lazy))
+
+    def iter_all(self, page_size: int = None, lazy: bool = False) -> PagedIterator:
+        """
+        Iterate over all managed devices, fetching `page_size` systems per
+        request (default: all in one request), see
+        :class:`aos.paging.PagedIterator`. With `lazy`, LazySystem proxies
+        reading the response on access are returned, see aos.models.lazy
+        """
+        return PagedIterator(
+            self.rest,
+            "/api/systems",
+            page_size=page_size,
+            transform=LazySystem.from_json if lazy else System.from_json,
+        )
+
+    def get_all_columns(
+        self, columns: Columns = None, fmt: str = "columns", page_size: int = None
+    ):
+        """
+        Return all managed devices as columns instead of System objects, ex:
+
+            df = aos.devices.managed_devices.get_all_columns(fmt="pandas")
+            df[df.comm_state != "on"].groupby("hw_model").size()
 
-    def iter_all(self) -> Generator[System, None, None]:
-        systems = self.rest.json_resp_get("/api/systems")
+        Parameters
+        ----------
+        columns
+            (list or dict) columns to return, see
+            :class:`aos.columnar.ColumnBuilder`.
+            Default aos.columnar.SYSTEM_COLUMNS
+        fmt
+            (str) "columns", "numpy", "pandas" or "auto",
+            see :func:`aos.columnar.convert`
+        page_size
+            (int) systems fetched per request, see
+            :class:`aos.paging.PagedIterator`
 
-        for s in systems.get("items", []):
-            yield System.from_json(s)
+        Returns
+        -------
+            (obj) dict of lists, numpy structured array or pandas DataFrame
+        """
+        builder = ColumnBuilder(SYSTEM_COLUMNS if columns is None else columns)
+        builder.extend(PagedIterator(self.rest, "/api/systems", page_size=page_size))
+        return convert(builder.columns, fmt)
 
     def get_system_by_id(self, system_id: str) -> Optional[System]:
         return System.from_json(self.rest.json_resp_get(f"/api/systems/{system_id}"))
 
-    def iter_anomalies(self, system_id: str) -> Generator[Anomaly, None, None]:
-        anomalies = self.rest.json_resp_get(f"api/systems/{system_id}/anomalies")
-        if anomalies is None:
-            return
-
-        for anomaly in anomalies["items"]:
-            yield Anomaly.from_json(anomaly)
+    def iter_anomalies(
+        self, system_id: str, page_size: int = None
+    ) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            f"api/systems/{system_id}/anomalies",
+            page_size=page_size,
+            transform=Anomaly.from_json,
+        )
 
     def get_anomalies(self, system_id: str) -> List[Anomaly]:
         return list(self.iter_anomalies(system_id))
@@ -180,9 +231,9 @@ class AosManagedDevices(AosSubsystem):
         return False
 
     def find_system_with_ip(self, ip_addr: str) -> Optional[System]:
-        for system in self.iter_all():
+        for system in self.iter_all(lazy=True):
             if system.facts["mgmt_ipaddr"] == ip_addr:
-                return system
+                return system.to_model()
         return NullSystem
 
     def delete(self, agent_uuid: str) -> None:
@@ -202,14 +253,16 @@ class AosSystemAgents(AosSubsystem):
     def create_system_agent(self, data) -> bool:
         return self.rest.json_resp_post("/api/system-agents", data=data)
 
-    def get_all(self) -> List[SystemAgent]:
-        return list(self.iter_all())
+    def get_all(self, page_size: int = None) -> List[SystemAgent]:
+        return list(self.iter_all(page_size))
 
-    def iter_all(self) -> Generator[SystemAgent, None, None]:
-        system_agents = self.rest.json_resp_get("/api/system-agents")
-
-        for s in system_agents.get("items", []):
-            yield SystemAgent.from_json(s)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/system-agents",
+            page_size=page_size,
+            transform=SystemAgent.from_json,
+        )
 
     def get_agent_by_id(self, system_id: str) -> Optional[SystemAgent]:
         return SystemAgent.from_json(
@@ -5,7 +5,8 @@
 import logging
 from dataclasses import dataclass
 from .aos import AosSubsystem
-from typing import Optional, List, Generator
+from .paging import PagedIterator
+from typing import Optional, List
 
 logger = logging.getLogger(__name__)
 
@@ -69,11 +70,18 @@ class AosExternalRouter(AosSubsystem):
             self.rest.json_resp_get(f"/api/resources/external-routers/{rtr_id}")
         )
 
-    def iter_all(self) -> Generator[ExternalRouter, None, None]:
-        rtrs = self.rest.json_resp_get("/api/resources/external-routers")
-        if rtrs:
-            for r in rtrs["items"]:
-                yield ExternalRouter.from_json(r)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/resources/external-routers",
+            page_size=page_size,
+            transform=ExternalRouter.from_json,
+        )
 
     def find_by_name(self, rtr_name: str) -> List[ExternalRouter]:
+        found = self._catalog_find(
+            "/api/resources/external-routers", rtr_name, ExternalRouter.from_json
+        )
+        if found is not None:
+            return found
         return [r for r in self.iter_all() if r.display_name == rtr_name]
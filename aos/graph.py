@@ -0,0 +1,531 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import ast
+import logging
+import threading
+from collections import defaultdict, namedtuple
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .aos import AosInputError
+
+logger = logging.getLogger(__name__)
+
+# Node properties with a dedicated index
+INDEXED_PROPERTIES = ("type", "label", "role")
+
+
+class GraphQueryError(AosInputError):
+    """
+    The query uses QE constructs not supported by :class:`BlueprintGraph`
+    """
+
+
+class _Predicate:
+    __slots__ = ("name", "test")
+
+    def __init__(self, name, test):
+        self.name = name
+        self.test = test
+
+    def __call__(self, value) -> bool:
+        return self.test(value)
+
+    def __repr__(self):
+        return self.name
+
+
+def _is_in(values):
+    values = list(values)
+    return _Predicate(f"is_in({values!r})", lambda v: v in values)
+
+
+def _not_in(values):
+    values = list(values)
+    return _Predicate(f"not_in({values!r})", lambda v: v not in values)
+
+
+def _ne(other):
+    return _Predicate(f"ne({other!r})", lambda v: v != other)
+
+
+def _eq(other):
+    return _Predicate(f"eq({other!r})", lambda v: v == other)
+
+
+PREDICATES = {
+    "is_in": _is_in,
+    "not_in": _not_in,
+    "ne": _ne,
+    "eq": _eq,
+    "is_none": lambda: _Predicate("is_none()", lambda v: v is None),
+    "not_none": lambda: _Predicate("not_none()", lambda v: v is not None),
+}
+
+
+class NodeSpec:
+    __slots__ = ("name", "props")
+
+    def __init__(self, name: Optional[str], props: dict):
+        self.name = name
+        self.props = props
+
+    def matches(self, node: dict) -> bool:
+        for key, expected in self.props.items():
+            value = node.get(key)
+            if isinstance(expected, _Predicate):
+                if not expected(value):
+                    return False
+            elif value != expected:
+                return False
+        return True
+
+
+class EdgeSpec:
+    __slots__ = ("name", "props", "outgoing")
+
+    def __init__(self, name: Optional[str], props: dict, outgoing: bool):
+        self.name = name
+        self.props = props
+        self.outgoing = outgoing
+
+    matches = NodeSpec.matches
+
+
+def _literal(node):
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        factory = PREDICATES.get(node.func.id)
+        if factory is None:
+            raise GraphQueryError(f"Unsupported predicate '{node.func.id}'")
+        return factory(*[_literal(arg) for arg in node.args])
+    try:
+        return ast.literal_eval(node)
+    except ValueError as e:
+        raise GraphQueryError(
+            f"Unsupported query value '{ast.dump(node)}'"
+        ) from e
+
+
+def _spec_args(call: ast.Call, what: str):
+    if len(call.args) > 1:
+        raise GraphQueryError(f"{what}() takes at most one positional argument")
+    props = {kw.arg: _literal(kw.value) for kw in call.keywords}
+    if None in props:
+        raise GraphQueryError(f"{what}(**kwargs) is not supported")
+    if call.args:
+        props["type"] = _literal(call.args[0])
+    name = props.pop("name", None)
+    return name, props
+
+
+def _parse_path(expr) -> list:
+    """
+    Flatten node(...).out(...).node(...) into [NodeSpec, EdgeSpec, ...]
+    """
+    if not isinstance(expr, ast.Call):
+        raise GraphQueryError(f"Unsupported query expression '{ast.dump(expr)}'")
+
+    if isinstance(expr.func, ast.Name):
+        if expr.func.id != "node":
+            raise GraphQueryError(f"Unsupported path start '{expr.func.id}'")
+        return [NodeSpec(*_spec_args(expr, "node"))]
+
+    if not isinstance(expr.func, ast.Attribute):
+        raise GraphQueryError(f"Unsupported query expression '{ast.dump(expr)}'")
+
+    path = _parse_path(expr.func.value)
+    method = expr.func.attr
+    if method == "node":
+        if isinstance(path[-1], NodeSpec):
+            raise GraphQueryError("node() must follow out() or in_()")
+        path.append(NodeSpec(*_spec_args(expr, "node")))
+    elif method in ("out", "in_"):
+        if isinstance(path[-1], EdgeSpec):
+            path.append(NodeSpec(None, {}))
+        name, props = _spec_args(expr, method)
+        path.append(EdgeSpec(name, props, outgoing=method == "out"))
+    else:
+        raise GraphQueryError(f"Unsupported query method '{method}'")
+    return path
+
+
+def parse_query(query: str) -> List[list]:
+    """
+    Parse a QE query into paths of node and edge specs.
+
+    Supported: `match(path, ...)` or a single path, where a path is
+    `node(type, name=..., prop=value)` followed by `.out(type)`,
+    `.in_(type)` and `.node(...)` steps. Property values are literals or
+    one of is_in, not_in, ne, eq, is_none and not_none.
+
+    Raises
+    ------
+        GraphQueryError - the query uses unsupported constructs
+    """
+    try:
+        expr = ast.parse(query.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise GraphQueryError(f"Invalid query '{query}': {e}") from e
+
+    if (
+        isinstance(expr, ast.Call)
+        and isinstance(expr.func, ast.Name)
+        and expr.func.id == "match"
+    ):
+        if expr.keywords:
+            raise GraphQueryError("match() keyword arguments are not supported")
+        paths = [_parse_path(arg) for arg in expr.args]
+    else:
+        paths = [_parse_path(expr)]
+
+    for path in paths:
+        if isinstance(path[-1], EdgeSpec):
+            path.append(NodeSpec(None, {}))
+    return paths
+
+
+class BlueprintGraph:
+    """
+    In memory copy of a blueprint graph answering common QE queries
+    locally, see :meth:`aos.blueprint.AosBlueprint.get_bp_graph`:
+
+        graph = aos.blueprint.get_bp_graph(bp_id)
+        graph.query("match(node('system', role='leaf', name='leaf'))")
+
+    Nodes are indexed by id, type, label and role, relationships by source
+    and target. Queries outside of the subset documented in
+    :func:`parse_query` raise :class:`GraphQueryError`; send those to AOS
+    with `qe_query`.
+
+    Parameters
+    ----------
+    nodes
+        (dict) node id to node, as returned by `get_bp_nodes`
+    relationships
+        (dict) relationship id to relationship, as returned by
+        `get_node_relationships`
+    bp_id
+        (str) ID of the blueprint
+    version
+        (tuple) (staging_version, deployed_version) of the copy
+    """
+
+    def __init__(
+        self,
+        nodes: Dict[str, dict],
+        relationships: Dict[str, dict],
+        bp_id: str = None,
+        version: tuple = None,
+    ):
+        self.bp_id = bp_id
+        self.version = version
+        self.nodes = {}
+        self.relationships = {}
+        self._index = {prop: defaultdict(set) for prop in INDEXED_PROPERTIES}
+        self._out = defaultdict(set)
+        self._in = defaultdict(set)
+
+        for node in nodes.values():
+            self.add_node(node)
+        for rel in relationships.values():
+            self.add_relationship(rel)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return (
+            f"<BlueprintGraph {self.bp_id} nodes={len(self.nodes)} "
+            f"relationships={len(self.relationships)}>"
+        )
+
+    # maintenance
+    def add_node(self, node: dict):
+        if node["id"] in self.nodes:
+            self.remove_node(node["id"], keep_relationships=True)
+        self.nodes[node["id"]] = node
+        for prop, index in self._index.items():
+            index[node.get(prop)].add(node["id"])
+
+    def remove_node(self, node_id: str, keep_relationships: bool = False):
+        node = self.nodes.pop(node_id, None)
+        if node is None:
+            return
+        for prop, index in self._index.items():
+            ids = index.get(node.get(prop))
+            if ids is not None:
+                ids.discard(node_id)
+                if not ids:
+                    del index[node.get(prop)]
+        if not keep_relationships:
+            for rel_id in list(self._out.get(node_id, ())) + list(
+                self._in.get(node_id, ())
+            ):
+                self.remove_relationship(rel_id)
+
+    def add_relationship(self, rel: dict):
+        if rel["id"] in self.relationships:
+            self.remove_relationship(rel["id"])
+        self.relationships[rel["id"]] = rel
+        self._out[rel["source_id"]].add(rel["id"])
+        self._in[rel["target_id"]].add(rel["id"])
+
+    def remove_relationship(self, rel_id: str):
+        rel = self.relationships.pop(rel_id, None)
+        if rel is None:
+            return
+        for edges, node_id in (
+            (self._out, rel["source_id"]),
+            (self._in, rel["target_id"]),
+        ):
+            ids = edges.get(node_id)
+            if ids is not None:
+                ids.discard(rel_id)
+                if not ids:
+                    del edges[node_id]
+
+    # lookups
+    def node(self, node_id: str) -> Optional[dict]:
+        return self.nodes.get(node_id)
+
+    def find_nodes(self, node_type: str = None, **props) -> List[dict]:
+        """
+        Return the nodes of type `node_type` matching all `props`
+        """
+        if node_type is not None:
+            props["type"] = node_type
+        return list(self._candidates(NodeSpec(None, props)))
+
+    def out_relationships(self, node_id: str, rel_type: str = None) -> List[dict]:
+        return self._edges(self._out, node_id, rel_type)
+
+    def in_relationships(self, node_id: str, rel_type: str = None) -> List[dict]:
+        return self._edges(self._in, node_id, rel_type)
+
+    def neighbors(
+        self, node_id: str, rel_type: str = None, node_type: str = None, out=True
+    ) -> List[dict]:
+        """
+        Return the nodes linked to `node_id` by outgoing (or incoming)
+        relationships of type `rel_type`
+        """
+        edges = self.out_relationships if out else self.in_relationships
+        end = "target_id" if out else "source_id"
+        result = []
+        for rel in edges(node_id, rel_type):
+            node = self.nodes.get(rel[end])
+            if node is not None and (node_type is None or node["type"] == node_type):
+                result.append(node)
+        return result
+
+    def _edges(self, edges, node_id, rel_type) -> List[dict]:
+        rels = (self.relationships[r] for r in edges.get(node_id, ()))
+        if rel_type is None:
+            return list(rels)
+        return [r for r in rels if r["type"] == rel_type]
+
+    def _candidates(self, spec: NodeSpec) -> Iterable[dict]:
+        node_id = spec.props.get("id")
+        if isinstance(node_id, str):
+            node = self.nodes.get(node_id)
+            return [node] if node is not None and spec.matches(node) else []
+
+        smallest = None
+        for prop in INDEXED_PROPERTIES:
+            value = spec.props.get(prop)
+            if prop in spec.props and not isinstance(value, _Predicate):
+                ids = self._index[prop].get(value, ())
+                if smallest is None or len(ids) < len(smallest):
+                    smallest = ids
+        if smallest is None:
+            return [n for n in self.nodes.values() if spec.matches(n)]
+        return [n for n in map(self.nodes.get, smallest) if spec.matches(n)]
+
+    # queries
+    def query(self, query: str) -> List[dict]:
+        """
+        Run a QE query against the local copy.
+
+        Returns
+        -------
+            (list) - [{"name": node or relationship, ...}, ...] like the
+            "items" of `qe_query`
+
+        Raises
+        ------
+            GraphQueryError - the query is not supported locally
+        """
+        bindings = [{}]
+        for path in parse_query(query):
+            bindings = [
+                result for bound in bindings for result in self._match(path, bound)
+            ]
+        return bindings
+
+    def _match(self, path, binding):
+        start = path[0]
+        bound = binding.get(start.name)
+        if bound is not None:
+            starts = [bound] if start.matches(bound) else []
+        else:
+            starts = self._candidates(start)
+        for node in starts:
+            yield from self._walk(path, 1, node, self._bind(binding, start, node))
+
+    @staticmethod
+    def _bind(binding, spec, element):
+        if binding is None:
+            return None
+        if spec.name is None:
+            return binding
+        bound = binding.get(spec.name)
+        if bound is not None:
+            return binding if bound["id"] == element["id"] else None
+        binding = dict(binding)
+        binding[spec.name] = element
+        return binding
+
+    def _walk(self, path, i, node, binding):
+        if binding is None:
+            return
+        if i == len(path):
+            yield binding
+            return
+
+        edge, target = path[i], path[i + 1]
+        edges = self._out if edge.outgoing else self._in
+        end = "target_id" if edge.outgoing else "source_id"
+        for rel_id in edges.get(node["id"], ()):
+            rel = self.relationships[rel_id]
+            if not edge.matches(rel):
+                continue
+            other = self.nodes.get(rel[end])
+            if other is None or not target.matches(other):
+                continue
+            yield from self._walk(
+                path,
+                i + 2,
+                other,
+                self._bind(self._bind(binding, edge, rel), target, other),
+            )
+
+
+GraphChange = namedtuple("GraphChange", ["action", "kind", "id", "old", "new"])
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+
+class BlueprintGraphSync:
+    """
+    Keep a :class:`BlueprintGraph` in line with AOS applying only the nodes
+    and relationships that were added, changed or removed:
+
+        sync = BlueprintGraphSync(aos.blueprint, bp_id)
+        sync.subscribe(lambda change: print(change))
+        ...
+        sync.sync()  # returns [GraphChange(...), ...]
+
+    Every sync first compares the blueprint version with the one of the
+    local copy and stops there when it did not change. Otherwise nodes and
+    relationships are streamed and compared to the local copy by id, so
+    the graph indexes are only touched for what changed.
+
+    Parameters
+    ----------
+    blueprint
+        (obj) :class:`aos.blueprint.AosBlueprint`
+    bp_id
+        (str) ID of AOS blueprint
+    graph
+        (obj) local copy to keep current. Default None (downloaded on the
+        first sync)
+    """
+
+    def __init__(self, blueprint, bp_id: str, graph: BlueprintGraph = None):
+        self.blueprint = blueprint
+        self.bp_id = bp_id
+        self.graph = graph
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, func: Callable[[GraphChange], None]) -> None:
+        """
+        Call `func` with every change applied by :meth:`sync`
+        """
+        self._listeners.append(func)
+
+    def unsubscribe(self, func: Callable[[GraphChange], None]) -> None:
+        self._listeners.remove(func)
+
+    def sync(self, force: bool = False) -> List[GraphChange]:
+        """
+        Bring the local copy up to date.
+
+        Parameters
+        ----------
+        force
+            (bool) compare nodes and relationships even if the blueprint
+            version did not change
+
+        Returns
+        -------
+            (list) - changes applied, empty when the copy was current
+        """
+        with self._lock:
+            if self.graph is None:
+                self.graph = self.blueprint.get_bp_graph(self.bp_id)
+                return []
+
+            status = self.blueprint.get_diff_status(self.bp_id)
+            version = (status["staging_version"], status["deployed_version"])
+            if version == self.graph.version and not force:
+                return []
+
+            graph = self.graph
+            changes = self._diff(
+                "node",
+                graph.nodes,
+                self.blueprint.iter_bp_nodes(self.bp_id),
+                graph.add_node,
+                lambda node_id: graph.remove_node(node_id, keep_relationships=True),
+            )
+            changes += self._diff(
+                "relationship",
+                graph.relationships,
+                self.blueprint.iter_node_relationships(self.bp_id),
+                graph.add_relationship,
+                graph.remove_relationship,
+            )
+            graph.version = version
+
+        logger.debug(
+            f"[graph-sync] {self.bp_id} version {version}: {len(changes)} changes"
+        )
+        for change in changes:
+            for func in list(self._listeners):
+                try:
+                    func(change)
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception(f"Graph change listener {func} failed")
+        return changes
+
+    @staticmethod
+    def _diff(kind, current: dict, latest: Iterable[dict], add, remove):
+        changes = []
+        seen = set()
+        for item in latest:
+            seen.add(item["id"])
+            old = current.get(item["id"])
+            if old is None:
+                add(item)
+                changes.append(GraphChange(ADDED, kind, item["id"], None, item))
+            elif old != item:
+                add(item)
+                changes.append(GraphChange(CHANGED, kind, item["id"], old, item))
+        for item_id in [i for i in current if i not in seen]:
+            old = current[item_id]
+            remove(item_id)
+            changes.append(GraphChange(REMOVED, kind, item_id, old, None))
+        return changes
@@ -0,0 +1,328 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import bisect
+import logging
+import re
+import threading
+from collections import Counter, namedtuple
+from typing import List
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Collections whose next path segment is an object ID
+ID_COLLECTIONS = frozenset(
+    [
+        "blueprints",
+        "nodes",
+        "relationships",
+        "systems",
+        "system-agents",
+        "tasks",
+        "security-zones",
+        "virtual-networks",
+        "virtual_networks",
+        "connectivity-points",
+        "external-routers",
+        "external-router-links",
+        "external-generic-systems",
+        "endpoint-policies",
+        "obj-policy-export",
+        "policies",
+        "probes",
+        "configlets",
+        "property-sets",
+        "ip-pools",
+        "ipv6-pools",
+        "asn-pools",
+        "vni-pools",
+        "interface-maps",
+        "logical-devices",
+        "rack-types",
+        "templates",
+        "device-profiles",
+        "streaming-config",
+        "users",
+    ]
+)
+
+_ID_RE = re.compile(
+    r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|[0-9A-Fa-f]{12,}|\d+)$"
+)
+
+
+def endpoint_template(uri: str) -> str:
+    """
+    Collapse object IDs of an AOS api uri so requests to the same endpoint
+    share one key, ex:
+    "/api/blueprints/a4b1c/nodes/n1?type=x" -> "/api/blueprints/{id}/nodes/{id}"
+    """
+    path = uri.split("?", 1)[0]
+    if "://" in path:
+        path = "/" + path.split("://", 1)[1].partition("/")[2]
+
+    segments = path.strip("/").split("/")
+    template = []
+    previous = None
+    for segment in segments:
+        if previous in ID_COLLECTIONS or _ID_RE.match(segment):
+            template.append("{id}")
+            previous = None
+        else:
+            template.append(segment)
+            previous = segment
+    return "/" + "/".join(template)
+
+
+class Histogram:
+    """
+    Cumulative latency histogram using Prometheus bucket semantics
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        """
+        Returns
+        -------
+            (list) - [(upper bound, observations <= upper bound), ...]
+            ending with ("+Inf", count)
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-quantile
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return self.max if bound == "+Inf" else min(bound, self.max)
+        return self.max
+
+
+class EndpointStats:
+    __slots__ = (
+        "latency",
+        "statuses",
+        "errors",
+        "retries",
+        "bytes_sent",
+        "bytes_received",
+    )
+
+    def __init__(self, buckets):
+        self.latency = Histogram(buckets)
+        self.statuses = Counter()
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.latency.count,
+            "latency_sum": self.latency.sum,
+            "latency_max": self.latency.max,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p95": self.latency.quantile(0.95),
+            "latency_buckets": self.latency.cumulative(),
+            "statuses": dict(self.statuses),
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+
+SlowEndpoint = namedtuple("SlowEndpoint", ["method", "endpoint", "count", "mean"])
+
+
+def _body_size(body) -> int:
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return 0
+
+
+def _response_size(resp: requests.Response) -> int:
+    length = resp.headers.get("Content-Length")
+    if length is not None and length.isdigit():
+        return int(length)
+    # Never force a download of streamed bodies
+    content = getattr(resp, "_content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    return 0
+
+
+class MetricsCollector:
+    """
+    Collects per endpoint latency histograms, status codes, byte counts,
+    errors and retries of an :class:`aos.aos.AosRestAPI`:
+
+        metrics = MetricsCollector()
+        metrics.attach(aos.rest)
+        ...
+        print(metrics.slowest(5))
+        print(metrics.to_prometheus())
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def attach(self, rest) -> "MetricsCollector":
+        rest.add_middleware(self)
+        return self
+
+    def detach(self, rest) -> None:
+        rest.remove_middleware(self)
+
+    def _stats(self, request) -> EndpointStats:
+        key = (request.method, endpoint_template(request.uri))
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = EndpointStats(self.buckets)
+        return stats
+
+    def post_response(self, request, resp: requests.Response):
+        sent = _body_size(getattr(resp.request, "body", None))
+        received = _response_size(resp)
+        with self._lock:
+            stats = self._stats(request)
+            stats.latency.observe(request.elapsed)
+            stats.statuses[resp.status_code] += 1
+            stats.bytes_sent += sent
+            stats.bytes_received += received
+
+    def on_error(self, request, error):
+        with self._lock:
+            stats = self._stats(request)
+            stats.errors += 1
+            if request.response is None:
+                # transport failures never reached post_response
+                stats.latency.observe(request.elapsed)
+
+    def on_retry(self, request, reason, delay):
+        with self._lock:
+            self._stats(request).retries += 1
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def to_dict(self) -> dict:
+        """
+        Returns
+        -------
+            (dict) - {"GET /api/blueprints/{id}/nodes": {"count": 3, ...}}
+        """
+        with self._lock:
+            return {
+                f"{method} {endpoint}": stats.to_dict()
+                for (method, endpoint), stats in sorted(self._endpoints.items())
+            }
+
+    def slowest(self, n: int = 10) -> List[SlowEndpoint]:
+        """
+        Return the endpoints with the highest mean latency
+        """
+        with self._lock:
+            endpoints = [
+                SlowEndpoint(
+                    method=method,
+                    endpoint=endpoint,
+                    count=stats.latency.count,
+                    mean=stats.latency.sum / stats.latency.count,
+                )
+                for (method, endpoint), stats in self._endpoints.items()
+                if stats.latency.count
+            ]
+        return sorted(endpoints, key=lambda e: e.mean, reverse=True)[:n]
+
+    def to_prometheus(self, prefix: str = "aos_api") -> str:
+        """
+        Render the collected metrics in the Prometheus text exposition format
+        """
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds AOS api request latency",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            for (method, endpoint), stats in endpoints:
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                name = f"{prefix}_request_duration_seconds"
+                for bound, total in stats.latency.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+                lines.append(f"{name}_sum{{{labels}}} {stats.latency.sum}")
+                lines.append(f"{name}_count{{{labels}}} {stats.latency.count}")
+
+            counters = (
+                ("responses_total", "AOS api responses by status code", None),
+                ("errors_total", "AOS api requests that raised", "errors"),
+                ("retries_total", "AOS api request retries", "retries"),
+                ("sent_bytes_total", "AOS api request body bytes", "bytes_sent"),
+                (
+                    "received_bytes_total",
+                    "AOS api response body bytes",
+                    "bytes_received",
+                ),
+            )
+            for suffix, help_text, attr in counters:
+                name = f"{prefix}_{suffix}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (method, endpoint), stats in endpoints:
+                    labels = f'method="{method}",endpoint="{endpoint}"'
+                    if attr is None:
+                        for status, count in sorted(stats.statuses.items()):
+                            lines.append(
+                                f'{name}{{{labels},status="{status}"}} {count}'
+                            )
+                    else:
+                        lines.append(f"{name}{{{labels}}} {getattr(stats, attr)}")
+
+        return "\n".join(lines) + "\n"
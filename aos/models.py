@@ -0,0 +1,311 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import dataclasses
+import json
+import threading
+import typing
+from typing import Iterable
+
+from .codec import get_codec
+
+# excluded when copying a model class, regenerated by dataclasses
+_GENERATED = frozenset(
+    [
+        "__dict__",
+        "__weakref__",
+        "__dataclass_fields__",
+        "__dataclass_params__",
+        "__init__",
+        "__repr__",
+        "__eq__",
+        "__hash__",
+        "__setattr__",
+        "__delattr__",
+    ]
+)
+
+_codec = get_codec("auto")
+_lock = threading.Lock()
+_variants = {}
+
+
+def _encode(value) -> bytes:
+    # stdlib output is sized exactly, faster encoders overallocate their
+    # result buffer
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class RawDocument:
+    """
+    Field of a compact model holding a JSON sub-document, ex: the `facts`
+    of a system. The value is stored encoded, which takes a fraction of
+    the memory of the equivalent dicts and lists, and decoded on every
+    access. Each access returns a new copy, keep it in a local variable
+    when reading it repeatedly.
+    """
+
+    __slots__ = ("name", "slot")
+
+    def __init__(self, name: str, slot):
+        self.name = name
+        self.slot = slot
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        raw = self.slot.__get__(instance, owner)
+        return None if raw is None else _codec.loads(raw)
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, None if value is None else _encode(value))
+
+
+def compact(
+    cls, frozen: bool = False, raw_fields: Iterable[str] = (), **attrs
+) -> type:
+    """
+    Return a variant of the dataclass model `cls` storing its fields in
+    `__slots__` instead of a per instance dict, ex:
+
+        CompactSystem = compact(System, raw_fields=["facts", "status"])
+        systems = [CompactSystem.from_json(s) for s in items]
+
+    The variant has the same fields, methods and `from_json` constructor
+    but is not a subclass of `cls`. Variants are created once and shared.
+
+    Parameters
+    ----------
+    cls
+        (type) dataclass model, ex: :class:`aos.devices.System`
+    frozen
+        (bool) make instances immutable and hashable. Raw fields and fields
+        annotated as dicts, lists or sets are left out of the hash.
+        Default False
+    raw_fields
+        (iterable) fields holding JSON sub-documents to keep encoded, see
+        :class:`RawDocument`
+    attrs
+        class attributes to override in the variant, ex: the model class
+        used for nested items
+    """
+    raw_fields = tuple(raw_fields)
+    key = (cls, frozen, raw_fields, tuple(sorted(attrs.items())))
+    with _lock:
+        variant = _variants.get(key)
+        if variant is None:
+            variant = _variants[key] = _make_compact(
+                cls, frozen, raw_fields, attrs
+            )
+        return variant
+
+
+def _make_compact(cls, frozen, raw_fields, attrs) -> type:
+    fields = dataclasses.fields(cls)
+    names = [f.name for f in fields]
+    unknown = set(raw_fields) - set(names)
+    if unknown:
+        raise ValueError(f"{cls.__name__} has no fields {sorted(unknown)}")
+
+    try:
+        hints = typing.get_type_hints(cls)
+    except (NameError, TypeError):
+        hints = {}
+
+    ns = {}
+    for klass in reversed(cls.__mro__[:-1]):
+        ns.update(
+            (name, value)
+            for name, value in vars(klass).items()
+            if name not in _GENERATED and name not in names
+        )
+    ns.update(attrs)
+    ns["__annotations__"] = {f.name: f.type for f in fields}
+    for f in fields:
+        options = {}
+        if f.default is not dataclasses.MISSING:
+            options["default"] = f.default
+        elif f.default_factory is not dataclasses.MISSING:
+            options["default_factory"] = f.default_factory
+        if f.name in raw_fields or _unhashable(hints.get(f.name, f.type)):
+            # decoded documents are dicts and lists
+            options["hash"] = False
+        if options:
+            ns[f.name] = dataclasses.field(**options)
+
+    name = f"Compact{cls.__name__}"
+    ns["__qualname__"] = name
+    model = dataclasses.dataclass(frozen=frozen)(type(name, (), ns))
+
+    # same as dataclass(slots=True) of python 3.10+, rebuild the class
+    # without the field defaults which would shadow the slots
+    ns = dict(vars(model))
+    for field_name in names + ["__dict__", "__weakref__"]:
+        ns.pop(field_name, None)
+    ns["__slots__"] = tuple(
+        f"_{n}" if n in raw_fields else n for n in names
+    )
+    ns["__getstate__"] = _getstate
+    ns["__setstate__"] = _setstate
+    slotted = type(name, (), ns)
+    for field_name in raw_fields:
+        slot = vars(slotted)[f"_{field_name}"]
+        setattr(slotted, field_name, RawDocument(field_name, slot))
+    return slotted
+
+
+_CONTAINERS = (dict, list, set)
+
+
+def _unhashable(hint) -> bool:
+    """
+    Whether a field annotation allows unhashable values, ex: dict,
+    List[str] or Optional[dict]
+    """
+    if isinstance(hint, type):
+        return issubclass(hint, _CONTAINERS)
+    origin = typing.get_origin(hint)
+    if origin is typing.Union:
+        return any(_unhashable(arg) for arg in typing.get_args(hint))
+    return isinstance(origin, type) and issubclass(origin, _CONTAINERS)
+
+
+# copy and pickle support, frozen instances refuse setattr
+
+
+def _getstate(self):
+    return [getattr(self, slot) for slot in self.__slots__]
+
+
+def _setstate(self, state):
+    for slot, value in zip(self.__slots__, state):
+        object.__setattr__(self, slot, value)
+
+
+class LazyModel:
+    """
+    Read-only proxy of a model keeping the raw item json, see :func:`lazy`.
+    Fields are read from the json when accessed; fields the model computes,
+    methods and comparisons build the full model once with its `from_json`.
+    """
+
+    __slots__ = ("_raw", "_model")
+
+    # model class proxied, set by lazy()
+    model = None
+
+    def __init__(self, raw: dict):
+        self._raw = raw
+        self._model = None
+
+    @classmethod
+    def from_json(cls, raw: dict):
+        if raw is None:
+            return cls.model.from_json(None)
+        return cls(raw)
+
+    @property
+    def raw(self) -> dict:
+        return self._raw
+
+    def to_model(self):
+        """
+        Return the full model instance built from the raw json
+        """
+        if self._model is None:
+            self._model = self.model.from_json(self._raw)
+        return self._model
+
+    def __getattr__(self, name):
+        # only called for names missing on the proxy, ex: model methods
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.to_model(), name)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyModel):
+            other = other.to_model()
+        return self.to_model() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Lazy{self.to_model()!r}"
+
+    def __reduce__(self):
+        return type(self), (self._raw,)
+
+
+class _JsonField:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance._raw[self.name]
+        except KeyError:
+            # let from_json apply the default
+            return getattr(instance.to_model(), self.name)
+
+
+class _ModelField(_JsonField):
+    __slots__ = ()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return getattr(instance.to_model(), self.name)
+
+
+def lazy(cls, derived: Iterable[str] = ()) -> type:
+    """
+    Return a :class:`LazyModel` class proxying the dataclass model `cls`,
+    ex:
+
+        LazyVirtualNetwork = lazy(VirtualNetwork, derived=["tagged_ct"])
+        vns = [LazyVirtualNetwork.from_json(vn) for vn in items]
+
+    Building a proxy only keeps a reference to the item json, reading a
+    field is a dict lookup. This suits bulk reads accessing a few fields,
+    ex: looking up a name in a long list.
+
+    Parameters
+    ----------
+    cls
+        (type) dataclass model with a `from_json` constructor
+    derived
+        (iterable) fields `from_json` does not copy verbatim from the json
+        key of the same name, these are read from the full model
+    """
+    derived = tuple(derived)
+    key = ("lazy", cls, derived)
+    with _lock:
+        proxy = _variants.get(key)
+        if proxy is None:
+            proxy = _variants[key] = _make_lazy(cls, derived)
+        return proxy
+
+
+def _make_lazy(cls, derived) -> type:
+    names = [f.name for f in dataclasses.fields(cls)]
+    unknown = set(derived) - set(names)
+    if unknown:
+        raise ValueError(f"{cls.__name__} has no fields {sorted(unknown)}")
+
+    name = f"Lazy{cls.__name__}"
+    ns = {
+        "__slots__": (),
+        "__module__": cls.__module__,
+        "__qualname__": name,
+        "__doc__": f"Lazy proxy of :class:`{cls.__name__}`, see aos.models.lazy",
+        "model": cls,
+    }
+    for field_name in names:
+        field_type = _ModelField if field_name in derived else _JsonField
+        ns[field_name] = field_type(field_name)
+    return type(name, (LazyModel,), ns)
@@ -0,0 +1,181 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import logging
+from collections import namedtuple
+from typing import Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How pages are requested:
+#   size_param      query parameter holding the page size
+#   position_param  query parameter selecting the page
+#   cursor_key      response key holding the next cursor (cursor paging)
+Paging = namedtuple(
+    "Paging", ["style", "size_param", "position_param", "cursor_key"]
+)
+
+PAGE = Paging("page", "per_page", "page", None)
+OFFSET = Paging("offset", "limit", "offset", None)
+CURSOR = Paging("cursor", "limit", "cursor", "next_cursor")
+
+PAGING_STYLES = {p.style: p for p in (PAGE, OFFSET, CURSOR)}
+
+
+class PagedIterator:
+    """
+    Lazy iterator over the items of an AOS collection, ex:
+
+        for system in aos.devices.managed_devices.iter_all(page_size=500):
+            ...
+
+    Without a page size the whole collection is fetched with one request
+    when iteration starts. With a page size the items are requested one
+    page at a time and, with `prefetch`, the next page is fetched on the
+    client worker pool while the current one is consumed, so only two
+    pages are held in memory.
+
+    Paging stops on a short or empty page, on a missing cursor, when the
+    server answers with more items than requested or repeats the previous
+    page (paging parameters not supported by the endpoint, the whole
+    collection was returned).
+
+    Like a generator it is consumed by iteration, :meth:`pages` starts
+    again from the first page.
+
+    Parameters
+    ----------
+    rest
+        (obj) :class:`aos.aos.AosRestAPI`
+    uri
+        (str) AOS api collection, ex: "/api/systems"
+    key
+        (str) response key holding the items. Default "items"
+    params
+        (dict) query parameters sent with every page
+    page_size
+        (int) items per page. Default None (`rest.page_size`, None disables
+        paging)
+    paging
+        (str) "page" (page/per_page), "offset" (offset/limit) or "cursor",
+        or a :class:`Paging`. Default "page"
+    prefetch
+        (bool) fetch the next page in the background. Default True
+    transform
+        (callable) builds the returned objects from the item json.
+        Default None (return the json)
+    """
+
+    def __init__(
+        self,
+        rest,
+        uri: str,
+        key: str = "items",
+        params: dict = None,
+        page_size: int = None,
+        paging="page",
+        prefetch: bool = True,
+        transform: Callable = None,
+    ):
+        if isinstance(paging, str):
+            paging = PAGING_STYLES[paging]
+        self.rest = rest
+        self.uri = uri
+        self.key = key
+        self.params = params
+        self.page_size = page_size if page_size is not None else rest.page_size
+        self.paging = paging
+        self.prefetch = prefetch
+        self.transform = transform
+        self._items = None
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self):
+        if self._items is None:
+            self._items = self._iter_items()
+        return next(self._items)
+
+    def _iter_items(self) -> Iterator:
+        transform = self.transform
+        for items in self.pages():
+            if transform is None:
+                yield from items
+            else:
+                for item in items:
+                    yield transform(item)
+
+    def pages(self) -> Iterator[List[dict]]:
+        """
+        Iterate over the collection one page of item json at a time
+        """
+        if not self.page_size:
+            items, _ = self._fetch(None)
+            yield items
+            return
+
+        position = {"offset": 0, "cursor": None}.get(self.paging.style, 1)
+        fut = None
+        previous = None
+        while True:
+            if fut is not None:
+                items, position = fut.result()
+            else:
+                items, position = self._fetch(position)
+            fut = None
+            if previous and items and _same_page(items, previous):
+                # a collection of exactly page_size items, paging ignored
+                logger.debug(f"[paging] {self.uri} repeated a page, ignored paging")
+                return
+            previous = items
+            if position is not None and self.prefetch:
+                fut = self.rest.submit(self._fetch, position)
+            yield items
+            if position is None:
+                return
+
+    def _fetch(self, position) -> Tuple[List[dict], Optional[object]]:
+        """
+        Returns
+        -------
+            (tuple) - (items of the page, position of the next page or None)
+        """
+        if not self.page_size:
+            resp = self.rest.json_resp_get(self.uri, params=self.params)
+            return self._page_items(resp), None
+
+        paging = self.paging
+        params = dict(self.params or {})
+        params[paging.size_param] = self.page_size
+        if position is not None:
+            params[paging.position_param] = position
+
+        resp = self.rest.json_resp_get(self.uri, params=params)
+        items = self._page_items(resp)
+        if len(items) > self.page_size:
+            logger.debug(f"[paging] {self.uri} ignored paging, got {len(items)}")
+            return items, None
+
+        if paging.style == "cursor":
+            cursor = resp.get(paging.cursor_key) if items else None
+            return items, cursor or None
+        if len(items) < self.page_size:
+            return items, None
+        if paging.style == "offset":
+            return items, position + len(items)
+        return items, position + 1
+
+    def _page_items(self, resp) -> List[dict]:
+        if not resp:
+            return []
+        items = resp.get(self.key, [])
+        # some collections are keyed by id
+        if isinstance(items, dict):
+            return list(items.values())
+        return items
+
+
+def _same_page(items: List[dict], previous: List[dict]) -> bool:
+    return items[0] == previous[0] and items[-1] == previous[-1]
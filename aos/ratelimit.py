@@ -0,0 +1,228 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+GRAPH_QUERY = "graph_query"
+NODE_PATCH = "node_patch"
+DEPLOY = "deploy"
+
+_state = threading.local()
+
+
+def default_endpoint_class(method: str, uri: str) -> Optional[str]:
+    """
+    Classify a request into the endpoint classes limited by
+    :class:`RateLimiter`: graph queries, blueprint node PATCHes and deploys.
+    """
+    path = uri.split("?", 1)[0].rstrip("/")
+    method = method.upper()
+
+    if method == "POST" and path.endswith(("/qe", "/ql")):
+        return GRAPH_QUERY
+    if method == "PATCH" and (
+        path.endswith("/nodes") or path.rpartition("/")[0].endswith("/nodes")
+    ):
+        return NODE_PATCH
+    if method == "PUT" and path.endswith("/deploy"):
+        return DEPLOY
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` operations per second with bursts of up to
+    `burst` operations.
+
+    Tokens are reserved up front, so callers are served in arrival order and
+    each one knows immediately how long it has to wait.
+    """
+
+    def __init__(self, rate: float, burst: float = None, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token and return the seconds to wait before using it
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class _WaitStats:
+    __slots__ = ("requests", "delayed", "waited", "max_wait")
+
+    def __init__(self):
+        self.requests = 0
+        self.delayed = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        self.requests += 1
+        if wait > 0:
+            self.delayed += 1
+            self.waited += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "delayed": self.delayed,
+            "waited": self.waited,
+            "max_wait": self.max_wait,
+        }
+
+
+class RateLimiter:
+    """
+    Client side rate limiter for :class:`aos.aos.AosRestAPI`.
+
+    Requests wait for a free slot instead of failing. Limits are applied
+    globally and per endpoint class, ex:
+
+        RateLimiter(
+            rate=20,
+            limits={"graph_query": 5, "node_patch": 2, "deploy": (0.1, 1)},
+        )
+
+    Parameters
+    ----------
+    rate
+        (float) requests per second for all requests. Default None (no
+        global limit)
+    burst
+        (float) requests allowed back to back above `rate`. Default: `rate`
+    limits
+        (dict) endpoint class to requests per second, or to a
+        (rate, burst) tuple
+    classify
+        (callable) returns the endpoint class of a (method, uri) pair.
+        Default :func:`default_endpoint_class`
+    """
+
+    def __init__(
+        self,
+        rate: float = None,
+        burst: float = None,
+        limits: Dict[str, Union[float, Tuple[float, float]]] = None,
+        classify: Callable[[str, str], Optional[str]] = default_endpoint_class,
+    ):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.class_buckets = {}
+        for name, limit in (limits or {}).items():
+            if isinstance(limit, (tuple, list)):
+                self.class_buckets[name] = TokenBucket(*limit)
+            else:
+                self.class_buckets[name] = TokenBucket(limit)
+        self.classify = classify
+
+        self._lock = threading.Lock()
+        self._stats = _WaitStats()
+        self._class_stats = {}
+
+    def reserve(self, method: str, uri: str) -> float:
+        """
+        Reserve a slot for a request and return the seconds to wait
+        """
+        endpoint_class = self.classify(method, uri)
+        wait = 0.0
+        if self.bucket is not None:
+            wait = self.bucket.reserve()
+        class_bucket = self.class_buckets.get(endpoint_class)
+        if class_bucket is not None:
+            wait = max(wait, class_bucket.reserve())
+
+        with self._lock:
+            self._stats.record(wait)
+            if endpoint_class is not None:
+                self._class_stats.setdefault(endpoint_class, _WaitStats()).record(
+                    wait
+                )
+
+        if wait > 0:
+            logger.debug(f"[rate-limit] {method} {uri} waiting {wait:.3f}s")
+        return wait
+
+    def acquire(self, method: str, uri: str) -> float:
+        """
+        Block the calling thread until the request may be sent.
+
+        Returns
+        -------
+            (float) seconds waited
+        """
+        if getattr(_state, "acquired", False):
+            # admitted once, retries and replays wait like threaded callers
+            _state.acquired = False
+            return 0.0
+        wait = self.reserve(method, uri)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, method: str, uri: str) -> float:
+        """
+        Wait without blocking the event loop until the request may be sent.
+
+        Returns
+        -------
+            (float) seconds waited
+        """
+        wait = self.reserve(method, uri)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+            (dict) - {"requests": 10, "delayed": 4, "waited": 1.2,
+                      "max_wait": 0.5, "by_class": {"graph_query": {...}}}
+        """
+        with self._lock:
+            stats = self._stats.to_dict()
+            stats["by_class"] = {
+                name: s.to_dict() for name, s in self._class_stats.items()
+            }
+        return stats
+
+
+@contextmanager
+def already_acquired():
+    """
+    Mark the next request sent by the current thread as already admitted
+    by the limiter, ex: after :meth:`RateLimiter.aacquire` was awaited.
+    Further attempts of the same call, retries or replays after a
+    re-login, acquire the limiter again.
+    """
+    previous = getattr(_state, "acquired", False)
+    _state.acquired = True
+    try:
+        yield
+    finally:
+        _state.acquired = previous
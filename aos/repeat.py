@@ -2,19 +2,34 @@
 #
 # This source code is licensed under End User License Agreement found in the
 # LICENSE file at http://www.apstra.com/eula
+import asyncio
 import inspect
 import logging
-
+import random
 import time
+from typing import Callable, Iterator, Union
 
 logger = logging.getLogger(__name__)
 
 TEN_SECONDS = 10.0
 ONE_MINUTE = 60
 
+DEFAULT_INITIAL_DELAY = 0.1
+DEFAULT_BACKOFF = 2.0
+
+# backoff factor, or callable returning the next delay from the previous one
+Backoff = Union[float, Callable[[float], float]]
+
+
+class RepeatCancelled(Exception):
+    """
+    Raised by :func:`repeat` and :func:`arepeat` when their `cancel` event
+    is set
+    """
+
 
 def repeat_until(
-    condition, timeout=TEN_SECONDS, func=None, fargs=None, fkwargs=None
+    condition, timeout=TEN_SECONDS, func=None, fargs=None, fkwargs=None, **kwargs
 ):
     """
     Repeats :func: until :condition: is met.
@@ -24,6 +39,7 @@ def repeat_until(
     :param func: function to be called on each repeat
     :param fargs: function positional arguments
     :param fkwargs: function key-word arguments
+    :param kwargs: delay options of :func:`repeat`
     :return:
     """
     return repeat(
@@ -32,6 +48,7 @@ def repeat_until(
         func=func,
         fargs=fargs,
         fkwargs=fkwargs,
+        **kwargs,
     )
 
 
@@ -43,48 +60,162 @@ def repeat(
     timeout=TEN_SECONDS,
     max_delay=ONE_MINUTE,
     error_condition=None,
+    initial_delay=DEFAULT_INITIAL_DELAY,
+    backoff: Backoff = DEFAULT_BACKOFF,
+    jitter=0.0,
+    cancel=None,
 ):
     """
     Repeats :func: until :stop_condition: is met.
 
-    :param stop_condition: predicate with no arguments, stops repeats if returned
-    `True`. If set to `None` - does not repeat.
-    :param error_condition: predicate with no arguments, stops repeats if returned
-    `True`.
-    :param timeout: timeout in seconds
+    :param stop_condition: predicate with no arguments, or taking the value
+    returned by :func:, stops repeats if returned `True`. If set to `None` -
+    does not repeat.
+    :param error_condition: predicate with no arguments, or taking the value
+    returned by :func:, stops repeats if returned `True`.
+    :param timeout: timeout in seconds, measured on the monotonic clock and
+    including the time spent in :func: and the predicates
     :param func: function to be called on each repeat
     :param fargs: function positional arguments
     :param fkwargs: function key-word arguments
     :param max_delay: maximum delay between calls
-    :return:
+    :param initial_delay: delay before the first repeat
+    :param backoff: factor applied to the delay after each repeat, or a
+    callable returning the next delay from the previous one
+    :param jitter: fraction of each delay randomly cut off, ex: 0.2 waits
+    between 80% and 100% of the delay. Spreads the calls of concurrent
+    pollers
+    :param cancel: `threading.Event` stopping the repeats when set, raises
+    :class:`RepeatCancelled`
+    :return: value returned by the last :func: call
     """
+    call = _caller(func, fargs, fkwargs)
+    should_continue = _continuation(stop_condition, error_condition)
+    deadline = time.monotonic() + timeout
+    delays = _delays(initial_delay, backoff, max_delay, jitter)
+
+    retval = call()
 
-    delay = 0.1
+    while should_continue(retval):
+        delay = _next_delay(delays, deadline, stop_condition)
+        logger.info(f"[repeat] waiting {delay:.3f}")
 
-    if fargs is None:
-        fargs = []
+        if cancel is None:
+            time.sleep(delay)
+        elif cancel.wait(delay):
+            raise RepeatCancelled(f"Cancelled waiting for {_name(stop_condition)}")
 
-    if fkwargs is None:
-        fkwargs = {}
+        retval = call()
 
-    retval = _call_function(fargs, fkwargs, func)
+    return retval
 
-    while _continue(stop_condition, error_condition, retval) and timeout > 0:
-        logger.info(f"[repeat] waiting {delay}")
 
-        time.sleep(delay)
+async def arepeat_until(
+    condition, timeout=TEN_SECONDS, func=None, fargs=None, fkwargs=None, **kwargs
+):
+    """
+    Asyncio version of :func:`repeat_until`, see :func:`arepeat`
+    """
+    return await arepeat(
+        stop_condition=condition,
+        timeout=timeout,
+        func=func,
+        fargs=fargs,
+        fkwargs=fkwargs,
+        **kwargs,
+    )
 
-        timeout -= delay
-        delay = min(delay * 2, max_delay)
 
-        retval = _call_function(fargs, fkwargs, func)
+async def arepeat(
+    func=None,
+    fargs=None,
+    fkwargs=None,
+    stop_condition=None,
+    timeout=TEN_SECONDS,
+    max_delay=ONE_MINUTE,
+    error_condition=None,
+    initial_delay=DEFAULT_INITIAL_DELAY,
+    backoff: Backoff = DEFAULT_BACKOFF,
+    jitter=0.0,
+    cancel=None,
+):
+    """
+    Asyncio version of :func:`repeat`. :func: and the predicates may be
+    coroutine functions. The event loop is not blocked while waiting, and
+    cancelling the awaiting task stops the repeats.
 
-    if timeout <= 0:
-        raise TimeoutError(f"Timed out waiting for {stop_condition.__name__}")
+    :param cancel: `asyncio.Event` (or `threading.Event`, checked after
+    each delay) stopping the repeats when set, raises
+    :class:`RepeatCancelled`
+    """
+    call = _caller(func, fargs, fkwargs)
+    should_continue = _continuation(stop_condition, error_condition)
+    deadline = time.monotonic() + timeout
+    delays = _delays(initial_delay, backoff, max_delay, jitter)
+
+    retval = await _resolve(call())
+
+    while await _resolve(should_continue(retval)):
+        delay = _next_delay(delays, deadline, stop_condition)
+        logger.info(f"[repeat] waiting {delay:.3f}")
+
+        if await _cancelled(cancel, delay):
+            raise RepeatCancelled(f"Cancelled waiting for {_name(stop_condition)}")
+
+        retval = await _resolve(call())
 
     return retval
 
 
+async def _resolve(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def _cancelled(cancel, delay: float) -> bool:
+    if isinstance(cancel, asyncio.Event):
+        try:
+            await asyncio.wait_for(cancel.wait(), delay)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    await asyncio.sleep(delay)
+    return cancel is not None and cancel.is_set()
+
+
+def _delays(
+    initial_delay: float, backoff: Backoff, max_delay: float, jitter: float
+) -> Iterator[float]:
+    delay = initial_delay
+    while True:
+        yield delay * (1 - jitter * random.random()) if jitter else delay
+        delay = backoff(delay) if callable(backoff) else delay * backoff
+        delay = min(delay, max_delay)
+
+
+def _next_delay(delays: Iterator[float], deadline: float, stop_condition) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError(f"Timed out waiting for {_name(stop_condition)}")
+    # wake up for a last attempt at the deadline
+    return min(next(delays), remaining)
+
+
+def _name(func) -> str:
+    return getattr(func, "__name__", repr(func))
+
+
+def _caller(func, fargs, fkwargs) -> Callable:
+    fargs = fargs or []
+    fkwargs = fkwargs or {}
+
+    def call():
+        return _call_function(fargs, fkwargs, func)
+
+    return call
+
+
 def _call_function(fargs, fkwargs, func):
     retval = None
     if callable(func):
@@ -103,13 +234,37 @@ def args(func, arg):
     return [arg] if accepts_args(func) else []
 
 
-def _continue(stop_condition, error_condition, retval):
-    stop_args = args(stop_condition, retval)
-    err_args = args(error_condition, retval)
+def _predicate(condition) -> Callable:
+    """
+    Return `condition` as a predicate taking the last returned value, the
+    signature is inspected once instead of on every repeat
+    """
+    if not callable(condition):
+        return None
+    if accepts_args(condition):
+        return condition
+    return lambda _: condition()
 
-    is_error = error_condition(*err_args) if callable(error_condition) else False
-    should_continue = (
-        not stop_condition(*stop_args) if callable(stop_condition) else False
-    )
 
-    return not is_error and should_continue
+def _continuation(stop_condition, error_condition) -> Callable:
+    stop = _predicate(stop_condition)
+    error = _predicate(error_condition)
+
+    def should_continue(retval):
+        is_error = error(retval) if error is not None else False
+        should_stop = stop(retval) if stop is not None else True
+        if inspect.isawaitable(is_error) or inspect.isawaitable(should_stop):
+            return _async_continue(is_error, should_stop)
+        return not is_error and not should_stop
+
+    return should_continue
+
+
+async def _async_continue(is_error, should_stop) -> bool:
+    is_error = await _resolve(is_error)
+    should_stop = await _resolve(should_stop)
+    return not is_error and not should_stop
+
+
+def _continue(stop_condition, error_condition, retval):
+    return _continuation(stop_condition, error_condition)(retval)
@@ -5,7 +5,9 @@
 import logging
 from dataclasses import dataclass
 from .aos import AosSubsystem, AosAPIError
-from typing import Optional, List, Generator
+from .models import compact
+from .paging import PagedIterator
+from typing import Optional, List
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +41,7 @@ class PoolSubnet:
 
     @classmethod
     def from_json(cls, d: dict):
-        return PoolSubnet(
+        return cls(
             network=d["network"],
         )
 
@@ -48,15 +50,22 @@ class PoolSubnet:
 class IPPool(AosResource):
     subnets: List[PoolSubnet]
 
+    # model of the subnets, see aos.models.compact
+    subnet_type = PoolSubnet
+
     @classmethod
     def from_json(cls, d: dict):
-        return IPPool(
+        return cls(
             display_name=d["display_name"],
-            subnets=[PoolSubnet.from_json(s) for s in d["subnets"]],
+            subnets=[cls.subnet_type.from_json(s) for s in d["subnets"]],
             id=d["id"],
         )
 
 
+CompactPoolSubnet = compact(PoolSubnet)
+CompactIPPool = compact(IPPool, subnet_type=CompactPoolSubnet)
+
+
 class AosIPPool(AosSubsystem):
     def create(
         self,
@@ -85,13 +94,18 @@ class AosIPPool(AosSubsystem):
             self.rest.json_resp_get(f"/api/resources/ip-pools/{pool_id}")
         )
 
-    def iter_all(self) -> Generator[IPPool, None, None]:
-        pools = self.rest.json_resp_get("/api/resources/ip-pools")
-        if pools:
-            for p in pools["items"]:
-                yield IPPool.from_json(p)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/resources/ip-pools",
+            page_size=page_size,
+            transform=IPPool.from_json,
+        )
 
     def find_by_name(self, name: str) -> List[IPPool]:
+        found = self._catalog_find("/api/resources/ip-pools", name, IPPool.from_json)
+        if found is not None:
+            return found
         return [p for p in self.iter_all() if p.display_name == name]
 
 
@@ -123,13 +137,20 @@ class AosIPv6Pool(AosSubsystem):
             self.rest.json_resp_get(f"/api/resources/ipv6-pools/{pool_id}")
         )
 
-    def iter_all(self) -> Generator[IPPool, None, None]:
-        pools = self.rest.json_resp_get("/api/resources/ipv6-pools")
-        if pools:
-            for p in pools["items"]:
-                yield IPPool.from_json(p)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/resources/ipv6-pools",
+            page_size=page_size,
+            transform=IPPool.from_json,
+        )
 
     def find_by_name(self, name: str) -> List[IPPool]:
+        found = self._catalog_find(
+            "/api/resources/ipv6-pools", name, IPPool.from_json
+        )
+        if found is not None:
+            return found
         return [p for p in self.iter_all() if p.display_name == name]
 
 
@@ -269,13 +290,20 @@ class AosAsnPool(AosSubsystem):
             self.rest.json_resp_get(f"/api/resources/asn-pools/{pool_id}")
         )
 
-    def iter_all(self) -> Generator[AsnPool, None, None]:
-        pools = self.rest.json_resp_get("/api/resources/asn-pools")
-        if pools:
-            for p in pools["items"]:
-                yield AsnPool.from_json(p)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/resources/asn-pools",
+            page_size=page_size,
+            transform=AsnPool.from_json,
+        )
 
     def find_by_name(self, pool_name: str) -> List[AsnPool]:
+        found = self._catalog_find(
+            "/api/resources/asn-pools", pool_name, AsnPool.from_json
+        )
+        if found is not None:
+            return found
         return [p for p in self.iter_all() if p.display_name == pool_name]
 
 
@@ -313,11 +341,18 @@ class AosVniPool(AosSubsystem):
             self.rest.json_resp_get(f"/api/resources/vni-pools/{pool_id}")
         )
 
-    def iter_all(self) -> Generator[VniPool, None, None]:
-        pools = self.rest.json_resp_get("/api/resources/vni-pools")
-        if pools:
-            for p in pools["items"]:
-                yield VniPool.from_json(p)
+    def iter_all(self, page_size: int = None) -> PagedIterator:
+        return PagedIterator(
+            self.rest,
+            "/api/resources/vni-pools",
+            page_size=page_size,
+            transform=VniPool.from_json,
+        )
 
     def find_by_name(self, pool_name: str) -> List[VniPool]:
+        found = self._catalog_find(
+            "/api/resources/vni-pools", pool_name, VniPool.from_json
+        )
+        if found is not None:
+            return found
         return [p for p in self.iter_all() if p.display_name == pool_name]
@@ -0,0 +1,196 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 502, 503, 504)
+# Methods which can be repeated without side effects (RFC 7231 idempotent)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+# Graph queries are sent as POST but never modify the blueprint
+READ_ONLY_POST_SUFFIXES = ("/qe", "/ql")
+# The server rejected these before processing so any method may be repeated
+REJECTED_STATUSES = (429,)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Convert a Retry-After header (delay-seconds or HTTP-date) to seconds
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    Retry policy for transient AOS api failures: throttling (429),
+    gateway errors during controller failover (502, 503, 504) and
+    connection errors.
+
+    Parameters
+    ----------
+    max_retries
+        (int) retries allowed for a single request
+    retry_budget
+        (int) retries allowed over the lifetime of the policy, shared by all
+        requests using it. Default None (unlimited)
+    backoff_factor
+        (float) base delay in seconds; doubled on every attempt
+    max_backoff
+        (float) upper bound of the computed delay in seconds
+    jitter
+        (bool) randomize delays between 50% and 100% of the computed value
+        so concurrent clients do not retry in lock step
+    statuses
+        (tuple) HTTP statuses to retry
+    methods
+        (tuple) HTTP methods safe to repeat
+    respect_retry_after
+        (bool) wait as long as the server asks through Retry-After
+    max_retry_after
+        (float) give up when Retry-After asks to wait longer than this
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_budget: int = None,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        statuses=RETRY_STATUSES,
+        methods=IDEMPOTENT_METHODS,
+        respect_retry_after: bool = True,
+        max_retry_after: float = 120.0,
+    ):
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+
+        self._lock = threading.Lock()
+        self._retries = Counter()
+        self._exhausted = 0
+
+    def is_safe(self, method: str, uri: str) -> bool:
+        method = method.upper()
+        if method in self.methods:
+            return True
+        path = uri.split("?", 1)[0].rstrip("/")
+        return method == "POST" and path.endswith(READ_ONLY_POST_SUFFIXES)
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(delay / 2, delay)
+        return delay
+
+    def next_delay(
+        self,
+        method: str,
+        uri: str,
+        attempt: int,
+        resp: requests.Response = None,
+        error: Exception = None,
+    ) -> Optional[float]:
+        """
+        Decide whether a failed attempt is retried.
+
+        Parameters
+        ----------
+        method
+            (str) HTTP method of the request
+        uri
+            (str) request uri
+        attempt
+            (int) number of retries already made for this request
+        resp
+            (obj) response received, if any
+        error
+            (obj) exception raised while sending the request, if any
+
+        Returns
+        -------
+            (float) seconds to wait before retrying, None to give up
+        """
+        if error is not None:
+            if not isinstance(error, (requests.ConnectionError, requests.Timeout)):
+                return None
+            reason = type(error).__name__
+            safe = self.is_safe(method, uri)
+        elif resp is not None and resp.status_code in self.statuses:
+            reason = resp.status_code
+            safe = reason in REJECTED_STATUSES or self.is_safe(method, uri)
+        else:
+            return None
+
+        if not safe:
+            return None
+
+        delay = self.backoff(attempt)
+        if resp is not None and self.respect_retry_after:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                delay = max(delay, retry_after)
+
+        with self._lock:
+            budget_left = (
+                self.retry_budget is None
+                or sum(self._retries.values()) < self.retry_budget
+            )
+            if attempt >= self.max_retries or not budget_left:
+                self._exhausted += 1
+                return None
+            self._retries[reason] += 1
+
+        return delay
+
+    @property
+    def retries(self) -> int:
+        with self._lock:
+            return sum(self._retries.values())
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+            (dict) - {"retries": 3, "exhausted": 1,
+                      "by_reason": {503: 2, "ConnectionError": 1}}
+        """
+        with self._lock:
+            return {
+                "retries": sum(self._retries.values()),
+                "exhausted": self._exhausted,
+                "by_reason": dict(self._retries),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._retries.clear()
+            self._exhausted = 0
@@ -0,0 +1,167 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import codecs
+import json
+import re
+from typing import Iterable, Iterator, Optional, Union
+
+# Bytes read from the socket at a time by streamed requests
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+# characters that extend a decoded number prefix
+_NUMBER_CONTINUATION = frozenset(".eE+-0123456789")
+
+
+def _is_number(obj) -> bool:
+    return isinstance(obj, (int, float)) and not isinstance(obj, bool)
+
+
+class _Reader:
+    """
+    Buffer over an iterable of text or utf-8 chunks decoding one JSON value
+    at a time. Only the unparsed tail of the document is kept in memory.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int = 1) -> bool:
+        """
+        Read until at least `size` unparsed characters are buffered.
+        Returns False if the stream ended before anything new was read.
+        """
+        if self.eof:
+            return False
+        parts = [self.buf[self.pos:]]
+        self.pos = 0
+        buffered = len(parts[0])
+        start = buffered
+        for chunk in self._chunks:
+            if isinstance(chunk, (bytes, bytearray)):
+                chunk = self._utf8.decode(chunk)
+            parts.append(chunk)
+            buffered += len(chunk)
+            if buffered >= max(size, start + 1):
+                break
+        else:
+            parts.append(self._utf8.decode(b"", final=True))
+            self.eof = True
+        self.buf = "".join(parts)
+        return len(self.buf) > start
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character, "" at the end
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Expecting one of {chars!r} in streamed JSON, got {char!r}"
+            )
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        size = max(len(self.buf) - self.pos, STREAM_CHUNK_SIZE)
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # grow the buffer geometrically so large values are not
+                # re-parsed for every chunk
+                size *= 2
+                if not self._fill(size):
+                    raise
+                continue
+            # a value at the end of the buffer, or a number cut after its
+            # integer part ("0." or "1e"), may continue in the next chunk
+            if (
+                end == len(self.buf)
+                or _is_number(obj)
+                and self.buf[end] in _NUMBER_CONTINUATION
+            ) and self._fill(len(self.buf) - self.pos + 1):
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_container(reader: _Reader) -> Iterator:
+    if reader.peek() == "n":
+        reader.value()  # null
+        return
+    close = "]" if reader.expect("[{") == "[" else "}"
+    if reader.peek() == close:
+        reader.pos += 1
+        return
+    while True:
+        if close == "}":
+            reader.value()
+            reader.expect(":")
+        yield reader.value()
+        if reader.expect("," + close) == close:
+            return
+
+
+def iter_json_items(
+    chunks: Iterable[Union[bytes, str]], key: Optional[str] = None
+) -> Iterator:
+    """
+    Incrementally parse a JSON document and yield the elements of the array
+    (or the values of the object) stored under `key` of the top level
+    object, one at a time, ex:
+
+        iter_json_items(resp.iter_content(65536), "items")
+
+    Parameters
+    ----------
+    chunks
+        (iterable) utf-8 bytes or text pieces of the document
+    key
+        (str) top level key holding the items. Default None: the document
+        itself is the array or object to iterate
+
+    Other top level values are parsed and discarded.
+
+    Raises
+    ------
+        ValueError - the document is not valid JSON
+    """
+    reader = _Reader(chunks)
+    if key is None:
+        yield from _iter_container(reader)
+    else:
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.pos += 1
+        else:
+            while True:
+                name = reader.value()
+                reader.expect(":")
+                if name == key:
+                    yield from _iter_container(reader)
+                else:
+                    reader.value()
+                if reader.expect(",}") == "}":
+                    break
+
+    if reader.peek():
+        raise ValueError("Extra data after streamed JSON document")
@@ -0,0 +1,366 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import asyncio
+import logging
+import threading
+from concurrent import futures
+from typing import Callable, Dict, Iterable, List
+
+from .aos import AosAPIError, AosAPIResourceNotFound
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 0.25
+DEFAULT_MAX_INTERVAL = 2.0
+# poll interval growth while no watched task finishes
+BACKOFF = 1.5
+# task ids per filtered tasks request, keeps the query string short
+MAX_IDS_PER_POLL = 100
+# consecutive failed polls of a blueprint before its waits fail
+MAX_POLL_ERRORS = 3
+
+# see aos.blueprint.TaskStatus
+ACTIVE_STATUSES = frozenset(["init", "in_progress"])
+SUCCEEDED = "succeeded"
+
+
+class AosTaskError(AosAPIError):
+    """
+    A blueprint task finished with a status other than succeeded
+    """
+
+    def __init__(self, task: dict):
+        self.task = task
+        errors = task.get("detailed_status", {}).get("errors")
+        super().__init__(
+            f"Task {task.get('id')} {task.get('status')}"
+            + (f": {errors}" if errors else "")
+        )
+
+
+def _wait_all(task_futures: Iterable[futures.Future], timeout: float = None) -> list:
+    task_futures = list(task_futures)
+    _, not_done = futures.wait(task_futures, timeout=timeout)
+    if not_done:
+        for fut in not_done:
+            fut.cancel()
+        raise TimeoutError(
+            f"Timed out waiting for {len(not_done)} of {len(task_futures)} tasks"
+        )
+    return [fut.result() for fut in task_futures]
+
+
+class TaskWaiter:
+    """
+    Waits for blueprint tasks, ex: created with params={"async": "full"}.
+    A single background thread polls the watched tasks with one filtered
+    :meth:`aos.blueprint.AosBlueprint.get_tasks` request per blueprint and
+    resolves the future of each task as soon as a poll sees it finished:
+
+        futs = [waiter.watch(bp_id, t["task_id"]) for t in created]
+        tasks = waiter.wait_all(futs, timeout=120)
+
+    Polling restarts at `poll_interval` whenever a task is watched or
+    finishes and slows down to `max_interval` while none does. The thread
+    exits when no task is watched.
+
+    Futures resolve to the task json, or fail with :class:`AosTaskError`
+    when the task failed or timed out on the server and with
+    :class:`aos.aos.AosAPIResourceNotFound` when it does not exist.
+
+    Parameters
+    ----------
+    blueprint
+        (obj) :class:`aos.blueprint.AosBlueprint`
+    poll_interval
+        (float) seconds between polls. Default 0.25
+    max_interval
+        (float) longest interval between polls. Default 2
+    """
+
+    def __init__(
+        self,
+        blueprint,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+    ):
+        self.blueprint = blueprint
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+
+        self._cond = threading.Condition()
+        # bp_id -> {task_id: [futures]}
+        self._pending: Dict[str, Dict[str, List[futures.Future]]] = {}
+        self._errors: Dict[str, int] = {}
+        self._woken = False
+        self._thread = None
+
+    def watch(self, bp_id: str, task_id: str) -> futures.Future:
+        """
+        Returns
+        -------
+            (obj) - concurrent.futures.Future resolved with the task json
+            when it finishes
+        """
+        fut = futures.Future()
+        with self._cond:
+            self._pending.setdefault(bp_id, {}).setdefault(task_id, []).append(fut)
+            self._woken = True
+            self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="aos-task-waiter", daemon=True
+                )
+                self._thread.start()
+        return fut
+
+    def wait(self, bp_id: str, task_id: str, timeout: float = None) -> dict:
+        """
+        Block until the task finishes, see :meth:`watch`
+
+        Raises
+        ------
+            TimeoutError - the task did not finish within `timeout` seconds
+        """
+        return self.wait_all([self.watch(bp_id, task_id)], timeout)[0]
+
+    def wait_all(
+        self, task_futures: Iterable[futures.Future], timeout: float = None
+    ) -> list:
+        """
+        Block until all watched tasks finish
+
+        Returns
+        -------
+            (list) - task json in the order of the futures
+
+        Raises
+        ------
+            TimeoutError - some tasks did not finish within `timeout`
+            seconds, their watches are cancelled
+        """
+        return _wait_all(task_futures, timeout)
+
+    async def await_task(
+        self, bp_id: str, task_id: str, timeout: float = None
+    ) -> dict:
+        """
+        Asyncio version of :meth:`wait`, the event loop is not blocked
+        """
+        fut = self.watch(bp_id, task_id)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), timeout)
+        except asyncio.TimeoutError:
+            fut.cancel()
+            raise TimeoutError(f"Timed out waiting for task {task_id}") from None
+
+    def pending(self) -> int:
+        """
+        Returns
+        -------
+            (int) number of watched unfinished tasks
+        """
+        with self._cond:
+            return sum(len(tasks) for tasks in self._pending.values())
+
+    def _run(self):
+        interval = self.poll_interval
+        while True:
+            with self._cond:
+                self._drop_cancelled()
+                if not self._pending:
+                    self._thread = None
+                    return
+                watched = {bp: list(tasks) for bp, tasks in self._pending.items()}
+                self._woken = False
+
+            finished = 0
+            for bp_id, task_ids in watched.items():
+                finished += self._poll(bp_id, task_ids)
+
+            with self._cond:
+                if finished or self._woken:
+                    interval = self.poll_interval
+                else:
+                    interval = min(interval * BACKOFF, self.max_interval)
+                if self._pending and not self._woken:
+                    self._cond.wait(interval)
+
+    def _drop_cancelled(self):
+        for bp_id in list(self._pending):
+            tasks = self._pending[bp_id]
+            for task_id in list(tasks):
+                tasks[task_id] = [f for f in tasks[task_id] if not f.cancelled()]
+                if not tasks[task_id]:
+                    del tasks[task_id]
+            if not tasks:
+                del self._pending[bp_id]
+
+    def _poll(self, bp_id: str, task_ids: List[str]) -> int:
+        finished = 0
+        for i in range(0, len(task_ids), MAX_IDS_PER_POLL):
+            chunk = task_ids[i:i + MAX_IDS_PER_POLL]
+            try:
+                # a single request: prefetching pages on the rest worker pool
+                # deadlocks when all workers are blocked waiting for tasks
+                tasks = self.blueprint.get_tasks(
+                    bp_id, params={"filter": f"id in {chunk!r}"}, page_size=0
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                finished += self._poll_failed(bp_id, chunk, e)
+                continue
+            self._errors.pop(bp_id, None)
+
+            by_id = {task["id"]: task for task in tasks}
+            for task_id in chunk:
+                task = by_id.get(task_id)
+                if task is None:
+                    error = AosAPIResourceNotFound(f"Task {task_id} does not exist")
+                    finished += self._finish(bp_id, task_id, error=error)
+                elif task["status"] == SUCCEEDED:
+                    finished += self._finish(bp_id, task_id, task=task)
+                elif task["status"] not in ACTIVE_STATUSES:
+                    error = AosTaskError(task)
+                    finished += self._finish(bp_id, task_id, error=error)
+        return finished
+
+    def _poll_failed(self, bp_id: str, task_ids: List[str], error) -> int:
+        errors = self._errors[bp_id] = self._errors.get(bp_id, 0) + 1
+        logger.warning(f"[tasks] polling tasks of {bp_id} failed: {error}")
+        if errors < MAX_POLL_ERRORS:
+            return 0
+        return sum(self._finish(bp_id, t, error=error) for t in task_ids)
+
+    def _finish(self, bp_id: str, task_id: str, task=None, error=None) -> int:
+        with self._cond:
+            tasks = self._pending.get(bp_id, {})
+            task_futures = tasks.pop(task_id, [])
+            if not tasks:
+                self._pending.pop(bp_id, None)
+        for fut in task_futures:
+            if not fut.set_running_or_notify_cancel():
+                continue
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(task)
+        return 1
+
+
+class BlueprintJob:
+    """
+    Handle of a blueprint change running as a task, returned by the
+    create methods of :class:`aos.blueprint.AosBlueprint` with
+    `wait=False`. The task is watched from creation; once it succeeded
+    `resolve`, ex: looking up the created object, runs once in the first
+    thread asking for the result:
+
+        jobs = [bp.create_virtual_network(bp_id, ..., wait=False) for ...]
+        vns = wait_jobs(jobs, timeout=300)
+        # or from a coroutine
+        vns = await asyncio.gather(*jobs)
+
+    Parameters
+    ----------
+    waiter
+        (obj) :class:`TaskWaiter` of the blueprint
+    bp_id
+        (str) ID of AOS blueprint
+    task_id
+        (str) ID of the task
+    resolve
+        (callable) called with the finished task json, returns the job
+        result. Default None (the task json)
+    """
+
+    def __init__(
+        self, waiter: TaskWaiter, bp_id: str, task_id: str, resolve: Callable = None
+    ):
+        self.bp_id = bp_id
+        self.task_id = task_id
+        self.future = waiter.watch(bp_id, task_id)
+        self._resolve = resolve
+        self._lock = threading.Lock()
+        self._resolved = False
+        self._result = None
+
+    def __repr__(self):
+        state = "done" if self.done() else "running"
+        return f"<BlueprintJob {self.bp_id} task {self.task_id} {state}>"
+
+    def done(self) -> bool:
+        """
+        Returns
+        -------
+            (bool) - the task finished, or the job was cancelled
+        """
+        return self.future.done()
+
+    def cancel(self) -> bool:
+        """
+        Stop watching the task, the change still runs on the server
+        """
+        return self.future.cancel()
+
+    def wait(self, timeout: float = None) -> dict:
+        """
+        Block until the task finishes. Unlike :func:`wait_jobs` the task
+        is still watched after a timeout, the job can be waited again
+
+        Returns
+        -------
+            (dict) - the finished task
+
+        Raises
+        ------
+            TimeoutError, AosTaskError (task failed)
+        """
+        try:
+            return self.future.result(timeout=timeout)
+        except futures.TimeoutError:
+            raise TimeoutError(
+                f"Timed out waiting for task {self.task_id}"
+            ) from None
+
+    def result(self, timeout: float = None):
+        """
+        Block until the task finishes and return the result of `resolve`,
+        see :meth:`wait`
+        """
+        task = self.wait(timeout)
+        with self._lock:
+            if not self._resolved:
+                self._result = self._resolve(task) if self._resolve else task
+                self._resolved = True
+        return self._result
+
+    def __await__(self):
+        return self._await().__await__()
+
+    async def _await(self):
+        await asyncio.wrap_future(self.future)
+        if self._resolved or self._resolve is None:
+            return self.result()
+        # resolving makes blocking requests
+        return await asyncio.get_running_loop().run_in_executor(None, self.result)
+
+
+def wait_jobs(jobs: Iterable[BlueprintJob], timeout: float = None) -> list:
+    """
+    Block until all jobs finish, their tasks are polled together
+
+    Returns
+    -------
+        (list) - job results in the order of the jobs
+
+    Raises
+    ------
+        TimeoutError - some tasks did not finish within `timeout` seconds,
+        their jobs are cancelled
+        AosTaskError - a task failed
+    """
+    jobs = list(jobs)
+    _wait_all([job.future for job in jobs], timeout)
+    return [job.result() for job in jobs]
@@ -3,6 +3,7 @@
 # This source code is licensed under End User License Agreement found in the
 # LICENSE file at http://www.apstra.com/eula
 from dataclasses import dataclass
+from functools import partial
 from typing import List
 
 from requests import Response
@@ -125,7 +126,5 @@ class AosTelemetryManager(AosSubsystem):
         Cycle through and delete all the streaming endpoints.
         """
         eps = self.get_endpoints()
-        ret = []
-        for ep in eps:
-            ret.append(self.delete_endpoint(ep.id))
+        self.rest.parallel(partial(self.delete_endpoint, ep.id) for ep in eps)
         return True
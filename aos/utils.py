@@ -7,12 +7,44 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+SENSITIVE_KEYS = frozenset(["password", "token", "AuthToken"])
+REDACTED = "<REDACTED>"
+
+
 def redacted(d):
+    """
+    Return `d` with the values of sensitive keys replaced by "<REDACTED>",
+    including keys of nested dicts and lists.
+
+    Containers are only copied when they hold something to redact; payloads
+    without secrets are returned as is.
+    """
     if d is None or d == "":
         return d
+    return _redact(d)
+
+
+def _redact(value):
+    if isinstance(value, dict):
+        result = value
+        for k, v in value.items():
+            new = REDACTED if k in SENSITIVE_KEYS else _redact(v)
+            if new is not v:
+                if result is value:
+                    result = value.copy()
+                result[k] = new
+        return result
+
+    if isinstance(value, (list, tuple)):
+        result = value
+        for i, v in enumerate(value):
+            new = _redact(v)
+            if new is not v:
+                if result is value:
+                    result = list(value)
+                result[i] = new
+        if result is not value and isinstance(value, tuple):
+            result = tuple(result)
+        return result
 
-    h = d.copy()
-    for sensitive in ["password", "token", "AuthToken"]:
-        if sensitive in d:
-            h[sensitive] = "<REDACTED>"
-    return h
+    return value
@@ -0,0 +1,51 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+"""
+Encode and decode time of the installed JSON codecs for a blueprint nodes
+response of the given number of nodes:
+
+    PYTHONPATH=. python benchmarks/bench_codec.py [nodes]
+"""
+import sys
+import timeit
+
+from aos.codec import CODECS, get_codec
+
+
+def blueprint_nodes(count: int) -> dict:
+    return {
+        "nodes": {
+            f"node-{i}": {
+                "id": f"node-{i}",
+                "type": "system",
+                "label": f"leaf{i}",
+                "role": "leaf",
+                "system_id": f"5254000{i:05X}",
+                "deploy_mode": "deploy",
+                "tags": ["pod1", "rack2"],
+                "property_set": {"asn": 65000 + i, "mtu": 9216, "weight": 0.5},
+            }
+            for i in range(count)
+        }
+    }
+
+
+def main(count: int = 50000):
+    doc = blueprint_nodes(count)
+    print(f"{count} nodes, {len(get_codec('json').dumps(doc)) / 1e6:.1f} MB")
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            print(f"  {name:8} not installed")
+            continue
+        body = codec.dumps(doc)
+        dumps = min(timeit.repeat(lambda: codec.dumps(doc), number=1, repeat=5))
+        loads = min(timeit.repeat(lambda: codec.loads(body), number=1, repeat=5))
+        print(f"  {name:8} dumps {dumps * 1e3:8.1f} ms  loads {loads * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,77 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+"""
+Counting critical anomalies per system over Anomaly objects compared to
+the columnar results of `anomalies_columns` (numpy and pandas are needed):
+
+    PYTHONPATH=. python benchmarks/bench_columnar.py [anomalies]
+"""
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from aos.columnar import ANOMALY_COLUMNS, convert, to_columns
+from aos.devices import Anomaly
+
+
+def anomalies(count: int):
+    severities = ("critical", "warning", "info")
+    return [
+        {
+            "id": f"anomaly-{i}",
+            "anomaly_type": ("config", "bgp", "cabling")[i % 3],
+            "severity": severities[i % 7 % 3],
+            "role": "leaf",
+            "identity": {"system_id": f"system-{i % 500}"},
+        }
+        for i in range(count)
+    ]
+
+
+def timed(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main(count: int = 100000):
+    items = anomalies(count)
+    objects = [Anomaly.from_json(a) for a in items]
+    arr = convert(to_columns(items, ANOMALY_COLUMNS), "numpy")
+    frame = convert(to_columns(items, ANOMALY_COLUMNS), "pandas")
+
+    cases = {
+        "critical count": (
+            lambda: sum(1 for a in objects if a.severity == "critical"),
+            lambda: np.count_nonzero(arr["severity"] == "critical"),
+            lambda: (frame.severity == "critical").sum(),
+        ),
+        "critical per system": (
+            lambda: Counter(
+                a.system_id for a in objects if a.severity == "critical"
+            ),
+            lambda: np.unique(
+                arr["system_id"][arr["severity"] == "critical"],
+                return_counts=True,
+            ),
+            lambda: frame[frame.severity == "critical"]
+            .groupby("system_id", observed=True)
+            .size(),
+        ),
+    }
+
+    print(f"{count} anomalies, best of 5 in ms: Anomaly loop / numpy / pandas")
+    for label, funcs in cases.items():
+        times = " / ".join(f"{timed(func):7.2f}" for func in funcs)
+        print(f"  {label:20} {times}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
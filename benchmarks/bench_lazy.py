@@ -0,0 +1,73 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+"""
+Time and memory of building virtual network models from a parsed
+response, then looking one up by label as `find_vn_by_name` does, with
+the dataclass model and its lazy proxy:
+
+    PYTHONPATH=. python benchmarks/bench_lazy.py [virtual networks]
+"""
+import sys
+import time
+import tracemalloc
+
+from aos.blueprint import LazyVirtualNetwork, VirtualNetwork
+
+
+def response(count: int) -> dict:
+    return {
+        f"vn-{i}": {
+            "id": f"vn-{i}",
+            "label": f"vn{i}",
+            "description": None,
+            "ipv4_enabled": True,
+            "ipv4_subnet": f"10.{i // 250}.{i % 250}.0/24",
+            "virtual_gateway_ipv4": f"10.{i // 250}.{i % 250}.1",
+            "ipv6_enabled": False,
+            "ipv6_subnet": None,
+            "virtual_gateway_ipv6": None,
+            "vn_id": str(10000 + i),
+            "security_zone_id": "sz-1",
+            "svi_ips": [],
+            "virtual_mac": None,
+            "default_endpoint_tag_types": {},
+            "endpoints": [],
+            "bound_to": [{"system_id": f"leaf{n}"} for n in range(4)],
+            "vn_type": "vxlan",
+            "rt_policy": {"import_RTs": None, "export_RTs": None},
+            "dhcp_service": "dhcpServiceDisabled",
+        }
+        for i in range(count)
+    }
+
+
+def find(model, items: dict, label: str):
+    for vn in [model.from_json(vn) for vn in items.values()]:
+        if vn.label == label:
+            return vn
+
+
+def measure(model, items: dict, label: str):
+    start = time.perf_counter()
+    find(model, items, label)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    find(model, items, label)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1e3, peak / 1e6
+
+
+def main(count: int = 100000):
+    items = response(count)
+    label = f"vn{count - 1}"
+    print(f"{count} virtual networks, find_vn_by_name")
+    for model in (VirtualNetwork, LazyVirtualNetwork):
+        elapsed, peak = measure(model, items, label)
+        print(f"  {model.__name__:20} {elapsed:8.1f} ms {peak:8.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
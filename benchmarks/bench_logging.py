@@ -0,0 +1,64 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+"""
+Per request overhead of debug logging and payload redaction in
+AosRestAPI.raw_request, with a PATCH payload the size of a cabling map of a
+large blueprint. No AOS server is needed:
+
+    PYTHONPATH=. python benchmarks/bench_logging.py [links]
+"""
+import logging
+import sys
+import timeit
+
+import requests
+
+from aos.aos import AosRestAPI
+from aos.utils import redacted
+
+
+class StubSession(requests.Session):
+    def request(self, method, url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 202
+        resp._content = b"{}"
+        return resp
+
+
+def cabling_map(links: int) -> dict:
+    return {
+        "links": [
+            {
+                "id": f"spine1<->leaf{i}",
+                "endpoints": [
+                    {"system": {"id": "spine1"}, "if_name": "xe-0/0/1"},
+                    {"system": {"id": f"leaf{i}"}, "if_name": "xe-0/0/0"},
+                ],
+            }
+            for i in range(links)
+        ]
+    }
+
+
+def main(links: int = 2000):
+    logging.basicConfig(level=logging.INFO)
+    rest = AosRestAPI("http", "aos", 80, session=StubSession())
+    rest.token = "token"
+    data = cabling_map(links)
+    number = 200
+
+    def timed(stmt):
+        return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+    def request():
+        rest.patch("/api/blueprints/bp/cabling-map", data=data)
+
+    print(f"PATCH payload with {links} links, DEBUG disabled")
+    print(f"  redacted(data):   {timed(lambda: redacted(data)):10.1f} us")
+    print(f"  raw_request:      {timed(request):10.1f} us")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,142 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+"""
+Memory held by a systems inventory built with the dataclass models compared
+to their compact variants:
+
+    PYTHONPATH=. python benchmarks/bench_models.py [systems]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from aos.blueprint import CompactVirtualNetwork, VirtualNetwork
+from aos.devices import CompactSystem, System
+from aos.models import compact
+
+
+def system_json(i: int) -> bytes:
+    return json.dumps(
+        {
+            "id": f"5254{i:08X}",
+            "device_key": f"5254{i:08X}",
+            "container_status": {"domain": "Default", "error_message": ""},
+            "facts": {
+                "aos_hcl_model": "Arista_vEOS",
+                "aos_server": "172.20.1.3",
+                "aos_version": "AOS_4.0.0_OB.109",
+                "chassis_mac_ranges": "",
+                "hw_model": "vEOS",
+                "hw_version": "",
+                "mgmt_ifname": "Management1",
+                "mgmt_ipaddr": f"172.20.{i // 250}.{i % 250}",
+                "mgmt_macaddr": f"52:54:00:{i % 256:02x}:00:01",
+                "os_arch": "x86_64",
+                "os_family": "EOS",
+                "os_version": "4.24.1F",
+                "os_version_info": {"major": "4", "minor": "24", "build": "1F"},
+                "serial_number": f"5254{i:08X}",
+                "vendor": "Arista",
+            },
+            "services": ["hostname", "interface", "lldp", "bgp", "lag"],
+            "status": {
+                "agent_start_time": "2021-02-01T10:00:00.000000Z",
+                "comm_state": "on",
+                "device_start_time": "2021-02-01T09:58:00.000000Z",
+                "domain_name": "",
+                "error_message": "",
+                "fqdn": f"leaf{i}",
+                "hostname": f"leaf{i}",
+                "is_acknowledged": True,
+                "pool_id": "default_pool",
+                "state": "IS-ACTIVE",
+            },
+            "user_config": {
+                "admin_state": "normal",
+                "aos_hcl_model": "Arista_vEOS",
+                "location": "",
+            },
+        }
+    ).encode()
+
+
+def vn_json(i: int) -> bytes:
+    return json.dumps(
+        {
+            "id": f"vn-{i}",
+            "label": f"vn{i}",
+            "description": None,
+            "ipv4_enabled": True,
+            "ipv4_subnet": f"10.{i // 250}.{i % 250}.0/24",
+            "virtual_gateway_ipv4": f"10.{i // 250}.{i % 250}.1",
+            "ipv6_enabled": False,
+            "ipv6_subnet": None,
+            "virtual_gateway_ipv6": None,
+            "vn_id": str(10000 + i),
+            "security_zone_id": "sz-1",
+            "svi_ips": [],
+            "virtual_mac": None,
+            "default_endpoint_tag_types": {},
+            "endpoints": [],
+            "bound_to": [
+                {"system_id": f"leaf{n}", "access_switch_node_ids": []}
+                for n in range(4)
+            ],
+            "vn_type": "vxlan",
+            "rt_policy": {"import_RTs": None, "export_RTs": None},
+            "dhcp_service": "dhcpServiceDisabled",
+        }
+    ).encode()
+
+
+def held(model, documents) -> float:
+    """MB retained by the models built from `documents` after parsing"""
+    gc.collect()
+    tracemalloc.start()
+    models = [model.from_json(json.loads(doc)) for doc in documents]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del models
+    return size / 1e6
+
+
+def read_time(model, documents) -> float:
+    """µs per model to read every field"""
+    models = [model.from_json(json.loads(doc)) for doc in documents]
+    names = list(model.__dataclass_fields__)
+    start = time.perf_counter()
+    for m in models:
+        for name in names:
+            getattr(m, name)
+    return (time.perf_counter() - start) / len(models) * 1e6
+
+
+def main(count: int = 100000):
+    systems = [system_json(i) for i in range(count)]
+    vns = [vn_json(i) for i in range(count)]
+    cases = [
+        ("System", System, systems),
+        ("compact(System)", compact(System), systems),
+        ("compact(System, frozen=True)", compact(System, frozen=True), systems),
+        ("CompactSystem (raw)", CompactSystem, systems),
+        ("VirtualNetwork", VirtualNetwork, vns),
+        ("compact(VirtualNetwork)", compact(VirtualNetwork), vns),
+        ("CompactVirtualNetwork (raw)", CompactVirtualNetwork, vns),
+    ]
+    print(f"{count} models")
+    for label, model, documents in cases:
+        size = held(model, documents)
+        per_read = read_time(model, documents[:count // 10 or 1])
+        print(
+            f"  {label:30} {size:8.1f} MB held, "
+            f"{per_read:6.2f} µs to read all fields"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,65 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+"""
+Peak memory of loading a blueprint nodes response at once compared to
+streaming it node by node:
+
+    PYTHONPATH=. python benchmarks/bench_stream.py [nodes]
+"""
+import json
+import sys
+import tracemalloc
+
+from aos.stream import STREAM_CHUNK_SIZE, iter_json_items
+
+
+def nodes_document(count: int):
+    # yields the response in socket sized chunks without holding all of it
+    yield b'{"nodes": {'
+    for i in range(count):
+        node = {"id": f"node-{i}", "type": "system", "label": f"leaf{i}"}
+        separator = "," if i < count - 1 else ""
+        yield f'"node-{i}": {json.dumps(node)}{separator}'.encode()
+    yield b"}}"
+
+
+def chunks(count: int):
+    buf = b""
+    for piece in nodes_document(count):
+        buf += piece
+        if len(buf) >= STREAM_CHUNK_SIZE:
+            yield buf
+            buf = b""
+    yield buf
+
+
+def peak(func) -> float:
+    tracemalloc.start()
+    func()
+    _, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_size / 1e6
+
+
+def loaded(count):
+    labels = 0
+    for node in json.loads(b"".join(chunks(count)))["nodes"].values():
+        labels += len(node["label"])
+
+
+def streamed(count):
+    labels = 0
+    for node in iter_json_items(chunks(count), "nodes"):
+        labels += len(node["label"])
+
+
+def main(count: int = 200000):
+    print(f"{count} nodes")
+    print(f"  json.loads:      {peak(lambda: loaded(count)):8.1f} MB peak")
+    print(f"  iter_json_items: {peak(lambda: streamed(count)):8.1f} MB peak")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
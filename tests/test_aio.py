@@ -0,0 +1,153 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import json
+
+import pytest
+
+from aos.aio import AsyncAosClient, AsyncAosRestAPI, ThreadOffloadAosRestAPI
+from aos.aos import AosAPIError, AosRestAPI
+from aos.cache import ResponseCache
+from aos.retry import RetryPolicy
+from aos.devices import System
+
+from tests.util import make_session, read_fixture
+
+
+@pytest.fixture(params=["4.0.0"])
+def aos_api_version(request):
+    return request.param
+
+
+@pytest.fixture
+def aos_session():
+    return make_session()
+
+
+@pytest.fixture
+def aos(aos_session):
+    client = AsyncAosClient(
+        protocol="http", host="aos", port=80, session=aos_session
+    )
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def expected_auth_headers():
+    headers = AosRestAPI.default_headers.copy()
+    headers["AuthToken"] = "token"
+    return headers
+
+
+@pytest.fixture
+def aos_logged_in(aos, aos_session):
+    aos_session.add_response(
+        "POST",
+        "http://aos:80/api/aaa/login",
+        status=200,
+        resp=json.dumps({"token": "token", "id": "user-id"}),
+    )
+    resp = asyncio.run(aos.auth.login(username="user", password="pass"))
+    assert resp.token == "token"
+    assert aos.rest.token == "token"
+
+    aos_session.request.reset_mock()
+    return aos
+
+
+def test_json_resp_get(aos_logged_in, aos_session, expected_auth_headers):
+    aos_session.add_response(
+        "GET",
+        "http://aos:80/api/version",
+        status=200,
+        resp=json.dumps({"version": "4.0.0"}),
+    )
+
+    resp = asyncio.run(aos_logged_in.rest.json_resp_get("/api/version"))
+
+    assert resp == {"version": "4.0.0"}
+    aos_session.request.assert_called_once_with(
+        "GET",
+        "http://aos:80/api/version",
+        params=None,
+        json=None,
+        headers=expected_auth_headers,
+    )
+
+
+def test_concurrent_blueprint_requests(
+    aos_logged_in, aos_session, aos_api_version
+):
+    bp_ids = [f"bp-{i}" for i in range(20)]
+    for bp_id in bp_ids:
+        aos_session.add_response(
+            "GET",
+            f"http://aos:80/api/blueprints/{bp_id}/nodes",
+            status=200,
+            resp=read_fixture(f"aos/{aos_api_version}/blueprints/get_bp_nodes.json"),
+        )
+
+    async def fetch_all():
+        return await asyncio.gather(
+            *[aos_logged_in.blueprint.get_bp_nodes(bp_id) for bp_id in bp_ids]
+        )
+
+    results = asyncio.run(fetch_all())
+
+    assert len(results) == len(bp_ids)
+    assert all(r == results[0] for r in results)
+    assert aos_session.request.call_count == len(bp_ids)
+
+
+def test_nested_subsystem_generator(aos_logged_in, aos_session, aos_api_version):
+    devices = json.loads(
+        read_fixture(f"aos/{aos_api_version}/devices/get_managed_devices_all.json")
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/systems", status=200, resp=json.dumps(devices)
+    )
+
+    systems = asyncio.run(aos_logged_in.devices.managed_devices.iter_all())
+
+    assert isinstance(systems, list)
+    assert systems == [System.from_json(s) for s in devices["items"]]
+
+
+def test_errors_are_raised_in_coroutine(aos_logged_in, aos_session):
+    aos_session.add_response(
+        "GET",
+        "http://aos:80/api/blueprints/missing",
+        status=500,
+        resp=json.dumps({"errors": "boom"}),
+    )
+
+    with pytest.raises(AosAPIError):
+        asyncio.run(aos_logged_in.blueprint.get_bp(bp_id="missing"))
+
+
+def test_client_transport_options(aos_session):
+    cache = ResponseCache()
+    policy = RetryPolicy()
+    client = AsyncAosClient(
+        "http", "aos", 80, session=aos_session, cache=cache, retry_policy=policy
+    )
+    try:
+        assert isinstance(client.rest, AsyncAosRestAPI)
+        assert client.rest.rest.cache is cache
+        assert client.rest.rest.retry_policy is policy
+    finally:
+        client.close()
+
+    rest = AosRestAPI("http", "aos", 80, session=aos_session)
+    client = AsyncAosClient("http", "aos", 80, rest=rest)
+    try:
+        assert client.rest.rest is rest
+        assert client.blueprint._subsystem.rest is rest
+    finally:
+        client.close()
+    assert AsyncAosRestAPI is ThreadOffloadAosRestAPI
@@ -5,11 +5,22 @@
 # pylint: disable=redefined-outer-name
 
 import json
+import socket
+import threading
+import time
 
 import pytest
+from requests import Response
 
 from aos.client import AosClient
-from aos.aos import AosAuthenticationError, AosRestAPI, AosVersion
+from aos.aos import (
+    AosAPIError,
+    AosAuthenticationError,
+    AosHTTPAdapter,
+    AosRestAPI,
+    AosVersion,
+    PoolStats,
+)
 
 from tests.util import make_session
 
@@ -144,3 +155,186 @@ def test_get_aos_version(aos_logged_in, aos_session, expected_auth_headers):
         build="0",
         full_version="3.3.0-730",
     )
+
+
+def test_map_requests_returns_results_in_order(aos_logged_in, aos_session):
+    paths = [f"/api/blueprints/bp-{i}" for i in range(25)]
+    for path in paths:
+        aos_session.add_response(
+            "GET",
+            f"http://aos:80{path}",
+            status=200,
+            resp=json.dumps({"id": path}),
+        )
+
+    results = aos_logged_in.rest.map_requests(
+        [("GET", path) for path in paths], max_in_flight=4
+    )
+
+    assert results == [{"id": path} for path in paths]
+    assert aos_session.request.call_count == len(paths)
+
+
+def test_parallel_raises_first_error(aos_logged_in, aos_session):
+    aos_session.add_response(
+        "GET", "http://aos:80/api/ok", status=200, resp=json.dumps({})
+    )
+    aos_session.add_response(
+        "GET",
+        "http://aos:80/api/broken",
+        status=500,
+        resp=json.dumps({"errors": "boom"}),
+    )
+    batch = [("GET", "/api/ok"), ("GET", "/api/broken"), ("GET", "/api/ok")]
+
+    with pytest.raises(AosAPIError):
+        aos_logged_in.rest.map_requests(batch)
+
+    results = aos_logged_in.rest.map_requests(batch, return_exceptions=True)
+    assert results[0] == {}
+    assert isinstance(results[1], AosAPIError)
+    assert results[2] == {}
+
+
+def test_parallel_limits_in_flight_requests(aos):
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def call():
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.pop()
+        return True
+
+    assert aos.rest.parallel([call] * 20, max_in_flight=3) == [True] * 20
+    assert max(peak) <= 3
+
+
+def test_default_session_uses_tuned_adapter():
+    rest = AosRestAPI("https", "aos", 443, max_in_flight=32)
+    adapter = rest.session.get_adapter("https://aos:443")
+
+    assert isinstance(adapter, AosHTTPAdapter)
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 32
+    assert adapter.poolmanager.connection_pool_kw["block"] is False
+    assert (
+        socket.SOL_SOCKET,
+        socket.SO_KEEPALIVE,
+        1,
+    ) in adapter.poolmanager.connection_pool_kw["socket_options"]
+
+
+def test_pool_options_and_stats():
+    rest = AosRestAPI(
+        "http", "aos", 80, pool_maxsize=4, pool_block=True, keep_alive=False
+    )
+    adapter = rest.session.get_adapter("http://aos:80")
+
+    assert adapter.poolmanager.connection_pool_kw["block"] is True
+    assert "socket_options" not in adapter.poolmanager.connection_pool_kw
+    assert rest.pool_stats() == {}
+
+    adapter.poolmanager.connection_from_url("http://aos:80")
+    assert rest.pool_stats() == {
+        "http://aos:80": PoolStats(
+            maxsize=4, connections_created=0, idle=0, in_use=0, requests=0
+        )
+    }
+
+
+def test_given_session_keeps_its_adapters(aos_session):
+    AosRestAPI("http", "aos", 80, session=aos_session)
+    aos_session.mount.assert_not_called()
+
+
+def test_request_timeouts(aos_session):
+    rest = AosRestAPI(
+        "http", "aos", 80, session=aos_session, connect_timeout=3, read_timeout=30
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/version", status=200, resp=json.dumps({})
+    )
+
+    rest.json_resp_get("/api/version")
+
+    aos_session.request.assert_called_once_with(
+        "GET",
+        "http://aos:80/api/version",
+        params=None,
+        json=None,
+        headers=AosRestAPI.default_headers,
+        timeout=(3, 30),
+    )
+
+
+def add_token_checking_responses(aos_session, url, valid_token):
+    stored = aos_session.request.side_effect
+    logins = []
+
+    def request(method, url_, params, json, headers, *args, **kwargs):
+        if url_.endswith("/api/aaa/login"):
+            logins.append(json)
+        elif url_ == url and headers.get("AuthToken") != valid_token:
+            resp = Response()
+            resp.status_code = 401
+            resp._content = b'{"errors": "token expired"}'
+            return resp
+        return stored(method, url_, params, json, headers, *args, **kwargs)
+
+    aos_session.request.side_effect = request
+    return logins
+
+
+def test_reauth_on_expired_token(aos, aos_session):
+    aos_session.add_response(
+        "POST",
+        "http://aos:80/api/aaa/login",
+        status=200,
+        resp=json.dumps({"token": "fresh", "id": "user-id"}),
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/version", status=200, resp=json.dumps({})
+    )
+    logins = add_token_checking_responses(
+        aos_session, "http://aos:80/api/version", "fresh"
+    )
+    aos.auth.login("user", "pass", keep_credentials=True)
+    aos.rest.token = "expired"
+
+    assert aos.rest.json_resp_get("/api/version") == {}
+    assert aos.rest.token == "fresh"
+    assert len(logins) == 2
+    assert aos_session.request.call_args.kwargs["headers"]["AuthToken"] == "fresh"
+
+
+def test_reauth_single_login_for_concurrent_callers(aos, aos_session):
+    aos_session.add_response(
+        "POST",
+        "http://aos:80/api/aaa/login",
+        status=200,
+        resp=json.dumps({"token": "fresh", "id": "user-id"}),
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/version", status=200, resp=json.dumps({})
+    )
+    logins = add_token_checking_responses(
+        aos_session, "http://aos:80/api/version", "fresh"
+    )
+    aos.auth.enable_reauth(lambda: ("user", "pass"))
+    aos.rest.token = "expired"
+
+    results = aos.rest.map_requests([("GET", "/api/version")] * 10)
+
+    assert results == [{}] * 10
+    assert logins == [{"username": "user", "password": "pass"}]
+
+
+def test_no_reauth_by_default(aos_logged_in, aos_session):
+    add_token_checking_responses(aos_session, "http://aos:80/api/version", "other")
+
+    with pytest.raises(AosAuthenticationError):
+        aos_logged_in.rest.json_resp_get("/api/version")
@@ -13,6 +13,7 @@ from unittest.mock import call
 from aos.client import AosClient
 from aos.aos import AosRestAPI, AosAPIError, AosInputError
 from aos.blueprint import (
+    AosBlueprint,
     Blueprint,
     Device,
     AosBPCommitError,
@@ -22,6 +23,7 @@ from aos.blueprint import (
     ResourceGroup,
 )
 
+from requests import Response
 from requests.utils import requote_uri
 from tests.util import make_session, read_fixture, deserialize_fixture
 
@@ -607,9 +609,16 @@ def test_create_security_zone(
     )
     aos_session.add_response(
         "GET",
-        f"http://aos:80/api/blueprints/{bp_id}/tasks/{create_task_id}",
+        f"http://aos:80/api/blueprints/{bp_id}/tasks",
         status=200,
-        resp=read_fixture(task_id_fixture),
+        params={"filter": f"id in {[create_task_id]!r}"},
+        resp=json.dumps(
+            {
+                "items": [
+                    dict(deserialize_fixture(task_id_fixture), id=create_task_id)
+                ]
+            }
+        ),
     )
     aos_session.add_response(
         "GET",
@@ -670,6 +679,98 @@ def test_create_security_zone(
     )
 
 
+def test_create_security_zones(aos_logged_in, aos_session, aos_api_version):
+    all_fixture = f"aos/{aos_api_version}/blueprints/get_security_zones.json"
+    bp_id = "evpn-cvx-virtual"
+    sz_ids = {
+        sz["vrf_name"]: sz["id"]
+        for sz in deserialize_fixture(all_fixture)["items"].values()
+    }
+    blue_id, default_id = sz_ids["blue"], sz_ids["default"]
+    group_path = requote_uri(f"sz:{blue_id},leaf_loopback_ips")
+
+    for task_id in ("t1", "t2"):
+        aos_session.add_response(
+            "POST",
+            f"http://aos:80/api/blueprints/{bp_id}/security-zones",
+            status=202,
+            params={"async": "full"},
+            resp=json.dumps({"task_id": task_id}),
+        )
+    # the zone tasks may be polled separately or together
+    for task_ids in (["t1"], ["t2"], ["t1", "t2"], ["t2", "t1"]):
+        aos_session.add_response(
+            "GET",
+            f"http://aos:80/api/blueprints/{bp_id}/tasks",
+            status=200,
+            params={"filter": f"id in {task_ids!r}"},
+            resp=json.dumps(
+                {"items": [{"id": t, "status": "succeeded"} for t in task_ids]}
+            ),
+        )
+    aos_session.add_response(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/security-zones",
+        status=200,
+        resp=read_fixture(all_fixture),
+    )
+    aos_session.add_response(
+        "PUT",
+        f"http://aos:80/api/blueprints/{bp_id}/resource_groups/ip/{group_path}",
+        status=202,
+        resp=json.dumps(""),
+    )
+    aos_session.add_response(
+        "PUT",
+        f"http://aos:80/api/blueprints/{bp_id}/security-zones/{default_id}"
+        "/dhcp-servers",
+        status=204,
+        resp=json.dumps(""),
+    )
+
+    resp = aos_logged_in.blueprint.create_security_zones(
+        bp_id,
+        [
+            {"name": "blue", "leaf_loopback_ip_pools": ["pool"]},
+            {"name": "default", "vlan_id": 10, "dhcp_servers": ["1.1.1.1"]},
+        ],
+    )
+
+    assert [sz.id for sz in resp] == [blue_id, default_id]
+    requests = [(c[0][0], c[0][1]) for c in aos_session.request.call_args_list]
+    assert requests.count(
+        ("GET", f"http://aos:80/api/blueprints/{bp_id}/security-zones")
+    ) == 1
+    puts = {
+        c[0][1]: c[1]["json"]
+        for c in aos_session.request.call_args_list
+        if c[0][0] == "PUT"
+    }
+    assert puts == {
+        f"http://aos:80/api/blueprints/{bp_id}/resource_groups/ip/{group_path}": {
+            "pool_ids": ["pool"]
+        },
+        f"http://aos:80/api/blueprints/{bp_id}/security-zones/{default_id}"
+        "/dhcp-servers": {"items": ["1.1.1.1"]},
+    }
+
+
+@pytest.mark.parametrize(
+    "specs",
+    [
+        [{"name": "a", "unknown": 1}],
+        [{"vlan_id": 10}],
+        [{"name": "a", "vlan_id": 5000}],
+        [{"name": "a"}, {"name": "a"}],
+        [{"name": "a", "vlan_id": 10}, {"name": "b", "vlan_id": 10}],
+    ],
+)
+def test_create_security_zones_invalid(aos_logged_in, aos_session, specs):
+    with pytest.raises(AosInputError):
+        aos_logged_in.blueprint.create_security_zones("bp", specs)
+    aos_session.request.assert_not_called()
+
+
 def test_get_virtual_network_id(
     aos_logged_in, aos_session, expected_auth_headers, aos_api_version
 ):
@@ -801,9 +902,12 @@ def test_create_virtual_network(
     )
     aos_session.add_response(
         "GET",
-        f"http://aos:80/api/blueprints/{bp_id}/tasks/{task_id}",
+        f"http://aos:80/api/blueprints/{bp_id}/tasks",
         status=200,
-        resp=read_fixture(task_id_fixture),
+        params={"filter": f"id in {[task_id]!r}"},
+        resp=json.dumps(
+            {"items": [dict(deserialize_fixture(task_id_fixture), id=task_id)]}
+        ),
     )
     aos_session.add_response(
         "GET",
@@ -846,6 +950,136 @@ def test_create_virtual_network(
     )
 
 
+def test_create_virtual_network_job(aos_logged_in, aos_session, aos_api_version):
+    all_fixture = f"aos/{aos_api_version}/blueprints/get_virtual_networks.json"
+    task_id_fixture = f"aos/{aos_api_version}/blueprints/get_bp_task_id.json"
+    task_id = "d20a8a56-d312-4df7-a8ec-271d8e2325d1"
+    bp_id = "evpn-cvx-virtual"
+    vn_name = "test-blue15"
+
+    aos_session.add_response(
+        "POST",
+        f"http://aos:80/api/blueprints/{bp_id}/virtual-networks",
+        status=202,
+        params={"async": "full"},
+        resp=json.dumps({"task_id": task_id}),
+    )
+    aos_session.add_response(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/tasks",
+        status=200,
+        params={"filter": f"id in {[task_id]!r}"},
+        resp=json.dumps(
+            {"items": [dict(deserialize_fixture(task_id_fixture), id=task_id)]}
+        ),
+    )
+    aos_session.add_response(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/virtual-networks",
+        status=200,
+        resp=read_fixture(all_fixture),
+    )
+
+    job = aos_logged_in.blueprint.create_virtual_network(
+        bp_id=bp_id, name=vn_name, bound_to=[], sz_id="sz", wait=False
+    )
+
+    assert job.task_id == task_id
+    vns = aos_logged_in.blueprint.wait_for_jobs([job], timeout=5)
+    assert [vn.label for vn in vns] == [vn_name]
+    assert job.done()
+
+
+def test_wait_for_task_on_busy_worker_pool(aos_session):
+    # the only worker waits, paged task polls must not need the pool
+    rest = AosRestAPI(
+        "http", "aos", 80, session=aos_session, max_in_flight=1, page_size=1
+    )
+    blueprint = AosBlueprint(rest)
+    aos_session.add_response(
+        "GET",
+        "http://aos:80/api/blueprints/bp/tasks",
+        status=200,
+        params={"filter": "id in ['t1']"},
+        resp=json.dumps({"items": [{"id": "t1", "status": "succeeded"}]}),
+    )
+
+    fut = rest.submit(blueprint.wait_for_task, "bp", "t1", timeout=5)
+
+    assert fut.result(timeout=5)["id"] == "t1"
+    rest.close()
+
+
+def test_create_virtual_networks(aos_logged_in, aos_session, aos_api_version):
+    all_fixture = f"aos/{aos_api_version}/blueprints/get_virtual_networks.json"
+    bp_id = "evpn-cvx-virtual"
+    vns = deserialize_fixture(all_fixture)["virtual_networks"]
+    names = [vn["label"] for vn in vns.values()]
+
+    for task_id in ("t1", "t2"):
+        aos_session.add_response(
+            "POST",
+            f"http://aos:80/api/blueprints/{bp_id}/virtual-networks-batch",
+            status=202,
+            params={"async": "full"},
+            resp=json.dumps({"task_id": task_id}),
+        )
+    # the batch tasks may be polled separately or together
+    for task_ids in (["t1"], ["t2"], ["t1", "t2"], ["t2", "t1"]):
+        aos_session.add_response(
+            "GET",
+            f"http://aos:80/api/blueprints/{bp_id}/tasks",
+            status=200,
+            params={"filter": f"id in {task_ids!r}"},
+            resp=json.dumps(
+                {"items": [{"id": t, "status": "succeeded"} for t in task_ids]}
+            ),
+        )
+    aos_session.add_response(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/virtual-networks",
+        status=200,
+        resp=read_fixture(all_fixture),
+    )
+
+    resp = aos_logged_in.blueprint.create_virtual_networks(
+        bp_id,
+        [
+            {"name": name, "bound_to": [], "sz_id": "sz", "vn_type": "vlan"}
+            for name in reversed(names)
+        ],
+        batch_size=2,
+    )
+
+    assert [vn.label for vn in resp] == list(reversed(names))
+    batches = [
+        c[1]["json"]["virtual_networks"]
+        for c in aos_session.request.call_args_list
+        if c[0][0] == "POST"
+    ]
+    assert sorted(len(batch) for batch in batches) == [1, 2]
+    assert batches[0][0]["vn_type"] == "vlan"
+    gets = [c for c in aos_session.request.call_args_list if c[0][0] == "GET"]
+    assert [c[0][1] for c in gets].count(
+        f"http://aos:80/api/blueprints/{bp_id}/virtual-networks"
+    ) == 1
+
+
+@pytest.mark.parametrize(
+    "specs",
+    [
+        [{"name": "a", "bound_to": [], "unknown": 1}],
+        [{"bound_to": []}],
+        [{"name": "a", "bound_to": [], "vn_type": "bad"}],
+        [{"name": "a", "bound_to": []}, {"name": "a", "bound_to": []}],
+    ],
+)
+def test_create_virtual_networks_invalid(aos_logged_in, aos_session, specs):
+    with pytest.raises(AosInputError):
+        aos_logged_in.blueprint.create_virtual_networks("bp", specs)
+    aos_session.request.assert_not_called()
+
+
 def test_apply_configlet(
     aos_logged_in, aos_session, expected_auth_headers, aos_api_version
 ):
@@ -1235,91 +1469,55 @@ def test_get_anomalies_list(
 def test_get_all_tor_nodes(
     aos_logged_in, aos_session, expected_auth_headers, aos_api_version
 ):
-    node_fixture = f"aos/{aos_api_version}/blueprints/qe_get_nodes.json"
-    rd_node_fixture = f"aos/{aos_api_version}/blueprints/qe_get_rd_nodes.json"
+    tor_fixture = f"aos/{aos_api_version}/blueprints/qe_get_tor_nodes.json"
     bp_id = "evpn-cvx-virtual"
-    mlag_node1 = "d704d6f7-6070-4fef-ae99-99a94e08bf62"
-    mlag_node2 = "ef9b2dfb-3e12-4f73-8ec5-7c23911f3b99"
     single_node = "9e75966c-bfad-4ed1-83f9-282f552b24b2"
+    rg_node = "953be130-6c0a-4af1-9cb7-d2188e35abb1"
 
     aos_session.add_response(
         "POST",
         f"http://aos:80/api/blueprints/{bp_id}/qe",
         status=200,
         params=None,
-        resp=read_fixture(node_fixture),
-    )
-    aos_session.add_response(
-        "POST",
-        f"http://aos:80/api/blueprints/{bp_id}/qe",
-        status=200,
-        params=None,
-        resp=read_fixture(rd_node_fixture),
+        resp=read_fixture(tor_fixture),
     )
-    aos_session.add_response(
+
+    nodes = aos_logged_in.blueprint.get_all_tor_nodes(bp_id)
+
+    assert [n["id"] for n in nodes] == [rg_node, single_node]
+    aos_session.request.assert_called_once_with(
         "POST",
         f"http://aos:80/api/blueprints/{bp_id}/qe",
-        status=200,
         params=None,
-        resp=read_fixture(rd_node_fixture),
+        json={
+            "query": "match(node('system', name='leaf', role='leaf'),"
+            "optional(node('redundancy_group', name='rg')"
+            ".out('composed_of_systems')"
+            ".node('system', name='leaf')))"
+        },
+        headers=expected_auth_headers,
     )
 
-    assert aos_logged_in.blueprint.get_all_tor_nodes(bp_id)
 
-    aos_session.request.assert_has_calls(
-        [
-            call(
-                "POST",
-                "http://aos:80/api/aaa/login",
-                json=mock.ANY,
-                params=None,
-                headers=mock.ANY,
-            ),
-            call(
-                "POST",
-                f"http://aos:80/api/blueprints/{bp_id}/qe",
-                params=None,
-                json={"query": "match(node('system', name='leaf', role='leaf'))"},
-                headers=mock.ANY,
-            ),
-            call(
-                "POST",
-                f"http://aos:80/api/blueprints/{bp_id}/qe",
-                params=None,
-                json={
-                    "query": "match(node('redundancy_group', name='rg')"
-                    ".out('composed_of_systems')"
-                    ".node('system', role='leaf',"
-                    f" id='{mlag_node1}'))"
-                },
-                headers=mock.ANY,
-            ),
-            call(
-                "POST",
-                f"http://aos:80/api/blueprints/{bp_id}/qe",
-                params=None,
-                json={
-                    "query": "match(node('redundancy_group', name='rg')"
-                    ".out('composed_of_systems')"
-                    ".node('system', role='leaf',"
-                    f" id='{single_node}'))"
-                },
-                headers=mock.ANY,
-            ),
-            call(
-                "POST",
-                f"http://aos:80/api/blueprints/{bp_id}/qe",
-                params=None,
-                json={
-                    "query": "match(node('redundancy_group', name='rg')"
-                    ".out('composed_of_systems')"
-                    ".node('system', role='leaf',"
-                    f" id='{mlag_node2}'))"
-                },
-                headers=mock.ANY,
-            ),
-        ]
-    )
+def test_qe_query_many(aos_logged_in, aos_session, aos_api_version):
+    bp_id = "evpn-cvx-virtual"
+    queries = [f"match(node('system', name='s', label='leaf{i}'))" for i in range(8)]
+    responses = {}
+    for i, query in enumerate(queries):
+        responses[query] = json.dumps({"items": [{"s": {"label": f"leaf{i}"}}]})
+
+    def request(method, url, params=None, json=None, **kwargs):
+        # answer each query with its own result, whatever the order
+        resp = Response()
+        resp.status_code = 200
+        resp._content = responses[json["query"]].encode()
+        return resp
+
+    aos_session.request.side_effect = request
+
+    results = aos_logged_in.blueprint.qe_query_many(bp_id, queries, max_in_flight=3)
+
+    assert [r[0]["s"]["label"] for r in results] == [f"leaf{i}" for i in range(8)]
 
 
 def test_get_active_tasks_none(
@@ -1393,6 +1591,51 @@ def test_get_diff_status(
     }
 
 
+def test_iter_bp_nodes(
+    aos_logged_in, aos_session, expected_auth_headers, aos_api_version
+):
+    bp_id = "evpn-cvx-virtual"
+    node_fixture = f"aos/{aos_api_version}/blueprints/get_bp_nodes.json"
+
+    aos_session.add_response(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/nodes",
+        params={"node_type": "system"},
+        status=200,
+        resp=read_fixture(node_fixture),
+    )
+
+    nodes = aos_logged_in.blueprint.iter_bp_nodes(bp_id, node_type="system")
+
+    assert list(nodes) == list(deserialize_fixture(node_fixture)["nodes"].values())
+    aos_session.request.assert_called_with(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/nodes",
+        params={"node_type": "system"},
+        json=None,
+        headers=expected_auth_headers,
+        stream=True,
+    )
+
+
+def test_iter_qe_query(aos_logged_in, aos_session, aos_api_version):
+    bp_id = "evpn-cvx-virtual"
+    qe_fixture = f"aos/{aos_api_version}/blueprints/qe_get_nodes.json"
+
+    aos_session.add_response(
+        "POST",
+        f"http://aos:80/api/blueprints/{bp_id}/qe",
+        status=200,
+        resp=read_fixture(qe_fixture),
+    )
+
+    query = "node('system', name='leaf')"
+
+    items = aos_logged_in.blueprint.iter_qe_query(bp_id, query)
+
+    assert list(items) == deserialize_fixture(qe_fixture)["items"]
+
+
 def test_set_bp_node_label(
     aos_logged_in, aos_session, expected_auth_headers, aos_api_version
 ):
@@ -1718,3 +1961,43 @@ def test_get_node_relationships(
         source_id='y0D9CFzGPmBmGILP3Mk',
         target_id='C36GOMzvZZW1uQqGQQY'
     )
+
+
+def test_anomalies_columns(aos_logged_in, aos_session, aos_api_version):
+    a_fixture = f"aos/{aos_api_version}/blueprints/bp_anomalies.json"
+    bp_id = "evpn-cvx-virtual"
+    aos_session.add_response(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/anomalies",
+        status=200,
+        params={"exclude_anomaly_type": []},
+        resp=read_fixture(a_fixture),
+    )
+
+    columns = aos_logged_in.blueprint.anomalies_columns(bp_id)
+
+    assert columns["id"] == ["c43fcab1-0c74-4b2c-85de-c0cda9c32bd7"]
+    assert columns["type"] == ["config"]
+    assert columns["severity"] == ["critical"]
+    assert columns["system_id"] == ["525400CFDEB3"]
+
+
+def test_get_bp_nodes_columns(aos_logged_in, aos_session, aos_api_version):
+    bp_id = "evpn-cvx-virtual"
+    node_fixture = f"aos/{aos_api_version}/blueprints/get_bp_nodes.json"
+    aos_session.add_response(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/nodes",
+        params={"node_type": "system"},
+        status=200,
+        resp=read_fixture(node_fixture),
+    )
+
+    columns = aos_logged_in.blueprint.get_bp_nodes_columns(
+        bp_id, node_type="system"
+    )
+
+    nodes = list(deserialize_fixture(node_fixture)["nodes"].values())
+    assert columns["id"] == [n["id"] for n in nodes]
+    assert columns["label"] == [n.get("label") for n in nodes]
+    assert all(len(values) == len(nodes) for values in columns.values())
@@ -0,0 +1,103 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import json
+
+import pytest
+
+from aos.client import AosClient
+
+from tests.util import make_session, read_fixture
+
+BP_ID = "evpn-cvx-virtual"
+BP_URL = f"http://aos:80/api/blueprints/{BP_ID}"
+
+
+@pytest.fixture
+def aos_session():
+    return make_session()
+
+
+@pytest.fixture
+def aos(aos_session):
+    client = AosClient(protocol="http", host="aos", port=80, session=aos_session)
+    client.blueprint.enable_version_cache()
+    aos_session.add_response(
+        "GET",
+        f"{BP_URL}/nodes?node_type=system",
+        resp=read_fixture("aos/4.0.0/blueprints/get_bp_nodes.json"),
+    )
+    aos_session.add_response(
+        "GET",
+        f"{BP_URL}/virtual-networks",
+        resp=read_fixture("aos/4.0.0/blueprints/get_virtual_networks.json"),
+    )
+    return client
+
+
+def set_version(aos_session, staging, deployed=1):
+    aos_session.remove_response("GET", f"{BP_URL}/diff-status")
+    aos_session.add_response(
+        "GET",
+        f"{BP_URL}/diff-status",
+        resp=json.dumps({"staging_version": staging, "deployed_version": deployed}),
+    )
+
+
+def requests_to(aos_session, suffix):
+    return [
+        c for c in aos_session.request.call_args_list if c[0][1] == BP_URL + suffix
+    ]
+
+
+def test_reads_reused_while_version_unchanged(aos, aos_session):
+    set_version(aos_session, 1)
+
+    first = aos.blueprint.get_bp_nodes(BP_ID, "system")
+    assert aos.blueprint.get_bp_nodes(BP_ID, "system") is first
+    assert len(requests_to(aos_session, "/nodes?node_type=system")) == 1
+    assert len(requests_to(aos_session, "/diff-status")) == 2
+
+    set_version(aos_session, 2)
+    aos.blueprint.get_bp_nodes(BP_ID, "system")
+    assert len(requests_to(aos_session, "/nodes?node_type=system")) == 2
+
+
+def test_pinned_batch_checks_version_once(aos, aos_session):
+    set_version(aos_session, 1)
+    cache = aos.blueprint.version_cache
+
+    with cache.pinned(BP_ID):
+        for _ in range(3):
+            aos.blueprint.get_bp_nodes(BP_ID, "system")
+            aos.blueprint.get_all_virtual_networks(BP_ID)
+
+    assert len(requests_to(aos_session, "/diff-status")) == 1
+    assert len(requests_to(aos_session, "/virtual-networks")) == 1
+    assert cache.stats()["hits"] == 4
+
+
+def test_own_writes_invalidate(aos, aos_session):
+    set_version(aos_session, 1)
+    aos_session.add_response("PATCH", f"{BP_URL}/nodes/node_1", status=202)
+
+    with aos.blueprint.version_cache.pinned(BP_ID):
+        aos.blueprint.get_bp_nodes(BP_ID, "system")
+        aos.blueprint.set_bp_node_label(BP_ID, "node_1", label="leaf")
+        aos.blueprint.get_bp_nodes(BP_ID, "system")
+
+    assert len(requests_to(aos_session, "/nodes?node_type=system")) == 2
+    assert len(requests_to(aos_session, "/diff-status")) == 2
+
+
+def test_disable_version_cache(aos, aos_session):
+    aos.blueprint.disable_version_cache()
+
+    aos.blueprint.get_bp_nodes(BP_ID, "system")
+    aos.blueprint.get_bp_nodes(BP_ID, "system")
+
+    assert len(requests_to(aos_session, "/nodes?node_type=system")) == 2
+    assert requests_to(aos_session, "/diff-status") == []
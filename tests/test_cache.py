@@ -0,0 +1,237 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import json
+
+import pytest
+from requests import Response
+
+from aos.aos import AosRestAPI
+from aos.blueprint import AosBlueprint
+from aos.cache import ResponseCache, cache_path
+
+from tests.util import FakeClock, make_session
+
+
+def response(status=200, body=None, headers=None):
+    resp = Response()
+    resp.status_code = status
+    resp._content = json.dumps(body).encode() if body is not None else b""
+    resp._content_consumed = True
+    resp.headers.update(headers or {})
+    return resp
+
+
+@pytest.fixture
+def aos_session():
+    return make_session()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return ResponseCache(ttl=10, ttls={"/api/blueprints": 0}, clock=clock)
+
+
+@pytest.fixture
+def rest(aos_session, cache):
+    return AosRestAPI("http", "aos", 80, session=aos_session, cache=cache)
+
+
+def test_cache_path():
+    assert cache_path("api/design/templates/?x=1") == "/api/design/templates"
+    assert cache_path("/api/resources/ip-pools") == "/api/resources/ip-pools"
+
+
+def test_fresh_responses_served_from_cache(rest, aos_session, cache, clock):
+    url = "http://aos:80/api/design/templates"
+    aos_session.add_response("GET", url, status=200, resp=json.dumps({"items": []}))
+
+    assert rest.json_resp_get("/api/design/templates") == {"items": []}
+    assert rest.json_resp_get("/api/design/templates") == {"items": []}
+    assert aos_session.request.call_count == 1
+
+    clock.now = 11
+    assert rest.json_resp_get("/api/design/templates") == {"items": []}
+    assert aos_session.request.call_count == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_zero_disables_caching(rest, aos_session, cache):
+    url = "http://aos:80/api/blueprints"
+    aos_session.add_response("GET", url, status=200, resp=json.dumps({"items": []}))
+
+    rest.json_resp_get("/api/blueprints")
+    rest.json_resp_get("/api/blueprints")
+
+    assert aos_session.request.call_count == 2
+    assert len(cache) == 0
+
+
+def test_stale_response_revalidated(aos_session, cache, clock):
+    sent_headers = []
+
+    def request(method, url, params=None, json=None, headers=None, **kwargs):
+        sent_headers.append(dict(headers))
+        if "If-None-Match" in headers:
+            return response(304)
+        return response(200, {"items": [{"id": "p1"}]}, {"ETag": '"v1"'})
+
+    aos_session.request.side_effect = request
+    rest = AosRestAPI("http", "aos", 80, session=aos_session, cache=cache)
+
+    assert rest.json_resp_get("/api/resources/ip-pools") == {"items": [{"id": "p1"}]}
+    clock.now = 11
+    assert rest.json_resp_get("/api/resources/ip-pools") == {"items": [{"id": "p1"}]}
+    assert rest.json_resp_get("/api/resources/ip-pools") == {"items": [{"id": "p1"}]}
+
+    assert len(sent_headers) == 2
+    assert sent_headers[1]["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_writes_invalidate_path(rest, aos_session, cache):
+    base = "http://aos:80/api/design/templates"
+    aos_session.add_response("GET", base, status=200, resp=json.dumps({"items": []}))
+    aos_session.add_response(
+        "GET", f"{base}/t1", status=200, resp=json.dumps({"id": "t1"})
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/design/rack-types", status=200, resp="{}"
+    )
+    aos_session.add_response("DELETE", f"{base}/t1", status=202)
+
+    rest.json_resp_get("/api/design/templates")
+    rest.json_resp_get("/api/design/templates/t1")
+    rest.json_resp_get("/api/design/rack-types")
+    assert len(cache) == 3
+
+    rest.delete("/api/design/templates/t1")
+
+    assert len(cache) == 1
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_list_params(rest, aos_session, cache):
+    url = "http://aos:80/api/design/templates"
+    aos_session.add_response(
+        "GET",
+        url,
+        params={"type": ["rack_based", "pod_based"]},
+        status=200,
+        resp=json.dumps({"items": []}),
+    )
+
+    for _ in range(2):
+        rest.json_resp_get(
+            "/api/design/templates", params={"type": ["rack_based", "pod_based"]}
+        )
+
+    assert aos_session.request.call_count == 1
+    assert cache.key(url, {"a": [1, {"b": [2]}]}) == cache.key(
+        url, {"a": [1, {"b": [2]}]}
+    )
+
+
+def test_anomalies_with_cache(aos_session, clock):
+    bp_id = "bp1"
+    rest = AosRestAPI(
+        "http", "aos", 80, session=aos_session, cache=ResponseCache(clock=clock)
+    )
+    aos_session.add_response(
+        "GET",
+        f"http://aos:80/api/blueprints/{bp_id}/anomalies",
+        params={"exclude_anomaly_type": []},
+        status=200,
+        resp=json.dumps({"items": []}),
+    )
+
+    assert list(AosBlueprint(rest).anomalies(bp_id)) == []
+
+
+def test_tasks_and_diff_status_not_cached(aos_session, clock):
+    cache = ResponseCache(clock=clock)
+    rest = AosRestAPI("http", "aos", 80, session=aos_session, cache=cache)
+    for path in ("tasks", "tasks/t1", "diff-status"):
+        aos_session.add_response(
+            "GET", f"http://aos:80/api/blueprints/bp1/{path}", status=200, resp="{}"
+        )
+
+    for _ in range(2):
+        for path in ("tasks", "tasks/t1", "diff-status"):
+            rest.json_resp_get(f"/api/blueprints/bp1/{path}")
+
+    assert aos_session.request.call_count == 6
+    assert len(cache) == 0
+
+
+def test_blueprint_writes_invalidate_blueprint(aos_session, clock):
+    cache = ResponseCache(clock=clock)
+    rest = AosRestAPI("http", "aos", 80, session=aos_session, cache=cache)
+    for bp_id in ("bp1", "bp2"):
+        aos_session.add_response(
+            "GET",
+            f"http://aos:80/api/blueprints/{bp_id}/virtual-networks",
+            status=200,
+            resp="{}",
+        )
+    aos_session.add_response(
+        "POST",
+        "http://aos:80/api/blueprints/bp1/virtual-networks-batch",
+        status=201,
+        resp="{}",
+    )
+    aos_session.add_response(
+        "DELETE", "http://aos:80/api/blueprints/bp2/virtual_networks/vn1", status=202
+    )
+
+    rest.json_resp_get("/api/blueprints/bp1/virtual-networks")
+    rest.json_resp_get("/api/blueprints/bp2/virtual-networks")
+    rest.json_resp_post("/api/blueprints/bp1/virtual-networks-batch", data={})
+
+    # only the list of bp2 is left
+    assert len(cache) == 1
+    rest.json_resp_get("/api/blueprints/bp2/virtual-networks")
+    assert aos_session.request.call_count == 3
+
+    rest.delete("/api/blueprints/bp2/virtual_networks/vn1")
+    assert len(cache) == 0
+
+
+def test_graph_queries_do_not_invalidate(cache):
+    cache.update(
+        cache.key("http://aos:80/api/design/templates"),
+        "/api/design/templates",
+        response(200, {"items": []}),
+    )
+
+    assert cache.invalidate("POST", "/api/design/templates/qe") == 0
+    assert cache.invalidate("POST", "/api/design/templates") == 1
+
+
+def test_lru_eviction(clock):
+    cache = ResponseCache(maxsize=2, clock=clock)
+    for name in ("a", "b", "c"):
+        if name == "c":
+            cache.lookup(cache.key("a"))
+        cache.update(cache.key(name), f"/api/{name}", response(200, {}))
+
+    assert cache.lookup(cache.key("a"))[0] is not None
+    assert cache.lookup(cache.key("b"))[0] is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_max_bytes(clock):
+    cache = ResponseCache(max_bytes=30, clock=clock)
+    for name in ("a", "b"):
+        cache.update(cache.key(name), f"/api/{name}", response(200, {"x": "y" * 10}))
+
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] <= 30
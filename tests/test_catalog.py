@@ -0,0 +1,131 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import json
+import time
+
+import pytest
+
+from aos.catalog import AosCatalog
+from aos.client import AosClient
+from aos.design import Template
+
+from tests.util import FakeClock, make_session, read_fixture
+
+TEMPLATES_URL = "http://aos:80/api/design/templates"
+
+
+@pytest.fixture
+def aos_session():
+    session = make_session()
+    session.add_response(
+        "GET",
+        TEMPLATES_URL,
+        resp=read_fixture("aos/4.0.0/design/get_templates.json"),
+    )
+    session.add_response(
+        "GET",
+        "http://aos:80/api/resources/ip-pools",
+        resp=read_fixture("aos/4.0.0/resources/get_ip_pools.json"),
+    )
+    return session
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def aos(aos_session):
+    return AosClient(protocol="http", host="aos", port=80, session=aos_session)
+
+
+@pytest.fixture
+def catalog(aos, clock):
+    return AosCatalog(max_age=60, clock=clock).attach(aos.rest)
+
+
+def template_loads(aos_session):
+    return [
+        c for c in aos_session.request.call_args_list if c[0][1] == TEMPLATES_URL
+    ]
+
+
+def test_find_by_name_loads_collection_once(aos, aos_session, catalog):
+    for _ in range(100):
+        found = aos.design.templates.find_by_name("L2 Pod External")
+
+    assert [t.id for t in found] == ["pod1"]
+    assert isinstance(found[0], Template)
+    assert aos.design.templates.find_by_name("missing") == []
+    assert len(template_loads(aos_session)) == 1
+    assert catalog.stats()["collections"] == {"/api/design/templates": 2}
+
+
+def test_catalog_lookups(aos, catalog):
+    pools = aos.resources.ipv4_pools.find_by_name("spine-leaf")
+    assert [p.id for p in pools] == ["adb5641b-3182-4092-bcc4-85c49befe122"]
+
+    assert catalog.id_by_name("/api/design/templates", "lab_evpn_mlag") == (
+        "lab_evpn_mlag"
+    )
+    assert catalog.get("/api/design/templates", "pod1")["display_name"] == (
+        "L2 Pod External"
+    )
+    assert catalog.get("/api/design/templates", "nope") is None
+
+
+def test_catalog_max_age(aos, aos_session, catalog, clock):
+    aos.design.templates.find_by_name("pod1")
+    clock.now = 30
+    aos.design.templates.find_by_name("pod1")
+    assert len(template_loads(aos_session)) == 1
+
+    clock.now = 61
+    aos.design.templates.find_by_name("pod1")
+    assert len(template_loads(aos_session)) == 2
+
+
+def test_writes_mark_collection_stale(aos, aos_session, catalog):
+    aos_session.add_response("DELETE", f"{TEMPLATES_URL}/pod1", status=202)
+
+    aos.design.templates.find_by_name("pod1")
+    aos.design.templates.delete("pod1")
+    aos.design.templates.find_by_name("pod1")
+
+    assert len(template_loads(aos_session)) == 2
+
+
+def test_detach(aos, aos_session, catalog):
+    catalog.detach(aos.rest)
+
+    aos.design.templates.find_by_name("pod1")
+    aos.design.templates.find_by_name("pod1")
+
+    assert aos.rest.catalog is None
+    assert len(template_loads(aos_session)) == 2
+
+
+def test_background_refresh(aos, aos_session):
+    catalog = AosCatalog(refresh_interval=0.01).attach(aos.rest)
+    try:
+        aos.design.templates.find_by_name("pod1")
+        aos_session.remove_response("GET", TEMPLATES_URL)
+        aos_session.add_response(
+            "GET",
+            TEMPLATES_URL,
+            resp=json.dumps({"items": [{"id": "t2", "display_name": "new"}]}),
+        )
+
+        for _ in range(200):
+            if catalog.id_by_name("/api/design/templates", "new"):
+                break
+            time.sleep(0.01)
+    finally:
+        catalog.detach(aos.rest)
+
+    assert catalog.id_by_name("/api/design/templates", "new") == "t2"
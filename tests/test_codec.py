@@ -0,0 +1,79 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import json
+
+import pytest
+
+from aos.aos import AosAPIUnprocessableResponse, AosRestAPI
+from aos.codec import CODECS, JsonCodec, get_codec
+
+from tests.util import make_session
+
+
+@pytest.fixture
+def aos_session():
+    return make_session()
+
+
+@pytest.fixture(params=sorted(CODECS))
+def codec(request):
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    return get_codec(request.param)
+
+
+def test_codec_round_trip(codec):
+    doc = {"nodes": {"n1": {"label": "leaf1", "tags": ["é"], "asn": 65000}}}
+
+    encoded = codec.dumps(doc)
+
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == doc
+    assert codec.loads(encoded) == doc
+
+
+def test_codec_invalid_document(codec):
+    with pytest.raises(ValueError):
+        codec.loads(b'{"nodes": ')
+
+
+def test_get_codec():
+    codec = JsonCodec()
+    assert get_codec(codec) is codec
+    assert get_codec("json").name == "json"
+    assert get_codec("auto").name in CODECS
+
+    with pytest.raises(ValueError):
+        get_codec("simplejson")
+
+
+def test_rest_uses_codec(aos_session, codec):
+    rest = AosRestAPI("http", "aos", 80, session=aos_session, json_codec=codec)
+    aos_session.add_response(
+        "POST",
+        "http://aos:80/api/blueprints/bp/qe",
+        status=200,
+        resp=json.dumps({"items": [{"n": {"id": "n1"}}]}),
+    )
+
+    resp = rest.json_resp_post("/api/blueprints/bp/qe", data={"query": "q"})
+
+    assert resp == {"items": [{"n": {"id": "n1"}}]}
+    kwargs = aos_session.request.call_args[1]
+    assert kwargs["json"] is None
+    assert json.loads(kwargs["data"]) == {"query": "q"}
+    assert kwargs["headers"]["Content-Type"] == "application/json"
+
+
+def test_rest_codec_invalid_response(aos_session, codec):
+    rest = AosRestAPI("http", "aos", 80, session=aos_session, json_codec=codec)
+    aos_session.add_response(
+        "GET", "http://aos:80/api/blueprints", status=200, resp="not json"
+    )
+
+    with pytest.raises(AosAPIUnprocessableResponse):
+        rest.json_resp_get("/api/blueprints")
@@ -0,0 +1,96 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+
+import pytest
+
+from aos.columnar import ColumnBuilder, convert, to_columns
+
+ITEMS = [
+    {"id": "a", "role": "leaf", "facts": {"asn": 65001, "up": True}},
+    {"id": "b", "facts": {"asn": None, "up": False}, "tags": ["x"]},
+    {"id": "c", "role": "spine", "facts": {"asn": 65003, "up": True}},
+]
+
+
+def test_columns_from_paths():
+    columns = to_columns(
+        ITEMS, {"id": "id", "asn": "facts.asn", "missing": "facts.x.y"}
+    )
+
+    assert columns == {
+        "id": ["a", "b", "c"],
+        "asn": [65001, None, 65003],
+        "missing": [None, None, None],
+    }
+    assert to_columns(ITEMS, ["id", "role"]) == {
+        "id": ["a", "b", "c"],
+        "role": ["leaf", None, "spine"],
+    }
+
+
+def test_columns_from_keys_backfills_late_keys():
+    builder = ColumnBuilder().extend(ITEMS)
+
+    assert builder.rows == 3
+    assert list(builder.columns) == ["id", "role", "facts", "tags"]
+    assert builder.columns["tags"] == [None, ["x"], None]
+    assert builder.columns["role"] == ["leaf", None, "spine"]
+
+
+def test_convert_formats():
+    columns = to_columns(ITEMS, ["id"])
+
+    assert convert(columns) is columns
+    with pytest.raises(ValueError):
+        convert(columns, "arrow")
+
+
+def test_numpy_structured_array():
+    np = pytest.importorskip("numpy")
+    columns = to_columns(
+        ITEMS,
+        {"id": "id", "asn": "facts.asn", "up": "facts.up", "tags": "tags"},
+    )
+
+    arr = convert(columns, "numpy")
+
+    assert arr.dtype.names == ("id", "asn", "up", "tags")
+    assert arr["id"].tolist() == ["a", "b", "c"]
+    assert np.isnan(arr["asn"][1]) and arr["asn"][0] == 65001
+    assert arr["up"].dtype == bool and arr["up"].sum() == 2
+    assert arr["tags"][1] == ["x"]
+
+
+def test_pandas_frame():
+    pytest.importorskip("pandas")
+    columns = to_columns(ITEMS, {"id": "id", "role": "role"})
+
+    frame = convert(columns, "pandas")
+
+    assert frame["id"].tolist() == ["a", "b", "c"]
+    assert convert(columns, "auto").equals(frame)
+
+    repeated = {"severity": ["critical", "info"] * 3, "id": list("abcdef")}
+    frame = convert(repeated, "pandas")
+    assert str(frame["severity"].dtype) == "category"
+    assert str(frame["id"].dtype) != "category"
+
+
+def test_auto_without_numpy_and_pandas(monkeypatch):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name in ("numpy", "pandas"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+    columns = to_columns(ITEMS, ["id"])
+
+    assert convert(columns, "auto") is columns
+    with pytest.raises(ImportError):
+        convert(columns, "numpy")
@@ -428,3 +428,23 @@ def test_get_os_images_empty(aos_logged_in, aos_session, expected_auth_headers):
     )
 
     assert aos.get_os_images() == []
+
+
+def test_get_managed_devices_columns(aos_logged_in, aos_session, aos_api_version):
+    devices_all = json.loads(
+        read_fixture(f"aos/{aos_api_version}/devices/get_managed_devices_all.json")
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/systems", status=200, resp=json.dumps(devices_all)
+    )
+
+    columns = aos_logged_in.devices.managed_devices.get_all_columns(
+        columns={"id": "id", "hw_model": "facts.hw_model", "rack": "facts.rack"}
+    )
+
+    devices = devices_all["items"]
+    assert columns == {
+        "id": [d["id"] for d in devices],
+        "hw_model": [d["facts"]["hw_model"] for d in devices],
+        "rack": [None] * len(devices),
+    }
@@ -0,0 +1,206 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import json
+
+import pytest
+
+from aos.client import AosClient
+from aos.graph import BlueprintGraph, BlueprintGraphSync, GraphQueryError
+
+from tests.util import make_session, read_fixture, deserialize_fixture
+
+
+def system(node_id, role, label=None):
+    return {"id": node_id, "type": "system", "role": role, "label": label or node_id}
+
+
+def rel(rel_id, rel_type, source, target):
+    return {"id": rel_id, "type": rel_type, "source_id": source, "target_id": target}
+
+
+@pytest.fixture
+def graph():
+    nodes = [
+        system("spine1", "spine"),
+        system("leaf1", "leaf"),
+        system("leaf2", "leaf"),
+        system("leaf3", "leaf"),
+        {"id": "rg1", "type": "redundancy_group", "rg_type": "mlag", "label": "rg"},
+        {"id": "if1", "type": "interface", "if_name": "xe-0/0/0"},
+    ]
+    rels = [
+        rel("r1", "composed_of_systems", "rg1", "leaf1"),
+        rel("r2", "composed_of_systems", "rg1", "leaf2"),
+        rel("r3", "hosted_interfaces", "leaf3", "if1"),
+    ]
+    return BlueprintGraph(
+        {n["id"]: n for n in nodes}, {r["id"]: r for r in rels}, bp_id="bp"
+    )
+
+
+def ids(items, name):
+    return sorted(item[name]["id"] for item in items)
+
+
+def test_single_node_query(graph):
+    items = graph.query("match(node('system', name='leaf', role='leaf'))")
+
+    assert ids(items, "leaf") == ["leaf1", "leaf2", "leaf3"]
+
+
+def test_path_query(graph):
+    items = graph.query(
+        "match(node('redundancy_group', name='rg')"
+        ".out('composed_of_systems')"
+        ".node('system', role='leaf', id='leaf2'))"
+    )
+
+    assert len(items) == 1
+    assert items[0]["rg"]["id"] == "rg1"
+    assert "leaf2" not in items[0]
+
+
+def test_named_edges_and_in(graph):
+    items = graph.query(
+        "node('interface', name='intf').in_('hosted_interfaces', name='r')"
+        ".node(name='sys')"
+    )
+
+    assert items == [
+        {
+            "intf": graph.node("if1"),
+            "r": graph.relationships["r3"],
+            "sys": graph.node("leaf3"),
+        }
+    ]
+
+
+def test_match_joins_paths_on_names(graph):
+    items = graph.query(
+        "match("
+        "node('system', name='leaf', role=is_in(['leaf', 'access'])),"
+        "node('redundancy_group', name='rg').out().node(name='leaf'),"
+        ")"
+    )
+
+    assert ids(items, "leaf") == ["leaf1", "leaf2"]
+
+
+def test_predicates(graph):
+    assert ids(graph.query("node('system', name='s', role=ne('leaf'))"), "s") == [
+        "spine1"
+    ]
+    assert ids(graph.query("node(name='n', role=is_none())"), "n") == ["if1", "rg1"]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "match(node('system', name='s').having(node(name='s'), at_most=0))",
+        "node('system', name='s', role=some_predicate())",
+        "node('system', name='s').where(lambda s: s)",
+        "match(node('system'",
+    ],
+)
+def test_unsupported_queries(graph, query):
+    with pytest.raises(GraphQueryError):
+        graph.query(query)
+
+
+def test_updates_keep_indexes_consistent(graph):
+    graph.add_node(system("leaf1", "spine"))
+    graph.remove_node("leaf2")
+
+    assert [n["id"] for n in graph.find_nodes("system", role="leaf")] == ["leaf3"]
+    assert graph.neighbors("rg1", "composed_of_systems") == [graph.node("leaf1")]
+    assert "r2" not in graph.relationships
+
+
+def test_get_bp_graph():
+    session = make_session()
+    bp_url = "http://aos:80/api/blueprints/bp"
+    session.add_response(
+        "GET",
+        f"{bp_url}/diff-status",
+        resp=read_fixture("aos/4.0.0/blueprints/get_diff_status.json"),
+    )
+    session.add_response(
+        "GET",
+        f"{bp_url}/nodes",
+        resp=read_fixture("aos/4.0.0/blueprints/get_bp_nodes.json"),
+    )
+    session.add_response(
+        "GET",
+        f"{bp_url}/relationships",
+        params={"relationship_type": None, "source_id": None, "target_id": None},
+        resp=read_fixture("aos/4.0.0/blueprints/get_relationships.json"),
+    )
+    aos = AosClient(protocol="http", host="aos", port=80, session=session)
+
+    graph = aos.blueprint.get_bp_graph("bp")
+
+    nodes = deserialize_fixture("aos/4.0.0/blueprints/get_bp_nodes.json")["nodes"]
+    assert graph.version == (1, 0)
+    assert len(graph) == len(nodes)
+    assert len(graph.relationships) == 3
+
+
+def test_graph_sync():
+    session = make_session()
+    bp_url = "http://aos:80/api/blueprints/bp"
+    aos = AosClient(protocol="http", host="aos", port=80, session=session)
+
+    def serve(version, nodes, rels):
+        for path in ("diff-status", "nodes", "relationships"):
+            session.remove_response("GET", f"{bp_url}/{path}")
+        session.add_response(
+            "GET",
+            f"{bp_url}/diff-status",
+            resp=json.dumps({"staging_version": version, "deployed_version": 1}),
+        )
+        session.add_response(
+            "GET",
+            f"{bp_url}/nodes",
+            resp=json.dumps({"nodes": {n["id"]: n for n in nodes}}),
+        )
+        session.add_response(
+            "GET",
+            f"{bp_url}/relationships",
+            resp=json.dumps({"relationships": {r["id"]: r for r in rels}}),
+        )
+
+    graph = BlueprintGraph(
+        {"leaf1": system("leaf1", "leaf"), "leaf2": system("leaf2", "leaf")},
+        {"r1": rel("r1", "link", "leaf1", "leaf2")},
+        bp_id="bp",
+        version=(1, 1),
+    )
+    sync = BlueprintGraphSync(aos.blueprint, "bp", graph)
+    events = []
+    sync.subscribe(events.append)
+
+    serve(1, [], [])
+    assert sync.sync() == []
+
+    serve(
+        2,
+        [system("leaf1", "spine"), system("leaf3", "leaf")],
+        [rel("r2", "link", "leaf1", "leaf3")],
+    )
+    changes = sync.sync()
+
+    assert sorted((c.action, c.kind, c.id) for c in changes) == [
+        ("added", "node", "leaf3"),
+        ("added", "relationship", "r2"),
+        ("changed", "node", "leaf1"),
+        ("removed", "node", "leaf2"),
+        ("removed", "relationship", "r1"),
+    ]
+    assert events == changes
+    assert graph.version == (2, 1)
+    assert [n["id"] for n in graph.find_nodes("system", role="leaf")] == ["leaf3"]
+    assert graph.neighbors("leaf1", "link") == [graph.node("leaf3")]
@@ -0,0 +1,150 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import json
+
+import pytest
+
+from aos.aos import AosAPIError, AosInputError, AosRestAPI
+from aos.metrics import Histogram, MetricsCollector, endpoint_template
+from aos.retry import RetryPolicy
+
+from tests.util import make_session
+
+
+@pytest.fixture
+def aos_session():
+    return make_session()
+
+
+@pytest.fixture
+def rest(aos_session):
+    return AosRestAPI("http", "aos", 80, session=aos_session)
+
+
+def test_endpoint_template():
+    assert (
+        endpoint_template("/api/blueprints/evpn-vx/qe") == "/api/blueprints/{id}/qe"
+    )
+    assert (
+        endpoint_template("api/blueprints/bp-1/nodes/n1/config-rendering?type=x")
+        == "/api/blueprints/{id}/nodes/{id}/config-rendering"
+    )
+    assert (
+        endpoint_template("http://aos:80/api/systems/525400CFDEB3/anomalies")
+        == "/api/systems/{id}/anomalies"
+    )
+    assert (
+        endpoint_template("/api/blueprints/bp/systems/n1/loopback/0")
+        == "/api/blueprints/{id}/systems/{id}/loopback/{id}"
+    )
+    assert endpoint_template("/api/version") == "/api/version"
+
+
+def test_histogram():
+    h = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        h.observe(value)
+
+    assert h.cumulative() == [(0.1, 1), (1.0, 3), ("+Inf", 4)]
+    assert h.quantile(0.5) == 1.0
+    assert h.quantile(1.0) == 3.0
+    assert h.sum == pytest.approx(4.25)
+
+
+def test_hooks_are_called(rest, aos_session):
+    events = []
+    aos_session.add_response(
+        "GET", "http://aos:80/api/version", status=200, resp=json.dumps({})
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/broken", status=500, resp=json.dumps({})
+    )
+    rest.add_hook("pre_request", lambda req: events.append(("pre", req.uri)))
+    rest.add_hook(
+        "post_response",
+        lambda req, resp: events.append(("post", req.uri, resp.status_code)),
+    )
+    rest.add_hook("on_error", lambda req, e: events.append(("error", req.uri)))
+
+    rest.json_resp_get("/api/version")
+    with pytest.raises(AosAPIError):
+        rest.json_resp_get("/api/broken")
+
+    assert events == [
+        ("pre", "/api/version"),
+        ("post", "/api/version", 200),
+        ("pre", "/api/broken"),
+        ("post", "/api/broken", 500),
+        ("error", "/api/broken"),
+    ]
+
+
+def test_failing_hook_does_not_break_request(rest, aos_session):
+    aos_session.add_response(
+        "GET", "http://aos:80/api/version", status=200, resp=json.dumps({"a": 1})
+    )
+    rest.add_hook("pre_request", lambda req: 1 / 0)
+
+    assert rest.json_resp_get("/api/version") == {"a": 1}
+
+
+def test_unknown_hook_event(rest):
+    with pytest.raises(AosInputError):
+        rest.add_hook("before", print)
+
+
+def test_metrics_collector(aos_session, monkeypatch):
+    monkeypatch.setattr("aos.aos.time.sleep", lambda delay: None)
+    rest = AosRestAPI(
+        "http", "aos", 80, session=aos_session, retry_policy=RetryPolicy()
+    )
+    metrics = MetricsCollector().attach(rest)
+    for bp_id in ("bp-1", "bp-2"):
+        aos_session.add_response(
+            "POST",
+            f"http://aos:80/api/blueprints/{bp_id}/qe",
+            status=200,
+            resp=json.dumps({"items": []}),
+        )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/blueprints", status=503, resp="busy"
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/blueprints", status=200, resp=json.dumps({})
+    )
+
+    rest.json_resp_post("/api/blueprints/bp-1/qe", data={"query": "q"})
+    rest.json_resp_post("/api/blueprints/bp-2/qe", data={"query": "q"})
+    rest.json_resp_get("/api/blueprints")
+
+    stats = metrics.to_dict()
+    assert set(stats) == {"POST /api/blueprints/{id}/qe", "GET /api/blueprints"}
+    qe = stats["POST /api/blueprints/{id}/qe"]
+    assert qe["count"] == 2
+    assert qe["statuses"] == {200: 2}
+    assert qe["bytes_received"] == 2 * len(json.dumps({"items": []}))
+    assert stats["GET /api/blueprints"]["retries"] == 1
+    assert stats["GET /api/blueprints"]["statuses"] == {200: 1}
+
+    assert [s.endpoint for s in metrics.slowest(5)] != []
+
+    text = metrics.to_prometheus()
+    assert (
+        'aos_api_request_duration_seconds_count{method="POST",'
+        'endpoint="/api/blueprints/{id}/qe"} 2'
+    ) in text
+    assert (
+        'aos_api_responses_total{method="GET",endpoint="/api/blueprints",'
+        'status="200"} 1'
+    ) in text
+    assert (
+        'aos_api_retries_total{method="GET",endpoint="/api/blueprints"} 1' in text
+    )
+
+    metrics.detach(rest)
+    rest.json_resp_get("/api/blueprints")
+    assert metrics.to_dict()["GET /api/blueprints"]["count"] == 1
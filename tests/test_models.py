@@ -0,0 +1,180 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+from aos.blueprint import (
+    CompactVirtualNetwork,
+    LazyVirtualNetwork,
+    VirtualNetwork,
+)
+from aos.devices import (
+    CompactSystem,
+    CompactSystemAgent,
+    LazySystem,
+    NullSystem,
+    System,
+    SystemAgent,
+)
+from aos.models import compact, lazy
+from aos.resources import CompactIPPool, CompactPoolSubnet
+
+from tests.util import deserialize_fixture
+
+SYSTEM = {
+    "id": "525400CFDEB3",
+    "device_key": "525400CFDEB3",
+    "facts": {"hw_model": "vEOS", "mgmt_ipaddr": "172.20.1.10"},
+    "status": {"state": "IS-ACTIVE", "comm_state": "on"},
+    "services": ["lldp", "bgp"],
+}
+RAW_SYSTEM_FIELDS = [
+    "container_status",
+    "facts",
+    "services",
+    "status",
+    "user_config",
+]
+
+
+def test_compact_system_has_no_instance_dict():
+    system = CompactSystem.from_json(SYSTEM)
+
+    assert not hasattr(system, "__dict__")
+    assert type(system).__name__ == "CompactSystem"
+    assert system.id == "525400CFDEB3"
+    assert system.facts == SYSTEM["facts"]
+    assert system.status == SYSTEM["status"]
+    assert system.user_config == {}
+
+
+def test_compact_fields_match_model():
+    system = System.from_json(SYSTEM)
+    compact_system = CompactSystem.from_json(SYSTEM)
+
+    assert dataclasses.asdict(compact_system) == dataclasses.asdict(system)
+    assert repr(compact_system) == "Compact" + repr(system)
+
+
+def test_raw_fields_are_decoded_copies():
+    system = CompactSystem.from_json(SYSTEM)
+
+    system.facts["hw_model"] = "changed"
+
+    assert system.facts["hw_model"] == "vEOS"
+    system.facts = {"hw_model": "7050"}
+    assert system.facts == {"hw_model": "7050"}
+
+
+def test_compact_keeps_methods_and_defaults():
+    agent = CompactSystemAgent(
+        agent_uuid="a",
+        management_ip="172.20.1.10",
+        operation_mode="telemetry_only",
+        platform="eos",
+        system_id="s",
+    )
+
+    assert agent.telemetry_only()
+    assert agent.is_offbox is False
+    assert agent.hostname is None
+
+
+def test_compact_virtual_network_from_fixture():
+    vns = deserialize_fixture("aos/4.0.0/blueprints/get_virtual_networks.json")
+    for vn in vns["virtual_networks"].values():
+        assert dataclasses.asdict(
+            CompactVirtualNetwork.from_json(vn)
+        ) == dataclasses.asdict(VirtualNetwork.from_json(vn))
+
+
+def test_compact_nested_models():
+    pool = CompactIPPool.from_json(
+        {
+            "id": "pool",
+            "display_name": "pool",
+            "subnets": [{"network": "10.0.0.0/16"}],
+        }
+    )
+
+    assert pool.subnets == [CompactPoolSubnet(network="10.0.0.0/16")]
+
+
+def test_frozen_variant():
+    frozen_system = compact(System, frozen=True, raw_fields=RAW_SYSTEM_FIELDS)
+    system = frozen_system.from_json(SYSTEM)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        system.id = "other"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        system.facts = {}
+    assert {system, frozen_system.from_json(SYSTEM)} == {system}
+    assert copy.deepcopy(system) == system
+
+
+def test_frozen_variant_hash_skips_containers():
+    frozen_system = compact(System, frozen=True, raw_fields=["facts"])
+    system = frozen_system.from_json(SYSTEM)
+
+    # status, services, ... stay decoded dicts and lists
+    assert hash(system) == hash(frozen_system.from_json(SYSTEM))
+    assert hash(compact(System, frozen=True)(**dataclasses.asdict(system)))
+
+
+def test_variants_are_shared_and_picklable():
+    assert compact(System) is compact(System)
+    assert compact(System, frozen=True) is not compact(System)
+
+    system = CompactSystem.from_json(SYSTEM)
+    assert pickle.loads(pickle.dumps(system)) == system
+
+
+def test_unknown_raw_field():
+    with pytest.raises(ValueError):
+        compact(System, raw_fields=["nope"])
+
+
+def test_lazy_system_reads_json_on_access():
+    system = LazySystem.from_json(SYSTEM)
+
+    assert system.raw is SYSTEM
+    assert system.id == "525400CFDEB3"
+    assert system.facts is SYSTEM["facts"]
+    assert system._model is None
+
+    # missing keys get the from_json default
+    assert system.user_config == {}
+    assert system == System.from_json(SYSTEM)
+    assert system.to_model() is system.to_model()
+
+
+def test_lazy_derived_fields_and_methods():
+    vns = deserialize_fixture("aos/4.0.0/blueprints/get_virtual_networks.json")
+    for vn in vns["virtual_networks"].values():
+        lazy_vn = LazyVirtualNetwork.from_json(vn)
+        model = VirtualNetwork.from_json(vn)
+
+        assert lazy_vn.tagged_ct == model.tagged_ct
+        assert lazy_vn.untagged_ct == model.untagged_ct
+        assert lazy_vn == model
+        assert repr(lazy_vn) == f"Lazy{model!r}"
+
+    agent = lazy(SystemAgent, derived=["agent_uuid", "is_offbox"]).from_json(
+        {"id": "a", "status": {"operation_mode": "telemetry_only"}}
+    )
+    assert agent.agent_uuid == "a"
+    assert agent.telemetry_only()
+
+
+def test_lazy_none_and_pickle():
+    assert LazySystem.from_json(None) is NullSystem
+
+    system = pickle.loads(pickle.dumps(LazySystem.from_json(SYSTEM)))
+    assert system == LazySystem.from_json(SYSTEM)
+    assert lazy(System) is LazySystem
@@ -0,0 +1,193 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import json
+
+import pytest
+
+from aos.client import AosClient
+from aos.devices import System
+from aos.paging import PAGING_STYLES, PagedIterator, Paging
+
+from tests.util import make_session
+
+SYSTEMS_URL = "http://aos:80/api/systems"
+
+
+def system(i):
+    return {"id": f"sys-{i}", "device_key": f"sys-{i}", "status": {}, "facts": {}}
+
+
+def items(n):
+    return [system(i) for i in range(n)]
+
+
+@pytest.fixture
+def aos_session():
+    return make_session()
+
+
+@pytest.fixture
+def aos(aos_session):
+    client = AosClient(protocol="http", host="aos", port=80, session=aos_session)
+    yield client
+    client.rest.close()
+
+
+def requested_params(aos_session):
+    return [c[1]["params"] for c in aos_session.request.call_args_list]
+
+
+def test_iter_all_without_page_size_uses_one_request(aos, aos_session):
+    aos_session.add_response(
+        "GET", SYSTEMS_URL, resp=json.dumps({"items": items(3)})
+    )
+
+    systems = aos.devices.managed_devices.get_all()
+
+    assert [s.id for s in systems] == ["sys-0", "sys-1", "sys-2"]
+    assert all(isinstance(s, System) for s in systems)
+    assert requested_params(aos_session) == [None]
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_page_paging(aos, aos_session, prefetch):
+    all_items = items(5)
+    for page in (1, 2, 3):
+        aos_session.add_response(
+            "GET",
+            SYSTEMS_URL,
+            params={"per_page": 2, "page": page},
+            resp=json.dumps({"items": all_items[(page - 1) * 2:page * 2]}),
+        )
+
+    paged = PagedIterator(aos.rest, "/api/systems", page_size=2, prefetch=prefetch)
+
+    assert [i["id"] for i in paged] == [i["id"] for i in all_items]
+    assert requested_params(aos_session) == [
+        {"per_page": 2, "page": 1},
+        {"per_page": 2, "page": 2},
+        {"per_page": 2, "page": 3},
+    ]
+
+
+def test_offset_paging_stops_on_empty_page(aos, aos_session):
+    all_items = items(4)
+    for offset in (0, 2, 4):
+        aos_session.add_response(
+            "GET",
+            SYSTEMS_URL,
+            params={"state": "ok", "limit": 2, "offset": offset},
+            resp=json.dumps({"items": all_items[offset:offset + 2]}),
+        )
+
+    paged = PagedIterator(
+        aos.rest,
+        "/api/systems",
+        params={"state": "ok"},
+        page_size=2,
+        paging="offset",
+        transform=System.from_json,
+    )
+
+    assert [s.id for s in paged] == [i["id"] for i in all_items]
+    assert len(requested_params(aos_session)) == 3
+
+
+def test_cursor_paging(aos, aos_session):
+    aos_session.add_response(
+        "GET",
+        SYSTEMS_URL,
+        params={"limit": 2},
+        resp=json.dumps({"items": items(2), "next_cursor": "c1"}),
+    )
+    aos_session.add_response(
+        "GET",
+        SYSTEMS_URL,
+        params={"limit": 2, "cursor": "c1"},
+        resp=json.dumps({"items": [system(2)]}),
+    )
+
+    paged = PagedIterator(aos.rest, "/api/systems", page_size=2, paging="cursor")
+
+    assert [i["id"] for i in paged] == ["sys-0", "sys-1", "sys-2"]
+
+
+def test_custom_paging_parameters(aos, aos_session):
+    aos_session.add_response(
+        "GET",
+        SYSTEMS_URL,
+        params={"count": 2, "skip": 0},
+        resp=json.dumps({"items": [system(0)]}),
+    )
+    paging = Paging("offset", "count", "skip", None)
+
+    paged = PagedIterator(aos.rest, "/api/systems", page_size=2, paging=paging)
+
+    assert [i["id"] for i in paged] == ["sys-0"]
+
+
+def test_paging_ignored_by_server(aos, aos_session):
+    aos_session.add_response(
+        "GET",
+        SYSTEMS_URL,
+        params={"per_page": 2, "page": 1},
+        resp=json.dumps({"items": items(5)}),
+    )
+
+    systems = aos.devices.managed_devices.get_all(page_size=2)
+
+    assert len(systems) == 5
+    assert len(requested_params(aos_session)) == 1
+
+
+def test_client_page_size_and_lazy_iteration(aos, aos_session):
+    aos.rest.page_size = 2
+    aos_session.add_response(
+        "GET",
+        SYSTEMS_URL,
+        params={"per_page": 2, "page": 1},
+        resp=json.dumps({"items": items(2)}),
+    )
+
+    systems = iter(PagedIterator(aos.rest, "/api/systems", prefetch=False))
+    assert aos_session.request.call_count == 0
+
+    assert next(systems)["id"] == "sys-0"
+    assert next(systems)["id"] == "sys-1"
+    assert aos_session.request.call_count == 1
+
+
+@pytest.mark.parametrize("paging", ["page", "offset"])
+def test_paging_ignored_with_exactly_page_size_items(aos, aos_session, paging):
+    # every page is "full" when the server ignores paging
+    for page in range(1, 5):
+        position = {"page": page} if paging == "page" else {"offset": page * 2 - 2}
+        aos_session.add_response(
+            "GET",
+            SYSTEMS_URL,
+            params={PAGING_STYLES[paging].size_param: 2, **position},
+            resp=json.dumps({"items": items(2)}),
+        )
+
+    paged = PagedIterator(aos.rest, "/api/systems", page_size=2, paging=paging)
+
+    assert [i["id"] for i in paged] == ["sys-0", "sys-1"]
+    assert len(requested_params(aos_session)) == 2
+
+
+def test_iter_all_is_an_iterator(aos, aos_session):
+    aos_session.add_response(
+        "GET",
+        SYSTEMS_URL,
+        params={"per_page": 2, "page": 1},
+        resp=json.dumps({"items": [system(0)]}),
+    )
+
+    systems = aos.devices.managed_devices.iter_all(page_size=2)
+
+    assert next(systems).id == "sys-0"
+    assert list(systems) == []
@@ -0,0 +1,149 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import json
+
+import pytest
+
+from aos.aio import ThreadOffloadAosRestAPI
+from aos.aos import AosRestAPI
+from aos.retry import RetryPolicy
+from aos.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    default_endpoint_class,
+    DEPLOY,
+    GRAPH_QUERY,
+    NODE_PATCH,
+)
+
+from tests.util import FakeClock, make_session
+
+
+@pytest.fixture
+def aos_session():
+    return make_session()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr("aos.ratelimit.time.sleep", calls.append)
+    return calls
+
+
+def test_endpoint_classes():
+    assert default_endpoint_class("POST", "/api/blueprints/bp/qe") == GRAPH_QUERY
+    assert default_endpoint_class("POST", "/api/blueprints/bp/ql") == GRAPH_QUERY
+    assert default_endpoint_class("PATCH", "/api/blueprints/bp/nodes") == NODE_PATCH
+    assert (
+        default_endpoint_class("PATCH", "http://aos:80/api/blueprints/bp/nodes/n1")
+        == NODE_PATCH
+    )
+    assert default_endpoint_class("PUT", "/api/blueprints/bp/deploy") == DEPLOY
+    assert default_endpoint_class("GET", "/api/blueprints/bp/nodes") is None
+
+
+def test_token_bucket_reserves_in_order():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+    clock.now = 10.0
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_rest_requests_wait_for_limiter(aos_session, sleeps):
+    limiter = RateLimiter(limits={GRAPH_QUERY: (1, 1)})
+    rest = AosRestAPI("http", "aos", 80, session=aos_session, rate_limiter=limiter)
+    aos_session.add_response(
+        "POST",
+        "http://aos:80/api/blueprints/bp/qe",
+        status=200,
+        resp=json.dumps({"items": []}),
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/blueprints", status=200, resp=json.dumps({})
+    )
+
+    for _ in range(3):
+        rest.json_resp_post("/api/blueprints/bp/qe", data={"query": "q"})
+    rest.json_resp_get("/api/blueprints")
+
+    assert len(sleeps) == 2
+    stats = limiter.stats()
+    assert stats["requests"] == 4
+    assert stats["delayed"] == 2
+    assert stats["by_class"][GRAPH_QUERY]["requests"] == 3
+    assert stats["by_class"][GRAPH_QUERY]["max_wait"] == pytest.approx(2, 0.1)
+
+
+def test_async_callers_queue_on_event_loop(aos_session, sleeps):
+    # 1000 requests over the burst wait up to 0.5s, however slowly the
+    # event loop starts them
+    limiter = RateLimiter(rate=2000, burst=200)
+    rest = ThreadOffloadAosRestAPI(
+        "http",
+        "aos",
+        80,
+        rest=AosRestAPI(
+            "http", "aos", 80, session=aos_session, rate_limiter=limiter
+        ),
+    )
+    aos_session.add_response(
+        "GET", "http://aos:80/api/blueprints", status=200, resp=json.dumps({})
+    )
+
+    async def fetch():
+        return await asyncio.gather(
+            *[rest.json_resp_get("/api/blueprints") for _ in range(1200)]
+        )
+
+    try:
+        assert asyncio.run(fetch()) == [{}] * 1200
+    finally:
+        rest.close()
+
+    # admitted on the event loop only, worker threads never slept
+    assert sleeps == []
+    assert limiter.stats()["requests"] == 1200
+    assert limiter.stats()["delayed"] > 0
+
+
+def test_async_retries_acquire_limiter(aos_session, sleeps):
+    limiter = RateLimiter(rate=1000)
+    rest = ThreadOffloadAosRestAPI(
+        "http",
+        "aos",
+        80,
+        rest=AosRestAPI(
+            "http",
+            "aos",
+            80,
+            session=aos_session,
+            rate_limiter=limiter,
+            retry_policy=RetryPolicy(jitter=False, backoff_factor=0.001),
+        ),
+    )
+    url = "http://aos:80/api/blueprints"
+    aos_session.add_response("GET", url, status=503, resp=json.dumps({}))
+    aos_session.add_response("GET", url, status=200, resp=json.dumps({}))
+
+    try:
+        assert asyncio.run(rest.json_resp_get("/api/blueprints")) == {}
+    finally:
+        rest.close()
+
+    # the retry is not admitted by the first acquire
+    assert aos_session.request.call_count == 2
+    assert limiter.stats()["requests"] == 2
@@ -0,0 +1,150 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from aos import repeat as repeat_module
+from aos.repeat import RepeatCancelled, arepeat, arepeat_until, repeat, repeat_until
+
+
+def counter():
+    calls = []
+
+    def func():
+        calls.append(time.monotonic())
+        return len(calls)
+
+    return func, calls
+
+
+def test_repeat_until_condition():
+    func, calls = counter()
+
+    retval = repeat(
+        func, stop_condition=lambda n: n == 3, initial_delay=0.001, backoff=1
+    )
+
+    assert retval == 3
+    assert len(calls) == 3
+
+
+def test_no_stop_condition_does_not_repeat():
+    func, calls = counter()
+
+    assert repeat(func) == 1
+    assert len(calls) == 1
+
+
+def test_error_condition_stops():
+    func, calls = counter()
+
+    retval = repeat(
+        func,
+        stop_condition=lambda: False,
+        error_condition=lambda n: n == 2,
+        initial_delay=0.001,
+    )
+
+    assert retval == 2
+
+
+def test_timeout_includes_call_time():
+    def slow():
+        time.sleep(0.05)
+
+    def never():
+        return False
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError, match="never"):
+        repeat(slow, stop_condition=never, timeout=0.2, initial_delay=0.01)
+
+    # the slow calls are not left out of the timeout
+    assert time.monotonic() - start < 0.45
+
+
+def test_last_attempt_at_deadline():
+    func, calls = counter()
+    start = time.monotonic()
+
+    repeat_until(lambda: len(calls) == 2, timeout=0.1, func=func, initial_delay=5)
+
+    # the 5s delay is cut short to retry when the timeout expires
+    assert len(calls) == 2
+    assert 0.09 <= calls[1] - start < 1
+
+
+def test_condition_signature_inspected_once():
+    func, _ = counter()
+
+    with mock.patch.object(
+        repeat_module, "accepts_args", wraps=repeat_module.accepts_args
+    ) as accepts_args:
+        repeat(func, stop_condition=lambda n: n == 5, initial_delay=0.001, backoff=1)
+
+    # once for the stop condition, not on each of the 5 calls
+    assert accepts_args.call_count == 1
+
+
+def test_delays_backoff_and_jitter():
+    delays = repeat_module._delays(1, lambda d: d + 1, 3, 0)
+    assert [next(delays) for _ in range(5)] == [1, 2, 3, 3, 3]
+
+    delays = repeat_module._delays(1, 2, 8, 0.5)
+    for expected in (1, 2, 4, 8, 8):
+        assert expected * 0.5 <= next(delays) <= expected
+
+
+def test_cancel_event():
+    cancel = threading.Event()
+    threading.Timer(0.05, cancel.set).start()
+
+    start = time.monotonic()
+    with pytest.raises(RepeatCancelled):
+        repeat(stop_condition=lambda: False, initial_delay=5, cancel=cancel)
+    assert time.monotonic() - start < 1
+
+
+def test_arepeat_async_and_sync_functions():
+    func, calls = counter()
+    polls = []
+
+    async def afunc():
+        polls.append(1)
+        await asyncio.sleep(0)
+        return len(polls)
+
+    async def done(n):
+        return n == 3
+
+    async def main():
+        return await asyncio.gather(
+            arepeat(afunc, stop_condition=done, initial_delay=0.001),
+            arepeat_until(lambda: len(calls) == 2, func=func, initial_delay=0.001),
+        )
+
+    assert asyncio.run(main()) == [3, 2]
+
+
+def test_arepeat_timeout_and_cancel():
+    async def never():
+        return False
+
+    async def cancelled():
+        cancel = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.05, cancel.set)
+        await arepeat(stop_condition=never, initial_delay=5, cancel=cancel)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(arepeat(stop_condition=never, timeout=0.05, initial_delay=0.01))
+
+    start = time.monotonic()
+    with pytest.raises(RepeatCancelled):
+        asyncio.run(cancelled())
+    assert time.monotonic() - start < 1
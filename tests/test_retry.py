@@ -0,0 +1,141 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import json
+
+import pytest
+import requests
+
+from aos.aos import AosAPIError, AosRestAPI
+from aos.retry import RetryPolicy, parse_retry_after
+
+from tests.util import make_session
+
+
+@pytest.fixture
+def aos_session():
+    return make_session()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr("aos.aos.time.sleep", calls.append)
+    return calls
+
+
+def make_rest(session, **kwargs):
+    policy = RetryPolicy(jitter=False, backoff_factor=0.1, **kwargs)
+    return AosRestAPI("http", "aos", 80, session=session, retry_policy=policy)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_retries_transient_status(aos_session, sleeps):
+    rest = make_rest(aos_session)
+    url = "http://aos:80/api/blueprints"
+    aos_session.add_response("GET", url, status=503, resp="unavailable")
+    aos_session.add_response("GET", url, status=502, resp="bad gateway")
+    aos_session.add_response("GET", url, status=200, resp=json.dumps({"a": 1}))
+
+    assert rest.json_resp_get("/api/blueprints") == {"a": 1}
+    assert aos_session.request.call_count == 3
+    assert sleeps == [0.1, 0.2]
+    assert rest.retry_policy.stats() == {
+        "retries": 2,
+        "exhausted": 0,
+        "by_reason": {503: 1, 502: 1},
+    }
+
+
+def test_honors_retry_after(aos_session, sleeps):
+    rest = make_rest(aos_session)
+    url = "http://aos:80/api/blueprints"
+    aos_session.add_response("GET", url, status=429, resp="slow down")
+    aos_session.add_response("GET", url, status=200, resp=json.dumps({}))
+    aos_session.response_store[("GET", url, None)][0].headers["Retry-After"] = "5"
+
+    rest.json_resp_get("/api/blueprints")
+
+    assert sleeps == [5.0]
+
+
+def test_gives_up_after_max_retries(aos_session, sleeps):
+    rest = make_rest(aos_session, max_retries=2)
+    aos_session.add_response(
+        "GET", "http://aos:80/api/blueprints", status=504, resp="timeout"
+    )
+
+    with pytest.raises(AosAPIError):
+        rest.json_resp_get("/api/blueprints")
+
+    assert aos_session.request.call_count == 3
+    assert rest.retry_policy.stats()["exhausted"] == 1
+
+
+def test_retry_budget_is_shared(aos_session, sleeps):
+    rest = make_rest(aos_session, retry_budget=1)
+    aos_session.add_response(
+        "GET", "http://aos:80/api/blueprints", status=503, resp="unavailable"
+    )
+
+    for _ in range(2):
+        with pytest.raises(AosAPIError):
+            rest.json_resp_get("/api/blueprints")
+
+    assert aos_session.request.call_count == 3
+    assert rest.retry_policy.retries == 1
+
+
+def test_does_not_repeat_unsafe_methods(aos_session, sleeps):
+    rest = make_rest(aos_session)
+    url = "http://aos:80/api/blueprints/bp/security-zones"
+    aos_session.add_response("POST", url, status=503, resp="unavailable")
+
+    with pytest.raises(AosAPIError):
+        rest.json_resp_post("/api/blueprints/bp/security-zones", data={})
+
+    assert aos_session.request.call_count == 1
+    assert sleeps == []
+
+
+def test_repeats_graph_queries_and_throttled_posts():
+    policy = RetryPolicy(jitter=False)
+    throttled = requests.Response()
+    throttled.status_code = 429
+    unavailable = requests.Response()
+    unavailable.status_code = 503
+
+    assert policy.next_delay("POST", "/api/blueprints/bp/qe", 0, resp=unavailable)
+    assert policy.next_delay("POST", "/api/blueprints/bp/nodes", 0, resp=throttled)
+    assert (
+        policy.next_delay("POST", "/api/blueprints/bp/nodes", 0, resp=unavailable)
+        is None
+    )
+
+
+def test_retries_connection_errors(aos_session, sleeps):
+    rest = make_rest(aos_session)
+    ok = aos_session.request.side_effect
+    failures = [requests.ConnectionError("connection reset")]
+
+    def request(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return ok(*args, **kwargs)
+
+    aos_session.request.side_effect = request
+    aos_session.add_response(
+        "GET", "http://aos:80/api/version", status=200, resp=json.dumps({})
+    )
+
+    assert rest.json_resp_get("/api/version") == {}
+    assert rest.retry_policy.stats()["by_reason"] == {"ConnectionError": 1}
@@ -0,0 +1,87 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+
+import json
+
+import pytest
+
+from aos.stream import iter_json_items
+
+
+def chunked(text: str, size: int):
+    data = text.encode("utf-8")
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+DOC = {
+    "count": 12345,
+    "items": [
+        {"n": {"id": "node-1", "label": "leaf é1", "asn": 65001}},
+        {"n": {"id": "node-2", "tags": [], "weight": -1.5e3}},
+        12345678,
+        "text with \"quotes\" and , ] }",
+        None,
+        True,
+    ],
+    "nodes": {"n1": {"id": "n1"}, "n2": {"id": "n2"}},
+}
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100000])
+def test_items_split_at_any_boundary(size):
+    chunks = chunked(json.dumps(DOC, ensure_ascii=False), size)
+
+    assert list(iter_json_items(chunks, "items")) == DOC["items"]
+    assert list(iter_json_items(chunks, "nodes")) == list(DOC["nodes"].values())
+
+
+@pytest.mark.parametrize("number", ["0.1", "1e5", "1E5", "1e-5", "2.5e+10", "-3.25"])
+def test_numbers_split_at_any_boundary(number):
+    text = f'{{"a": {number}, "items": [{number}]}}'
+    start = text.index(number)
+    for split in range(start, start + len(number) + 1):
+        for item_split in range(split, len(text)):
+            chunks = [text[:split], text[split:item_split], text[item_split:]]
+            assert list(iter_json_items(chunks, "items")) == [json.loads(number)]
+
+
+def test_number_split_after_dot():
+    chunks = [b'{"a"', b": 0.", b'1, "', b"item", b's": ', b"[1]}"]
+
+    assert list(iter_json_items(chunks, "items")) == [1]
+
+
+def test_top_level_array():
+    assert list(iter_json_items(["[1, 2,", " 3]"])) == [1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "text", ['{"items": []}', '{"items": null}', "{}", '{"other": [1]}']
+)
+def test_no_items(text):
+    assert list(iter_json_items([text], "items")) == []
+
+
+@pytest.mark.parametrize(
+    "text", ['{"items": [1, 2', '{"items": [1 2]}', '[1]', '{"items": []} x']
+)
+def test_invalid_document(text):
+    with pytest.raises(ValueError):
+        list(iter_json_items([text], "items"))
+
+
+def test_items_are_yielded_incrementally():
+    read = []
+
+    def chunks():
+        for chunk in ['{"items": [{"id": 1},', ' {"id": 2},', " {", '"id": 3}]}']:
+            read.append(chunk)
+            yield chunk
+
+    items = iter_json_items(chunks(), "items")
+
+    assert next(items) == {"id": 1}
+    assert len(read) <= 2
+    assert list(items) == [{"id": 2}, {"id": 3}]
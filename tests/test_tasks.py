@@ -0,0 +1,185 @@
+# Copyright 2020-present, Apstra, Inc. All rights reserved.
+#
+# This source code is licensed under End User License Agreement found in the
+# LICENSE file at http://www.apstra.com/eula
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import threading
+
+import pytest
+
+from aos.aos import AosAPIError, AosAPIResourceNotFound
+from aos.tasks import AosTaskError, BlueprintJob, TaskWaiter, wait_jobs
+
+
+class FakeBlueprint:
+    """Tasks finish after a given number of polls"""
+
+    def __init__(self, polls_left=None, statuses=None):
+        self.polls_left = dict(polls_left or {})
+        self.statuses = dict(statuses or {})
+        self.calls = []
+        self.error = None
+        self.lock = threading.Lock()
+
+    def get_tasks(self, bp_id, params=None, page_size=None):
+        with self.lock:
+            self.calls.append((bp_id, params["filter"]))
+            if self.error is not None:
+                raise self.error
+            tasks = []
+            for task_id, left in self.polls_left.items():
+                if repr(task_id) not in params["filter"]:
+                    continue
+                self.polls_left[task_id] = left - 1
+                status = "in_progress"
+                if left <= 0:
+                    status = self.statuses.get(task_id, "succeeded")
+                tasks.append({"id": task_id, "status": status})
+            return tasks
+
+
+@pytest.fixture
+def blueprint():
+    return FakeBlueprint()
+
+
+@pytest.fixture
+def waiter(blueprint):
+    return TaskWaiter(blueprint, poll_interval=0.01, max_interval=0.02)
+
+
+def test_wait_for_finished_task(blueprint, waiter):
+    blueprint.polls_left = {"t1": 0}
+
+    task = waiter.wait("bp", "t1", timeout=5)
+
+    assert task == {"id": "t1", "status": "succeeded"}
+    assert blueprint.calls == [("bp", "id in ['t1']")]
+
+
+def test_tasks_polled_together(blueprint, waiter):
+    blueprint.polls_left = {f"t{i}": i % 3 for i in range(20)}
+
+    futs = [waiter.watch("bp", f"t{i}") for i in range(20)]
+    tasks = waiter.wait_all(futs, timeout=5)
+
+    assert [t["id"] for t in tasks] == [f"t{i}" for i in range(20)]
+    # one request per poll for all watched tasks, not one per task
+    assert len(blueprint.calls) < 20
+    assert waiter.pending() == 0
+
+
+def test_failed_and_missing_tasks(blueprint, waiter):
+    blueprint.polls_left = {"t1": 1}
+    blueprint.statuses = {"t1": "failed"}
+
+    failed = waiter.watch("bp", "t1")
+    missing = waiter.watch("bp", "nope")
+
+    with pytest.raises(AosTaskError) as e:
+        failed.result(timeout=5)
+    assert e.value.task["status"] == "failed"
+    with pytest.raises(AosAPIResourceNotFound):
+        missing.result(timeout=5)
+
+
+def test_timeout_cancels_watch(blueprint, waiter):
+    blueprint.polls_left = {"t1": 10 ** 6}
+
+    with pytest.raises(TimeoutError):
+        waiter.wait("bp", "t1", timeout=0.05)
+
+    for _ in range(100):
+        if waiter._thread is None:
+            break
+        threading.Event().wait(0.01)
+    assert waiter.pending() == 0
+    assert waiter._thread is None
+
+
+def test_poll_errors_fail_waits(blueprint, waiter):
+    blueprint.error = AosAPIError("down")
+
+    fut = waiter.watch("bp", "t1")
+
+    with pytest.raises(AosAPIError):
+        fut.result(timeout=5)
+    assert len(blueprint.calls) == 3
+
+
+def test_await_task(blueprint, waiter):
+    blueprint.polls_left = {"t1": 2, "t2": 1}
+
+    async def main():
+        return await asyncio.gather(
+            waiter.await_task("bp", "t1", timeout=5),
+            waiter.await_task("bp", "t2", timeout=5),
+        )
+
+    tasks = asyncio.run(main())
+
+    assert [t["id"] for t in tasks] == ["t1", "t2"]
+
+
+def test_job_resolves_once(blueprint, waiter):
+    blueprint.polls_left = {"t1": 1}
+    resolved = []
+
+    def resolve(task):
+        resolved.append(task)
+        return task["id"].upper()
+
+    job = BlueprintJob(waiter, "bp", "t1", resolve=resolve)
+
+    assert job.result(timeout=5) == "T1"
+    assert job.result() == "T1"
+    assert job.done()
+    assert len(resolved) == 1
+
+
+def test_job_wait_timeout_keeps_watching(blueprint, waiter):
+    blueprint.polls_left = {"t1": 10 ** 6}
+
+    job = BlueprintJob(waiter, "bp", "t1")
+
+    with pytest.raises(TimeoutError):
+        job.wait(timeout=0.05)
+    assert not job.done()
+    assert waiter.pending() == 1
+
+    blueprint.polls_left["t1"] = 0
+    assert job.wait(timeout=5) == {"id": "t1", "status": "succeeded"}
+
+
+def test_wait_jobs(blueprint, waiter):
+    blueprint.polls_left = {"t1": 2, "t2": 0, "t3": 10 ** 6}
+
+    jobs = [
+        BlueprintJob(waiter, "bp", task_id, resolve=lambda task: task["id"])
+        for task_id in ("t1", "t2")
+    ]
+    assert wait_jobs(jobs, timeout=5) == ["t1", "t2"]
+
+    stuck = BlueprintJob(waiter, "bp", "t3")
+    with pytest.raises(TimeoutError):
+        wait_jobs([stuck], timeout=0.05)
+    assert stuck.future.cancelled()
+
+
+def test_await_jobs(blueprint, waiter):
+    blueprint.polls_left = {"t1": 2, "t2": 1}
+    blueprint.statuses = {"t2": "failed"}
+
+    async def main():
+        jobs = [
+            BlueprintJob(waiter, "bp", task_id, resolve=lambda task: task["id"])
+            for task_id in ("t1", "t2")
+        ]
+        return await asyncio.gather(*jobs, return_exceptions=True)
+
+    done, failed = asyncio.run(main())
+
+    assert done == "t1"
+    assert isinstance(failed, AosTaskError)
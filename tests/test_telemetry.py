@@ -37,6 +37,17 @@ def test_get_endpoints(aos_api_version):
     mock_rest.json_resp_get.assert_called()
 
 
-def test_delete_endpoints():
+def test_delete_endpoints(aos_api_version):
+    fixture_path = f"aos/{aos_api_version}/telemetry/endpoints.json"
+    endpoints = json.loads(read_fixture(fixture_path))
+    mock_rest.json_resp_get.return_value = endpoints
+
+    mock_rest.parallel.side_effect = lambda calls: [call() for call in calls]
+    mock_rest.delete.reset_mock()
+
     mgr.delete_all_endpoints()
-    mock_rest.delete.assert_called()
+    mock_rest.parallel.assert_called_once()
+    assert mock_rest.delete.call_args_list == [
+        mock.call(uri=f"/api/streaming-config/{ep['id']}")
+        for ep in endpoints["items"]
+    ]
@@ -25,3 +25,36 @@ def test_redacted_sensitive():
             "usual": "usual data",
             sensitive: "<REDACTED>",
         }
+
+
+def test_redacted_nested():
+    d = {
+        "system": {"username": "admin", "password": "secret"},
+        "agents": [{"token": "t1"}, {"label": "leaf1"}],
+    }
+    assert redacted(d) == {
+        "system": {"username": "admin", "password": "<REDACTED>"},
+        "agents": [{"token": "<REDACTED>"}, {"label": "leaf1"}],
+    }
+    assert d["system"]["password"] == "secret"
+    assert d["agents"][0]["token"] == "t1"
+
+
+def test_redacted_does_not_copy_clean_payload():
+    links = [
+        {"id": f"link-{i}", "endpoints": [{"if_name": "xe-0/0/0"}]} for i in range(3)
+    ]
+    d = {"links": links}
+
+    assert redacted(d) is d
+    assert redacted(links) is links
+
+
+def test_redacted_copies_only_changed_branches():
+    clean = {"label": "leaf1"}
+    d = {"clean": clean, "auth": {"password": "secret"}}
+
+    result = redacted(d)
+
+    assert result is not d
+    assert result["clean"] is clean
@@ -49,6 +49,16 @@ def errors(resp) -> str:
 RESP_IGNORED = object()
 
 
+class FakeClock:
+    """Clock callable advanced by setting `now`"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
 def make_session():
     m = mock.Mock()
     m.response_store = defaultdict(list)
@@ -93,6 +103,7 @@ def make_session():
         r.request = PreparedRequest()
         # pylint: disable=protected-access
         r._content = resp
+        r._content_consumed = True
         m.response_store[key(method, url, params)].append(r)
 
     # pylint: disable=redefined-outer-name